@@ -1,29 +1,27 @@
+import os
+import sys
+
 import streamlit as st
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 import numpy as np
 
-def get_age_group(age):
-    """Categorize age into groups"""
-    if pd.isna(age):
-        return "Unknown"
-    age = int(age)
-    if 8 <= age <= 14:
-        return "8-14"
-    elif 15 <= age <= 19:
-        return "15-19"
-    elif 20 <= age <= 26:
-        return "20-26"
-    return "Other"
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+if _current_dir not in sys.path:
+    sys.path.insert(0, _current_dir)
+
+from participant_dim import AGE_LABELS, UNKNOWN_AGE, load_participants
 
 
 def display(df, scale_map=None):
     """Display Descriptive Analysis"""
     st.subheader("Descriptive Analysis of Participants")
     
-    # Get unique participants only
-    unique_df = df.drop_duplicates(subset=['Participant id']).copy()
+    # One row per participant (participant dimension, with Age_Group)
+    unique_df = load_participants(df).copy()
+    # Autism Level is held as a category; the summary stats below need its numeric code
+    unique_df['Autism Level'] = pd.to_numeric(unique_df['Autism Level'].astype(object))
     
     st.markdown("**Analysis based on participants: " + str(len(unique_df)) + " participants**")
     
@@ -94,9 +92,7 @@ def display(df, scale_map=None):
     with tab2:
         st.markdown("### Age Distribution")
         
-        # Create age groups
-        unique_df['Age_Group'] = unique_df['Age'].apply(get_age_group)
-        age_group_order = ['8-14', '15-19', '20-26', '27-35', '36+', 'Unknown']
+        age_group_order = AGE_LABELS + [UNKNOWN_AGE]
         
         # Count age groups
         age_counts = unique_df['Age_Group'].value_counts().reindex(age_group_order, fill_value=0)
@@ -12,71 +12,55 @@ Organises the EDA into five top-level sections, each in its own file:
   EDA_Section7.py  - Section 7: Correlation Analysis              (complete)
 
 This file is the top-level router only - it loads each section module
-using importlib (same pattern as app.py) and delegates rendering to it.
+through the shared module registry (same as app.py) and delegates rendering
+to it.
 """
 
 import os
-import importlib.util
+import sys
 import streamlit as st
 
+_src_dir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+if _src_dir not in sys.path:
+    sys.path.insert(0, _src_dir)
+
+from module_registry import load_page_module  # noqa: E402
+
 
 def _load_section(name):
-    """Load a section module by filename (no extension) from the same directory."""
+    """Load a section module by filename (no extension) from the same directory (cached per process)."""
     here = os.path.dirname(os.path.abspath(__file__))
     path = os.path.join(here, f"{name}.py")
-    if not os.path.exists(path):
-        return None
-    spec   = importlib.util.spec_from_file_location(name, path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
-
+    return load_page_module(path, name)
 
-def display(df, scale_map=None):
-    """Main EDA entry point - renders five section tabs."""
-    st.header("Exploratory Data Analysis (EDA)")
 
-    sec1, sec2, sec3, sec4, sec5, sec6, sec7 = st.tabs([
-        "1. Overview & Demographics",
-        "2. Missing Data Profiling",
-        "3. Descriptive Statistics",
-        "4. Longitudinal Trajectories",
-        "5. Observer Comparison",
-        "6. Inter-Rater Reliability",
-        "7. Correlation Analysis",
-    ])
+# Section label → module file (the radio below renders only the selected one)
+SECTIONS = {
+    "1. Overview & Demographics":   "EDA_Section1",
+    "2. Missing Data Profiling":    "EDA_Section2",
+    "3. Descriptive Statistics":    "EDA_Section3",
+    "4. Longitudinal Trajectories": "EDA_Section4",
+    "5. Observer Comparison":       "EDA_Section5",
+    "6. Inter-Rater Reliability":   "EDA_Section6",
+    "7. Correlation Analysis":      "EDA_Section7",
+}
 
-    with sec1:
-        m = _load_section("EDA_Section1")
-        if m:
-            m.display(df, scale_map)
 
-    with sec2:
-        m = _load_section("EDA_Section2")
-        if m:
-            m.display(df, scale_map)
-
-    with sec3:
-        m = _load_section("EDA_Section3")
-        if m:
-            m.display(df, scale_map)
-
-    with sec4:
-        m = _load_section("EDA_Section4")
-        if m:
-            m.display(df, scale_map)
+def display(df, scale_map=None):
+    """Main EDA entry point - renders the selected section only.
 
-    with sec5:
-        m = _load_section("EDA_Section5")
-        if m:
-            m.display(df, scale_map)
+    st.tabs would execute every section on each rerun even though only one is
+    visible, so sections are picked with a horizontal radio instead.  Heavy
+    outputs inside the sections are memoised by data fingerprint
+    (see render_cache.py).
+    """
+    st.header("Exploratory Data Analysis (EDA)")
 
-    with sec6:
-        m = _load_section("EDA_Section6")
-        if m:
-            m.display(df, scale_map)
+    selected = st.radio("EDA section", list(SECTIONS.keys()),
+                        horizontal=True, key="eda_section",
+                        label_visibility="collapsed")
+    st.markdown("---")
 
-    with sec7:
-        m = _load_section("EDA_Section7")
-        if m:
-            m.display(df, scale_map)
+    m = _load_section(SECTIONS[selected])
+    if m:
+        m.display(df, scale_map)
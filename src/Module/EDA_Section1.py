@@ -14,6 +14,14 @@ import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import numpy as np
 import os
+import sys
+
+_src_dir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+if _src_dir not in sys.path:
+    sys.path.insert(0, _src_dir)
+
+from layer_storage import load_layer  # noqa: E402
+from participant_dim import load_participants  # noqa: E402
 
 
 # ── Tufte Style Helpers ───────────────────────────────────────────────────────
@@ -82,37 +90,17 @@ def _label_bars(ax, bars, fmt="{}", pad_frac=0.015, fontsize=11, color="#333333"
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
-def _age_group(age):
-    if pd.isna(age):
-        return "Unknown"
-    age = int(age)
-    if 8 <= age <= 14:
-        return "8-14"
-    elif 15 <= age <= 19:
-        return "15-19"
-    elif 20 <= age <= 26:
-        return "20-26"
-    return "Other"
-
-
 def _load_silver(df):
     """Return (full_df, participants_df).
-    Tries to load silver CSV; falls back to the df passed from app.py."""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    silver_path = os.path.join(script_dir, "..", "..", "Data", "Silver", "data_silver_cleaned.csv")
-    if os.path.exists(silver_path):
-        try:
-            full = pd.read_csv(silver_path, encoding="cp1252")
-            full.columns = full.columns.str.strip()
-        except Exception:
-            full = df.copy()
-    else:
+    Tries to load the Silver layer; falls back to the df passed from app.py.
+    participants_df is the participant dimension (participant_dim)."""
+    try:
+        full = load_layer("silver")
+    except Exception:
         full = df.copy()
 
     full.columns = full.columns.str.strip()
-    participants = full.drop_duplicates(subset=["Participant id"]).copy()
-    participants["Age_Group"] = participants["Age"].apply(_age_group)
-    return full, participants
+    return full, load_participants(full)
 
 
 # ── Dataset Structure ─────────────────────────────────────────────────────────
@@ -22,8 +22,12 @@ import seaborn as sns
 
 # Add current directory to path for dynamic module loading
 _current_dir = os.path.dirname(os.path.abspath(__file__))
-if _current_dir not in sys.path:
-    sys.path.insert(0, _current_dir)
+_src_dir     = os.path.normpath(os.path.join(_current_dir, '..'))
+for _p in [_current_dir, _src_dir]:
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from layer_storage import load_layer
 
 from questionnaire_mapping import (
     get_all_items_for_analysis, 
@@ -79,16 +83,10 @@ def _tufte_ax(ax, keep_left=True, keep_bottom=True):
 # ── Helper Functions ──────────────────────────────────────────────────────────
 
 def _load_silver(df):
-    """Load silver CSV or use passed DataFrame."""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    silver_path = os.path.join(script_dir, "..", "..", "Data", "Silver", "data_silver_cleaned.csv")
-    if os.path.exists(silver_path):
-        try:
-            full = pd.read_csv(silver_path, encoding="cp1252")
-            full.columns = full.columns.str.strip()
-        except Exception:
-            full = df.copy()
-    else:
+    """Load the Silver layer or use passed DataFrame."""
+    try:
+        full = load_layer("silver")
+    except Exception:
         full = df.copy()
     
     full.columns = full.columns.str.strip()
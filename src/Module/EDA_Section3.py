@@ -30,6 +30,8 @@ from questionnaire_mapping import (
     is_reverse_coded,
     get_observer_column
 )
+from data_schema import data_fingerprint
+from render_cache import memo, pyplot_cached
 
 
 # ── Helper Functions ──────────────────────────────────────────────────────────
@@ -178,8 +180,86 @@ def _section_3_2(df):
 
 # ── 3.3: Distribution Visualisations ──────────────────────────────────────────
 
+def _distribution_frame(df, quant_cols, quant_labels, observer_col):
+    """Long-form Item / Observer / Value rows of the quantitative items."""
+    viz_data = []
+    for col, label in zip(quant_cols, quant_labels):
+        temp = df[[col, observer_col]].dropna()
+        temp['Item'] = label
+        temp['Observer'] = temp[observer_col].str.upper().str.strip()
+        temp['Value'] = temp[col]
+        viz_data.append(temp[['Item', 'Observer', 'Value']])
+    return pd.concat(viz_data, ignore_index=True)
+
+
+def _item_boxplot_figure(viz_df, items, first, last):
+    """Boxplots of `items` (T vs P) — one of the two halves of the 21 items."""
+    fig, ax = plt.subplots(figsize=(14, 8))
+    fig.patch.set_facecolor('white')
+
+    sns.boxplot(data=viz_df[viz_df['Item'].isin(items)], x='Item', y='Value', hue='Observer',
+                ax=ax, palette=['#4878CF', '#D65F5F'])
+    ax.set_title(f'Distribution of Items {first}-{last} by Observer Type', fontsize=13, fontweight='bold', pad=15)
+    ax.set_xlabel('Item', fontsize=11, fontweight='bold')
+    ax.set_ylabel('Score', fontsize=11, fontweight='bold')
+    ax.tick_params(axis='x', rotation=45)
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
+
+    fig.tight_layout()
+    return fig
+
+
+def _key_item_violin_figure(viz_df, key_item_labels):
+    """Split violins for the 6 key items by observer."""
+    # Create mapping from Q label to description
+    label_to_desc = {label: ITEM_DESC.get(label, label) for label in key_item_labels}
+
+    viz_df_key = viz_df[viz_df['Item'].isin(key_item_labels)].copy()
+    viz_df_key['Item'] = viz_df_key['Item'].map(label_to_desc)
+
+    fig, ax = plt.subplots(figsize=(14, 7))
+    fig.patch.set_facecolor('white')
+
+    sns.violinplot(data=viz_df_key, x='Item', y='Value', hue='Observer', ax=ax, palette=['#4878CF', '#D65F5F'], split=True)
+    ax.set_title('Distribution of 6 Key Items by Observer Type (Violin Plot)', fontsize=13, fontweight='bold', pad=15)
+    ax.set_xlabel('Item Description', fontsize=11, fontweight='bold')
+    ax.set_ylabel('Score', fontsize=11, fontweight='bold')
+    ax.tick_params(axis='x', rotation=45)
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
+
+    fig.tight_layout()
+    return fig
+
+
+def _histogram_grid_figure(df, quant_cols, quant_labels):
+    """4×6 grid of histograms, one panel per quantitative item."""
+    fig, axes = plt.subplots(4, 6, figsize=(16, 10))
+    fig.patch.set_facecolor('white')
+    axes = axes.flatten()
+
+    for idx, (col, label) in enumerate(zip(quant_cols, quant_labels)):
+        ax = axes[idx]
+        data_valid = df[col].dropna()
+
+        ax.hist(data_valid, bins=15, color='#4878CF', alpha=0.7, edgecolor='black', linewidth=0.5)
+        ax.set_title(label, fontsize=10, fontweight='bold')
+        ax.set_xlabel('Score', fontsize=9)
+        ax.set_ylabel('Frequency', fontsize=9)
+        ax.grid(axis='y', alpha=0.3, linestyle='--')
+
+    # Hide the extra subplot if not divisible by 24
+    for idx in range(len(quant_labels), len(axes)):
+        axes[idx].set_visible(False)
+
+    fig.tight_layout()
+    return fig
+
+
 def _section_3_3(df):
-    """Display distribution visualisations: boxplots, violin, histograms."""
+    """Display distribution visualisations: boxplots, violin, histograms.
+
+    The figures are rendered once per dataset fingerprint and reused on reruns.
+    """
     st.markdown("### 3.3 Distribution Visualisations")
     
     full_questions, q_labels, metadata, notes = get_all_items_for_analysis(df)
@@ -188,17 +268,12 @@ def _section_3_3(df):
     # Get only quantitative items
     quant_cols = [q for q in full_questions if get_q_label(q) in QUANT_ITEMS and q in df.columns]
     quant_labels = [get_q_label(q) for q in quant_cols]
+    fp = data_fingerprint(df)
     
-    # Prepare data for visualization
-    viz_data = []
-    for col, label in zip(quant_cols, quant_labels):
-        temp = df[[col, observer_col]].dropna()
-        temp['Item'] = label
-        temp['Observer'] = temp[observer_col].str.upper().str.strip()
-        temp['Value'] = temp[col]
-        viz_data.append(temp[['Item', 'Observer', 'Value']])
-    
-    viz_df = pd.concat(viz_data, ignore_index=True)
+    # Data for the boxplots and violins — only built when one of them is not cached yet
+    def viz_df():
+        return memo("eda3.viz_df", fp,
+                    lambda: _distribution_frame(df, quant_cols, quant_labels, observer_col))
     
     # ── Tab 1: Boxplots ───────────────────────────────────────────────────
     st.markdown("#### Boxplots: All 21 Items (T vs P)")
@@ -212,37 +287,12 @@ def _section_3_3(df):
     items_group2 = quant_labels[mid_point:]
     
     # Group 1
-    viz_df_g1 = viz_df[viz_df['Item'].isin(items_group1)]
-    fig1, ax1 = plt.subplots(figsize=(14, 8))
-    fig1.patch.set_facecolor('white')
-    
-    sns.boxplot(data=viz_df_g1, x='Item', y='Value', hue='Observer', ax=ax1, palette=['#4878CF', '#D65F5F'])
-    ax1.set_title(f'Distribution of Items 1-{mid_point} by Observer Type', fontsize=13, fontweight='bold', pad=15)
-    ax1.set_xlabel('Item', fontsize=11, fontweight='bold')
-    ax1.set_ylabel('Score', fontsize=11, fontweight='bold')
-    ax1.tick_params(axis='x', rotation=45)
-    ax1.grid(axis='y', alpha=0.3, linestyle='--')
-    
-    plt.tight_layout()
-    st.pyplot(fig1)
-    plt.close(fig1)
+    pyplot_cached("eda3.box1", fp, lambda: _item_boxplot_figure(viz_df(), items_group1, 1, mid_point))
     
     # Group 2
     if len(items_group2) > 0:
-        viz_df_g2 = viz_df[viz_df['Item'].isin(items_group2)]
-        fig2, ax2 = plt.subplots(figsize=(14, 8))
-        fig2.patch.set_facecolor('white')
-        
-        sns.boxplot(data=viz_df_g2, x='Item', y='Value', hue='Observer', ax=ax2, palette=['#4878CF', '#D65F5F'])
-        ax2.set_title(f'Distribution of Items {mid_point+1}-{n_items} by Observer Type', fontsize=13, fontweight='bold', pad=15)
-        ax2.set_xlabel('Item', fontsize=11, fontweight='bold')
-        ax2.set_ylabel('Score', fontsize=11, fontweight='bold')
-        ax2.tick_params(axis='x', rotation=45)
-        ax2.grid(axis='y', alpha=0.3, linestyle='--')
-        
-        plt.tight_layout()
-        st.pyplot(fig2)
-        plt.close(fig2)
+        pyplot_cached("eda3.box2", fp,
+                      lambda: _item_boxplot_figure(viz_df(), items_group2, mid_point + 1, n_items))
     
     # ── Tab 2: Violin Plots (6 Key Items) ─────────────────────────────────
     st.markdown("#### Violin Plots: 6 Key Items Split by Observer")
@@ -251,50 +301,12 @@ def _section_3_3(df):
     key_item_labels = [get_q_label(q) for q in key_item_cols]
     
     if len(key_item_labels) > 0:
-        # Create mapping from Q label to description
-        label_to_desc = {label: ITEM_DESC.get(label, label) for label in key_item_labels}
-        
-        viz_df_key = viz_df[viz_df['Item'].isin(key_item_labels)].copy()
-        viz_df_key['Item'] = viz_df_key['Item'].map(label_to_desc)
-        
-        fig3, ax3 = plt.subplots(figsize=(14, 7))
-        fig3.patch.set_facecolor('white')
-        
-        sns.violinplot(data=viz_df_key, x='Item', y='Value', hue='Observer', ax=ax3, palette=['#4878CF', '#D65F5F'], split=True)
-        ax3.set_title('Distribution of 6 Key Items by Observer Type (Violin Plot)', fontsize=13, fontweight='bold', pad=15)
-        ax3.set_xlabel('Item Description', fontsize=11, fontweight='bold')
-        ax3.set_ylabel('Score', fontsize=11, fontweight='bold')
-        ax3.tick_params(axis='x', rotation=45)
-        ax3.grid(axis='y', alpha=0.3, linestyle='--')
-        
-        plt.tight_layout()
-        st.pyplot(fig3)
-        plt.close(fig3)
+        pyplot_cached("eda3.violin", fp, lambda: _key_item_violin_figure(viz_df(), key_item_labels))
     
     # ── Tab 3: Histogram Grid (4×6) ───────────────────────────────────────
     st.markdown("#### Histogram Grid: Distribution of All 21 Items")
     
-    fig4, axes = plt.subplots(4, 6, figsize=(16, 10))
-    fig4.patch.set_facecolor('white')
-    axes = axes.flatten()
-    
-    for idx, (col, label) in enumerate(zip(quant_cols, quant_labels)):
-        ax = axes[idx]
-        data_valid = df[col].dropna()
-        
-        ax.hist(data_valid, bins=15, color='#4878CF', alpha=0.7, edgecolor='black', linewidth=0.5)
-        ax.set_title(label, fontsize=10, fontweight='bold')
-        ax.set_xlabel('Score', fontsize=9)
-        ax.set_ylabel('Frequency', fontsize=9)
-        ax.grid(axis='y', alpha=0.3, linestyle='--')
-    
-    # Hide the extra subplot if not divisible by 24
-    for idx in range(len(quant_labels), len(axes)):
-        axes[idx].set_visible(False)
-    
-    plt.tight_layout()
-    st.pyplot(fig4)
-    plt.close(fig4)
+    pyplot_cached("eda3.hist_grid", fp, lambda: _histogram_grid_figure(df, quant_cols, quant_labels))
 
 
 # ── Main Display Function ─────────────────────────────────────────────────────
@@ -7,12 +7,13 @@ Sub-sections:
   4.3  By Autism Level — 6 key items, Level 1 / 2 / 3 lines
   4.4  By Age Group — 3 items (Q1, Q9, Q22), age-band lines
   4.5  Engagement Success Rate — mean per session trajectory
-  4.6  Response Time — mean per session from response_time_cleaned.csv
+  4.6  Response Time — mean per session of the Silver response_seconds column
+
+4.1–4.6 slice the session aggregate cube (session_cube.py) rather than
+grouping the rows on every render.
 """
 
 import streamlit as st
-import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.lines as mlines
 import os
@@ -28,6 +29,7 @@ from questionnaire_mapping import (
     ITEM_DESC,
     KEY_ITEMS,
 )
+from session_cube import item_key, load_cube, members, session_trend
 
 # ── Palette ───────────────────────────────────────────────────────────────────
 COLORS = ['#0066CC', '#CC0000', '#009900', '#FF8800', '#8800CC', '#00AAAA']
@@ -38,16 +40,6 @@ KEY_ITEM_COLS = {q_label: col for col, q_label in QUESTION_MAPPING.items()
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
-def _ci95(series):
-    """95% CI half-width for a series."""
-    valid = series.dropna()
-    n = len(valid)
-    if n < 2:
-        return 0.0
-    se = valid.std(ddof=1) / np.sqrt(n)
-    return se * stats.t.ppf(0.975, df=n - 1)
-
-
 def _style_ax(ax, title, xlabel="Session", ylabel="Mean Score"):
     ax.spines['top'].set_visible(False)
     ax.spines['right'].set_visible(False)
@@ -60,50 +52,36 @@ def _style_ax(ax, title, xlabel="Session", ylabel="Mean Score"):
     ax.set_title(title, fontsize=12, fontweight='bold', pad=12)
 
 
-def _get_age_group(age):
-    if pd.isna(age):
-        return None
-    age = int(age)
-    if 8 <= age <= 14:
-        return "8-14"
-    elif 15 <= age <= 19:
-        return "15-19"
-    elif 20 <= age <= 26:
-        return "20-26"
-    return None
+def _has_item(cube, col):
+    return col is not None and (cube['Item'] == item_key(col)).any()
+
+
+def _trend_arrays(cube, col, **filters):
+    """(sessions, means, 95% CI half-widths) of one item in one cube slice."""
+    line = session_trend(cube, col, **filters)
+    return (line['Session'].to_numpy(), line['Mean'].to_numpy(),
+            line['CI95'].to_numpy())
 
 
 # ── 4.1: Overall Trends ───────────────────────────────────────────────────────
 
-def _section_4_1(df):
+def _section_4_1(cube):
     st.markdown("### 4.1 Overall Trends — 6 Key Items")
     st.markdown("*Mean score per session (sessions 2-9) across all observers, with 95% CI shading*")
 
-    session_col = "Session number"
-    sessions = sorted(df[session_col].dropna().unique())
-
     fig, ax = plt.subplots(figsize=(13, 6))
     fig.patch.set_facecolor('white')
 
     for idx, q_label in enumerate(KEY_ITEMS):
         col = KEY_ITEM_COLS.get(q_label)
-        if col is None or col not in df.columns:
+        if not _has_item(cube, col):
             continue
 
         color = COLORS[idx % len(COLORS)]
         marker = MARKERS[idx % len(MARKERS)]
         desc = ITEM_DESC.get(q_label, q_label)
 
-        means, cis, sess_list = [], [], []
-        for s in sessions:
-            vals = df.loc[df[session_col] == s, col].dropna()
-            if len(vals) > 0:
-                means.append(vals.mean())
-                cis.append(_ci95(vals))
-                sess_list.append(s)
-
-        means = np.array(means)
-        cis = np.array(cis)
+        sess_list, means, cis = _trend_arrays(cube, col)
 
         ax.plot(sess_list, means, marker=marker, linewidth=2.2, markersize=8,
                 label=f"{q_label}: {desc}", color=color,
@@ -119,17 +97,10 @@ def _section_4_1(df):
 
 # ── 4.2: By Observer Type ─────────────────────────────────────────────────────
 
-def _section_4_2(df):
+def _section_4_2(cube):
     st.markdown("### 4.2 Trends by Observer Type (T vs P)")
     st.markdown("*Same 6 key items — solid = Therapist, dashed = Parent*")
 
-    session_col = "Session number"
-    observer_col = "Submitted_by"
-    sessions = sorted(df[session_col].dropna().unique())
-
-    df_t = df[df[observer_col].str.upper().str.strip() == "T"]
-    df_p = df[df[observer_col].str.upper().str.strip() == "P"]
-
     fig, axes = plt.subplots(2, 3, figsize=(15, 9), sharey=False)
     fig.patch.set_facecolor('white')
     axes = axes.flatten()
@@ -137,27 +108,19 @@ def _section_4_2(df):
     for idx, q_label in enumerate(KEY_ITEMS):
         col = KEY_ITEM_COLS.get(q_label)
         ax = axes[idx]
-        if col is None or col not in df.columns:
+        if not _has_item(cube, col):
             ax.set_visible(False)
             continue
 
         desc = ITEM_DESC.get(q_label, q_label)
 
-        for (subset, label, ls, color) in [
-            (df_t, "Therapist (T)", '-',  '#0066CC'),
-            (df_p, "Parent (P)",    '--', '#CC0000'),
+        for (observer, label, ls, color) in [
+            ("T", "Therapist (T)", '-',  '#0066CC'),
+            ("P", "Parent (P)",    '--', '#CC0000'),
         ]:
-            means, cis, sess_list = [], [], []
-            for s in sessions:
-                vals = subset.loc[subset[session_col] == s, col].dropna()
-                if len(vals) > 0:
-                    means.append(vals.mean())
-                    cis.append(_ci95(vals))
-                    sess_list.append(s)
-            if not means:
+            sess_list, means, cis = _trend_arrays(cube, col, observer=observer)
+            if not len(means):
                 continue
-            means = np.array(means)
-            cis = np.array(cis)
             ax.plot(sess_list, means, marker='o', linewidth=2.0, linestyle=ls,
                     markersize=6, label=label, color=color,
                     markeredgewidth=1.2, markeredgecolor='white')
@@ -175,14 +138,11 @@ def _section_4_2(df):
 
 # ── 4.3: By Autism Level ──────────────────────────────────────────────────────
 
-def _section_4_3(df):
+def _section_4_3(cube):
     st.markdown("### 4.3 Trends by Autism Level")
     st.markdown("*6 key items — separate lines per autism level (1 / 2 / 3)*")
 
-    session_col = "Session number"
-    autism_col  = "Autism Level"
-    sessions    = sorted(df[session_col].dropna().unique())
-    levels      = sorted(df[autism_col].dropna().unique())
+    levels = sorted(int(level) for level in members(cube, 'autism'))
     level_colors = {1: '#0066CC', 2: '#CC0000', 3: '#009900'}
 
     fig, axes = plt.subplots(2, 3, figsize=(15, 9), sharey=False)
@@ -192,26 +152,17 @@ def _section_4_3(df):
     for idx, q_label in enumerate(KEY_ITEMS):
         col = KEY_ITEM_COLS.get(q_label)
         ax = axes[idx]
-        if col is None or col not in df.columns:
+        if not _has_item(cube, col):
             ax.set_visible(False)
             continue
 
         desc = ITEM_DESC.get(q_label, q_label)
 
         for level in levels:
-            subset = df[df[autism_col] == level]
             color = level_colors.get(level, COLORS[int(level) % len(COLORS)])
-            means, cis, sess_list = [], [], []
-            for s in sessions:
-                vals = subset.loc[subset[session_col] == s, col].dropna()
-                if len(vals) > 0:
-                    means.append(vals.mean())
-                    cis.append(_ci95(vals))
-                    sess_list.append(s)
-            if not means:
+            sess_list, means, cis = _trend_arrays(cube, col, autism=level)
+            if not len(means):
                 continue
-            means = np.array(means)
-            cis = np.array(cis)
             ax.plot(sess_list, means, marker='o', linewidth=2.0, markersize=6,
                     label=f"Level {int(level)}", color=color,
                     markeredgewidth=1.2, markeredgecolor='white')
@@ -229,48 +180,31 @@ def _section_4_3(df):
 
 # ── 4.4: By Age Group ─────────────────────────────────────────────────────────
 
-def _section_4_4(df):
+def _section_4_4(cube):
     st.markdown("### 4.4 Trends by Age Group")
     st.markdown("*3 items (Q1, Q9, Q22) — lines for age bands 8-14, 15-19, 20-26*")
 
-    session_col = "Session number"
-    age_col     = "Age"
     age_groups  = ["8-14", "15-19", "20-26"]
     age_colors  = {"8-14": '#0066CC', "15-19": '#CC0000', "20-26": '#009900'}
     items_44    = ["Q1", "Q9", "Q22"]
 
-    df = df.copy()
-    df['_age_group'] = df[age_col].apply(_get_age_group)
-    sessions = sorted(df[session_col].dropna().unique())
-
     fig, axes = plt.subplots(1, 3, figsize=(15, 5), sharey=False)
     fig.patch.set_facecolor('white')
 
     for idx, q_label in enumerate(items_44):
         col = KEY_ITEM_COLS.get(q_label)
         ax = axes[idx]
-        if col is None or col not in df.columns:
+        if not _has_item(cube, col):
             ax.set_visible(False)
             continue
 
         desc = ITEM_DESC.get(q_label, q_label)
 
         for grp in age_groups:
-            subset = df[df['_age_group'] == grp]
-            if subset.empty:
-                continue
             color = age_colors[grp]
-            means, cis, sess_list = [], [], []
-            for s in sessions:
-                vals = subset.loc[subset[session_col] == s, col].dropna()
-                if len(vals) > 0:
-                    means.append(vals.mean())
-                    cis.append(_ci95(vals))
-                    sess_list.append(s)
-            if not means:
+            sess_list, means, cis = _trend_arrays(cube, col, age_group=grp)
+            if not len(means):
                 continue
-            means = np.array(means)
-            cis = np.array(cis)
             ax.plot(sess_list, means, marker='o', linewidth=2.0, markersize=7,
                     label=grp, color=color,
                     markeredgewidth=1.2, markeredgecolor='white')
@@ -288,29 +222,19 @@ def _section_4_4(df):
 
 # ── 4.5: Engagement Success Rate ─────────────────────────────────────────────
 
-def _section_4_5(df):
+def _section_4_5(cube):
     st.markdown("### 4.5 Engagement Success Rate Trajectory")
     st.markdown("*Mean Success_percentage per session with 95% CI (values 0–1 shown as 0–100%)*")
 
-    session_col = "Session number"
     success_col = "Success_percentage"
 
-    if success_col not in df.columns:
+    if not _has_item(cube, success_col):
         st.warning(f"Column '{success_col}' not found in data.")
         return
 
-    df_valid = df[[session_col, success_col]].dropna()
-    df_valid[success_col] = pd.to_numeric(df_valid[success_col], errors='coerce') * 100
-    sessions = sorted(df_valid[session_col].unique())
-
-    means, cis = [], []
-    for s in sessions:
-        vals = df_valid.loc[df_valid[session_col] == s, success_col].dropna()
-        means.append(vals.mean())
-        cis.append(_ci95(vals))
-
-    means = np.array(means)
-    cis   = np.array(cis)
+    sessions, means, cis = _trend_arrays(cube, success_col)
+    means = means * 100
+    cis   = cis * 100
 
     fig, ax = plt.subplots(figsize=(12, 5))
     fig.patch.set_facecolor('white')
@@ -335,39 +259,19 @@ def _section_4_5(df):
 
 # ── 4.6: Response Time ────────────────────────────────────────────────────────
 
-def _section_4_6():
+def _section_4_6(df, cube):
     st.markdown("### 4.6 Response Time Trajectory")
     st.markdown("*Mean response time (seconds) per session — expected decreasing trend as participants improve*")
 
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    rt_path = os.path.join(script_dir, "..", "..", "Data", "Silver", "response_time_cleaned.csv")
-
-    if not os.path.exists(rt_path):
-        st.warning("response_time_cleaned.csv not found in Data/Silver/.")
-        return
-
-    rt_df = pd.read_csv(rt_path, encoding='cp1252')
-    rt_df.columns = rt_df.columns.str.strip()
-
     session_col = "Session number"
     rt_col      = "response_seconds"
 
-    if rt_col not in rt_df.columns:
-        st.warning(f"Column '{rt_col}' not found in response time data.")
+    if rt_col not in df.columns or not _has_item(cube, rt_col):
+        st.warning(f"Column '{rt_col}' not found in data — re-run the Bronze → Silver pipeline.")
         return
 
-    rt_df[rt_col] = pd.to_numeric(rt_df[rt_col], errors='coerce')
-    rt_valid = rt_df[[session_col, rt_col]].dropna()
-    sessions = sorted(rt_valid[session_col].unique())
-
-    means, cis = [], []
-    for s in sessions:
-        vals = rt_valid.loc[rt_valid[session_col] == s, rt_col].dropna()
-        means.append(vals.mean())
-        cis.append(_ci95(vals))
-
-    means = np.array(means)
-    cis   = np.array(cis)
+    rt_valid = df[[session_col, rt_col]].dropna()
+    sessions, means, cis = _trend_arrays(cube, rt_col)
 
     fig, ax = plt.subplots(figsize=(12, 5))
     fig.patch.set_facecolor('white')
@@ -424,15 +328,16 @@ def display(df, scale_map=None):
         "4.6 Response Time",
     ])
 
+    cube = load_cube(df)
     with tab1:
-        _section_4_1(df)
+        _section_4_1(cube)
     with tab2:
-        _section_4_2(df)
+        _section_4_2(cube)
     with tab3:
-        _section_4_3(df)
+        _section_4_3(cube)
     with tab4:
-        _section_4_4(df)
+        _section_4_4(cube)
     with tab5:
-        _section_4_5(df)
+        _section_4_5(cube)
     with tab6:
-        _section_4_6()
+        _section_4_6(df, cube)
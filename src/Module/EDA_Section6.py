@@ -2,17 +2,18 @@
 EDA — Section 6: Inter-Rater Reliability (ICC)
 ===============================================
 Excludes Participant 102 (Therapist-only, no Parent pairs).
+ICCs for all items are computed in one batch by icc_engine (NumPy two-way
+ANOVA, validated against pingouin).
 
 Sub-sections:
   6.1  Paired Observations Summary
-  6.2/6.3  ICC Results Table (ICC3 — two-way mixed, single measures)
+  6.2/6.3  ICC Results Table (ICC3 — two-way mixed, single measures; ICC(2,1) alongside)
   6.4  Kappa for Non-Quantitative Items (Q12 weighted, Q16/Q17 Cohen's)
   6.5  ICC Visualisations (bar chart, forest plot, domain-grouped)
 """
 
 import os
 import sys
-import warnings
 
 import streamlit as st
 import pandas as pd
@@ -30,12 +31,10 @@ from questionnaire_mapping import (
     ITEM_DESC,
     QUANT_ITEMS,
 )
+from data_schema import data_fingerprint
+from render_cache import memo
+from icc_engine import paired_matrices, icc_batch
 
-try:
-    import pingouin as pg
-    _HAS_PINGOUIN = True
-except ImportError:
-    _HAS_PINGOUIN = False
 
 # ── Constants ─────────────────────────────────────────────────────────────────
 
@@ -113,115 +112,30 @@ def _domain_for(q_label):
 
 # ── ICC computation ───────────────────────────────────────────────────────────
 
-def _build_paired_long(df_ex, col):
-    """
-    Build long-format DataFrame for ICC:
-      Participant_Session | Observer_Type | Score
-    Only retains targets (participant × session) that have BOTH a T and P rating.
-    Deduplicates by averaging if multiple rows exist per target × rater.
-    """
-    sub = df_ex[['Participant id', 'Session number', 'Submitted_by', col]].copy()
-    sub['Score'] = pd.to_numeric(sub[col], errors='coerce')
-    sub = sub.dropna(subset=['Score'])
-    sub['Participant_Session'] = (
-        sub['Participant id'].astype(str) + '_' + sub['Session number'].astype(str)
-    )
-    # Deduplicate: mean per target × observer
-    sub = (
-        sub.groupby(['Participant_Session', 'Submitted_by'])['Score']
-        .mean()
-        .reset_index()
-        .rename(columns={'Submitted_by': 'Observer_Type'})
-    )
-    # Keep only targets with BOTH T and P
-    pivot_check = sub.pivot_table(
-        index='Participant_Session', columns='Observer_Type', values='Score', aggfunc='first'
-    )
-    missing = [c for c in ['T', 'P'] if c not in pivot_check.columns]
-    if missing:
-        return sub.iloc[0:0].reset_index(drop=True)  # empty — no pairs possible
-    valid = pivot_check.dropna(subset=['T', 'P']).index
-    return sub[sub['Participant_Session'].isin(valid)].reset_index(drop=True)
-
-
-def _compute_icc(paired_df):
+def _build_icc_table(df_ex):
     """
-    Compute ICC3 (two-way mixed, single measures) using pingouin.
-    Returns (icc, ci_low, ci_high, pval, n_pairs, error_msg).
+    Compute ICC(3,1) and ICC(2,1) for all 21 quantitative items in one batch.
+    df_ex must already exclude P102.
     """
-    n_pairs = paired_df['Participant_Session'].nunique()
-    if not _HAS_PINGOUIN:
-        return np.nan, np.nan, np.nan, np.nan, n_pairs, 'pingouin not installed'
-    if n_pairs < 3:
-        return np.nan, np.nan, np.nan, np.nan, n_pairs, f'too few pairs ({n_pairs})'
-    # Drop remaining NaN scores before passing to pingouin
-    clean = paired_df.dropna(subset=['Score']).copy()
-    try:
-        with warnings.catch_warnings():
-            warnings.simplefilter('ignore')
-            result = pg.intraclass_corr(
-                data=clean,
-                targets='Participant_Session',
-                raters='Observer_Type',
-                ratings='Score',
-            )
-        # Pingouin version-safe lookup: try several possible Type strings for ICC3
-        _icc3_candidates = ['ICC3', 'ICC3,1', 'ICC(3,1)', 'ICC3k']
-        row = None
-        for candidate in _icc3_candidates:
-            match = result[result['Type'] == candidate]
-            if not match.empty:
-                row = match.iloc[0]
-                break
-        # Fallback: use ICC2 (two-way random) which is the next best
-        if row is None:
-            for candidate in ['ICC2', 'ICC2,1', 'ICC(2,1)']:
-                match = result[result['Type'] == candidate]
-                if not match.empty:
-                    row = match.iloc[0]
-                    break
-        # Last resort: take whichever row has the highest single-measures ICC
-        if row is None:
-            if result.empty:
-                return np.nan, np.nan, np.nan, np.nan, n_pairs, \
-                    f'pingouin returned empty result; types={[]}'
-            row = result.iloc[result['ICC'].abs().argmax()]
-        # CI95% format varies by pingouin version:
-        #   older  → 'CI95%' column holds a list/tuple [lo, hi]
-        #   newer  → separate 'CI95%_lower' / 'CI95%_upper' columns
-        all_cols = result.columns.tolist()
-        if 'CI95%_lower' in all_cols and 'CI95%_upper' in all_cols:
-            ci_lo, ci_hi = float(row['CI95%_lower']), float(row['CI95%_upper'])
-        elif 'CI95%' in all_cols:
-            ci = row['CI95%']
-            ci_lo, ci_hi = float(ci[0]), float(ci[1])
-        else:
-            lower_col = next((c for c in all_cols if 'lower' in c.lower()), None)
-            upper_col = next((c for c in all_cols if 'upper' in c.lower()), None)
-            ci_lo = float(row[lower_col]) if lower_col else np.nan
-            ci_hi = float(row[upper_col]) if upper_col else np.nan
-        return float(row['ICC']), ci_lo, ci_hi, float(row['pval']), n_pairs, ''
-    except Exception as e:
-        return np.nan, np.nan, np.nan, np.nan, n_pairs, str(e)
-
-
-def _build_icc_table(df_ex):
-    """Compute ICC3 for all 21 quantitative items. df_ex must already exclude P102."""
+    quant = _get_quant_cols(df_ex)
+    x, y = paired_matrices(df_ex, [col for col, _ in quant])
+    res = icc_batch(x, y)
     rows = []
-    for col, q_label in _get_quant_cols(df_ex):
-        paired = _build_paired_long(df_ex, col)
-        icc, ci_lo, ci_hi, pval, n, err = _compute_icc(paired)
+    for (col, q_label), r in zip(quant, res.itertuples(index=False)):
         rows.append({
-            'Q':              q_label,
-            'Description':    ITEM_DESC.get(q_label, q_label),
-            'Domain':         _domain_for(q_label),
-            'Paired N':       n,
-            'ICC':            icc,
-            'CI Lower':       ci_lo,
-            'CI Upper':       ci_hi,
-            'p-value':        pval,
-            'Interpretation': _icc_label(icc),
-            '_error':         err,
+            'Q':                 q_label,
+            'Description':       ITEM_DESC.get(q_label, q_label),
+            'Domain':            _domain_for(q_label),
+            'Paired N':          int(r.n),
+            'ICC':               r.ICC3,
+            'CI Lower':          r.ICC3_CI_Lower,
+            'CI Upper':          r.ICC3_CI_Upper,
+            'p-value':           r.pval,
+            'ICC(2,1)':          r.ICC2,
+            'ICC(2,1) CI Lower': r.ICC2_CI_Lower,
+            'ICC(2,1) CI Upper': r.ICC2_CI_Upper,
+            'Interpretation':    _icc_label(r.ICC3),
+            '_error':            f'too few pairs ({int(r.n)})' if r.n < 3 else '',
         })
     return pd.DataFrame(rows).sort_values('Q').reset_index(drop=True)
 
@@ -344,7 +258,7 @@ def _compute_binary_kappa(df_ex, q_label):
 
 # ── Section renderers ─────────────────────────────────────────────────────────
 
-def _section_6_1(df, df_ex):
+def _section_6_1(df, icc_table):
     st.subheader("6.1  Paired Observations Summary")
     st.markdown(
         f"**Participant {EXCLUDED_PARTICIPANT} is excluded** — Therapist-only record "
@@ -367,16 +281,9 @@ def _section_6_1(df, df_ex):
     # Per-item pairing summary
     st.markdown("---")
     st.markdown("**Paired observations available per quantitative item:**")
-    rows = []
-    for col, q in _get_quant_cols(df_ex):
-        paired = _build_paired_long(df_ex, col)
-        rows.append({
-            'Q':             q,
-            'Description':   ITEM_DESC.get(q, q),
-            'Domain':        _domain_for(q),
-            'Paired (P×S)':  paired['Participant_Session'].nunique(),
-        })
-    pair_df = pd.DataFrame(rows).sort_values('Q').reset_index(drop=True)
+    pair_df = icc_table[['Q', 'Description', 'Domain', 'Paired N']].rename(
+        columns={'Paired N': 'Paired (P×S)'}
+    )
     st.dataframe(pair_df, use_container_width=True)
 
 
@@ -391,17 +298,11 @@ def _section_6_3(icc_table):
         "<span style='background:#2ca02c;color:white;padding:3px 10px;border-radius:12px;font-size:13px'>Good 0.60–0.74</span>"
         "<span style='background:#1f77b4;color:white;padding:3px 10px;border-radius:12px;font-size:13px'>Excellent ≥ 0.75</span>"
         "</div>"
-        "<small>ICC3 — Two-way mixed model, single measures. Raters fixed: Therapist and Parent.</small>",
+        "<small>ICC3 — Two-way mixed model, single measures. Raters fixed: Therapist and Parent. "
+        "ICC(2,1) — two-way random, absolute agreement, shown alongside.</small>",
         unsafe_allow_html=True,
     )
 
-    if not _HAS_PINGOUIN:
-        st.error(
-            "`pingouin` is not installed. ICC cannot be computed.  \n"
-            "Run `pip install pingouin` in your virtual environment and restart the app."
-        )
-        return
-
     # Show any ICC computation errors
     errors = icc_table[icc_table['_error'].str.len() > 0][['Q', 'Description', 'Paired N', '_error']]
     if not errors.empty:
@@ -455,6 +356,10 @@ def _section_6_3(icc_table):
     disp['95% CI']   = disp.apply(
         lambda r: f"[{r['CI Lower']}, {r['CI Upper']}]" if r['CI Lower'] else 'N/A', axis=1
     )
+    disp['ICC(2,1) 95% CI'] = disp.apply(
+        lambda r: (f"{r['ICC(2,1)']:.3f} [{r['ICC(2,1) CI Lower']:.3f}, {r['ICC(2,1) CI Upper']:.3f}]"
+                   if pd.notna(r['ICC(2,1)']) else 'N/A'), axis=1
+    )
     disp['p-value']  = disp['p-value'].map(lambda x: f"{x:.4f}" if pd.notna(x) else 'N/A')
     disp['Sig.']     = disp['p-value'].map(
         lambda x: '✓' if x not in ('N/A', '') and float(x) < 0.05 else ''
@@ -477,7 +382,8 @@ def _section_6_3(icc_table):
                 styles.loc[i, 'ICC'] = css.replace('font-weight:600', 'font-weight:700')
         return styles
 
-    out_cols = ['Q', 'Description', 'Domain', 'Paired N', 'ICC', '95% CI', 'p-value', 'Sig.', 'Interpretation']
+    out_cols = ['Q', 'Description', 'Domain', 'Paired N', 'ICC', '95% CI', 'p-value', 'Sig.',
+                'Interpretation', 'ICC(2,1) 95% CI']
     st.dataframe(
         disp[out_cols].style.apply(_style_table, axis=None),
         use_container_width=True,
@@ -567,13 +473,6 @@ def _section_6_4(df_ex):
 def _section_6_5(icc_table):
     st.subheader("6.5  ICC Visualisations")
 
-    if not _HAS_PINGOUIN:
-        st.error(
-            "`pingouin` is not installed.  \n"
-            "Run `pip install pingouin` in your virtual environment and restart the app."
-        )
-        return
-
     valid = icc_table.dropna(subset=['ICC']).copy()
     if valid.empty:
         st.warning("No valid ICC values to plot.")
@@ -717,17 +616,12 @@ def _section_6_5(icc_table):
 def display(df, scale_map=None):
     st.header("Section 6 — Inter-Rater Reliability (ICC)")
 
-    if not _HAS_PINGOUIN:
-        st.warning(
-            "⚠️ **`pingouin` is not installed.**  "
-            "ICC computation requires pingouin.  \n"
-            "Run `pip install pingouin` in your virtual environment and restart the app."
-        )
-
-    df_ex = df[df['Participant id'] != EXCLUDED_PARTICIPANT].copy()
+    df_ex = df[df['Participant id'] != EXCLUDED_PARTICIPANT]
 
-    with st.spinner("Computing ICC for all 21 items — this may take a few seconds…"):
-        icc_table = _build_icc_table(df_ex)
+    with st.spinner("Computing ICC for all 21 items…"):
+        # Computed once per dataset version, not on every rerun
+        icc_table = memo("eda6.icc_table", data_fingerprint(df),
+                         lambda: _build_icc_table(df_ex))
 
     tab1, tab2, tab3, tab4 = st.tabs([
         "6.1 Paired Observations",
@@ -737,7 +631,7 @@ def display(df, scale_map=None):
     ])
 
     with tab1:
-        _section_6_1(df, df_ex)
+        _section_6_1(df, icc_table)
     with tab2:
         _section_6_3(icc_table)
     with tab3:
@@ -1,8 +1,11 @@
 """
 EDA — Section 7: Correlation Analysis
 ======================================
+All statistics come from one cached corr_engine result (shared with RQ9);
+Pearson or Spearman is chosen at the top of the section.
+
 Sub-sections:
-  7.1  Inter-Item Correlation Matrix  — Pearson heatmap, all 21 items
+  7.1  Inter-Item Correlation Matrix  — heatmap, all 21 items
   7.2  Top Correlations Table         — 10 strongest positive, 10 weakest
   7.3  Domain Coherence               — Mean within-domain correlation per domain
   7.4  Item-Total Correlation         — Each item vs mean of all others; flags < 0.30
@@ -18,18 +21,23 @@ import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import matplotlib.ticker as mticker
 import seaborn as sns
-from scipy import stats
 
 _current_dir = os.path.dirname(os.path.abspath(__file__))
 if _current_dir not in sys.path:
     sys.path.insert(0, _current_dir)
 
-from questionnaire_mapping import (
-    QUESTION_MAPPING,
-    ITEM_DESC,
-    QUANT_ITEMS,
+from questionnaire_mapping import ITEM_DESC
+from data_schema import data_fingerprint
+from render_cache import pyplot_cached
+from corr_engine import (
+    item_frame,
+    cached_correlations,
+    corr_matrix,
+    pair_table,
 )
 
+MIN_PAIRS = 10          # pairs with fewer valid observations are left blank
+
 # ── Domain definitions (matching Section 6 user specification) ────────────────
 CORR_DOMAINS = {
     'Participation & Engagement':          ['Q1', 'Q2', 'Q3', 'Q4', 'Q5', 'Q6'],
@@ -69,27 +77,6 @@ def _axis_label(q):
 
 
 
-def _build_numeric_df(df):
-    """
-    Return a DataFrame with one column per QUANT_ITEM (labelled Q1, Q2…),
-    coerced to numeric, in Q-label order.
-    """
-    cols_ordered = []
-    for col, q in QUESTION_MAPPING.items():
-        if q in QUANT_ITEMS and col in df.columns:
-            cols_ordered.append((q, col))
-    cols_ordered.sort(key=lambda x: (int(x[0][1:]) if x[0][1:].isdigit() else 99))
-
-    num_df = pd.DataFrame()
-    for q, col in cols_ordered:
-        values = pd.to_numeric(df[col], errors='coerce')
-        # Q8 (Distress) is reverse-coded: high raw score = bad; apply 4 - Q8 so high = good
-        if q == 'Q8':
-            values = 4 - values
-        num_df[q] = values
-    return num_df
-
-
 def _domain_for(q_label):
     for domain, items in CORR_DOMAINS.items():
         if q_label in items:
@@ -99,15 +86,31 @@ def _domain_for(q_label):
 
 # ── Section renderers ─────────────────────────────────────────────────────────
 
-def _section_7_1(num_df):
+def _method_label(result):
+    return result['method'].capitalize()
+
+
+def _section_7_1(result, fp):
     st.subheader("7.1  Inter-Item Correlation Matrix")
     st.markdown(
-        "Pearson correlation across all **21 quantitative items**. "
-        "Pairs with fewer than 10 valid observations are shown as blank."
+        f"{_method_label(result)} correlation across all **21 quantitative items**. "
+        f"Pairs with fewer than {MIN_PAIRS} valid observations are shown as blank."
+    )
+
+    corr = corr_matrix(result, MIN_PAIRS)
+    pyplot_cached(f"eda7.heatmap.{result['method']}", fp,
+                  lambda: _heatmap_figure(corr, _method_label(result)))
+
+    # Legend for domain boundaries
+    domain_names = list(CORR_DOMAINS.keys())
+    st.markdown(
+        " · ".join(
+            f"**{d}**: {', '.join(_axis_label(q) for q in CORR_DOMAINS[d])}" for d in domain_names
+        )
     )
 
-    corr = num_df.corr(method='pearson', min_periods=10)
 
+def _heatmap_figure(corr, method_label):
     # Rename columns/index to "Q1: Engagement" style
     axis_labels = [_axis_label(q) for q in corr.columns]
     corr_display = corr.copy()
@@ -128,7 +131,7 @@ def _section_7_1(num_df):
         square=True,
         ax=ax,
         annot_kws={'size': 7.5, 'weight': 'bold'},
-        cbar_kws={'label': 'Pearson r', 'shrink': 0.8},
+        cbar_kws={'label': f'{method_label} r', 'shrink': 0.8},
         mask=corr_display.isna(),
     )
 
@@ -150,52 +153,19 @@ def _section_7_1(num_df):
         ax.axhline(boundary, color='#111', linewidth=2.0)
         ax.axvline(boundary, color='#111', linewidth=2.0)
 
-    ax.set_title("Inter-Item Pearson Correlation Matrix", fontsize=13, fontweight='bold', pad=14)
+    ax.set_title(f"Inter-Item {method_label} Correlation Matrix", fontsize=13, fontweight='bold', pad=14)
     plt.xticks(rotation=45, ha='right', fontsize=9)
     plt.yticks(rotation=0, fontsize=9)
     fig.tight_layout()
-    st.pyplot(fig)
-    plt.close(fig)
+    return fig
 
-    # Legend for domain boundaries
-    domain_names = list(CORR_DOMAINS.keys())
-    st.markdown(
-        " · ".join(
-            f"**{d}**: {', '.join(_axis_label(q) for q in CORR_DOMAINS[d])}" for d in domain_names
-        )
-    )
 
-
-def _section_7_2(num_df):
+def _section_7_2(num_df, result):
     st.subheader("7.2  Top Correlations Table")
 
-    corr = num_df.corr(method='pearson', min_periods=10)
-
-    # Extract upper-triangle pairs
-    rows = []
-    cols = corr.columns.tolist()
-    for i in range(len(cols)):
-        for j in range(i + 1, len(cols)):
-            qi, qj = cols[i], cols[j]
-            r = corr.loc[qi, qj]
-            if pd.isna(r):
-                continue
-            # t-stat and p-value
-            n = num_df[[qi, qj]].dropna().shape[0]
-            if n > 2:
-                t = r * np.sqrt(n - 2) / np.sqrt(max(1 - r ** 2, 1e-12))
-                p = 2 * stats.t.sf(abs(t), df=n - 2)
-            else:
-                p = np.nan
-            rows.append({
-                'Item A': _axis_label(qi),
-                'Item B': _axis_label(qj),
-                'r':      r,
-                'n':      n,
-                'p':      p,
-            })
-
-    pair_df = pd.DataFrame(rows).sort_values('r', ascending=False).reset_index(drop=True)
+    pair_df = pair_table(result, MIN_PAIRS)
+    pair_df['Item A'] = pair_df['Item A'].map(_axis_label)
+    pair_df['Item B'] = pair_df['Item B'].map(_axis_label)
 
     def _fmt(df_in):
         out = df_in.copy()
@@ -220,7 +190,6 @@ def _section_7_2(num_df):
     if len(pair_df) > 0:
         top = pair_df.iloc[0]
         # Reverse axis label back to Q-label for num_df indexing
-        rev = {v: k for k, v in SHORT_LABEL.items()}
         def _q(label):
             # label is "Q1: Engagement" → extract "Q1"
             return label.split(':')[0].strip()
@@ -240,15 +209,15 @@ def _section_7_2(num_df):
         plt.close(fig)
 
 
-def _section_7_3(num_df):
+def _section_7_3(result):
     st.subheader("7.3  Domain Coherence")
     st.markdown(
-        "Mean pairwise Pearson correlation **within each domain** — "
+        f"Mean pairwise {_method_label(result)} correlation **within each domain** — "
         "higher values indicate items cluster together conceptually. "
         "A value ≥ 0.30 is generally acceptable internal consistency."
     )
 
-    corr = num_df.corr(method='pearson', min_periods=10)
+    corr = corr_matrix(result, MIN_PAIRS)
     domain_rows = []
 
     for domain, items in CORR_DOMAINS.items():
@@ -264,13 +233,11 @@ def _section_7_3(num_df):
                 'Coherence': 'N/A (too few)',
             })
             continue
-        sub = corr.loc[present, present]
+        sub = corr.loc[present, present].to_numpy()
         # Upper triangle only
-        rs = [sub.iloc[i, j]
-              for i in range(len(present))
-              for j in range(i + 1, len(present))
-              if not np.isnan(sub.iloc[i, j])]
-        mean_r = np.mean(rs) if rs else np.nan
+        rs = sub[np.triu_indices_from(sub, k=1)]
+        rs = rs[~np.isnan(rs)]
+        mean_r = rs.mean() if rs.size else np.nan
         coherence = ('Strong (≥ 0.50)' if mean_r >= 0.50
                      else 'Acceptable (0.30–0.49)' if mean_r >= 0.30
                      else 'Weak (< 0.30)')
@@ -279,8 +246,8 @@ def _section_7_3(num_df):
             'Items':   ', '.join(present),
             'N items': len(present),
             'Mean r':  mean_r,
-            'Min r':   min(rs) if rs else np.nan,
-            'Max r':   max(rs) if rs else np.nan,
+            'Min r':   rs.min() if rs.size else np.nan,
+            'Max r':   rs.max() if rs.size else np.nan,
             'Coherence': coherence,
         })
 
@@ -339,37 +306,30 @@ def _section_7_3(num_df):
         plt.close(fig)
 
 
-def _section_7_4(num_df):
+def _item_total_table(result):
+    """Corrected item-total correlation of every item, highest first."""
+    it = result['item_total']
+    it_df = pd.DataFrame({
+        'Q':              it.index,
+        'Description':    [ITEM_DESC.get(q, q) for q in it.index],
+        'Domain':         [_domain_for(q) for q in it.index],
+        'r (item-total)': it['r'].to_numpy(),
+        'p-value':        it['p'].to_numpy(),
+        'n':              it['n'].to_numpy(),
+        'Flag':           np.where(it['r'].to_numpy() < 0.30, '⚠ Low (<0.30)', ''),
+    })
+    return it_df.sort_values('r (item-total)', ascending=False).reset_index(drop=True)
+
+
+def _section_7_4(result):
     st.subheader("7.4  Item-Total Correlation")
     st.markdown(
-        "Each item is correlated (Pearson) with the **mean of all other items** "
+        f"Each item is correlated ({_method_label(result)}) with the **mean of all other items** "
         "(corrected item-total correlation). "
         "Items with r **< 0.30** may be poor contributors to a composite score."
     )
 
-    items = [q for q in num_df.columns]
-    rows = []
-
-    for q in items:
-        others = [o for o in items if o != q]
-        this_item = num_df[q]
-        rest_mean = num_df[others].mean(axis=1)
-        valid = pd.concat([this_item, rest_mean], axis=1).dropna()
-        if len(valid) < 5:
-            r, p = np.nan, np.nan
-        else:
-            r, p = stats.pearsonr(valid.iloc[:, 0], valid.iloc[:, 1])
-        rows.append({
-            'Q':             q,
-            'Description':   ITEM_DESC.get(q, q),
-            'Domain':        _domain_for(q),
-            'r (item-total)': r,
-            'p-value':        p,
-            'n':              len(valid),
-            'Flag':           '⚠ Low (<0.30)' if pd.notna(r) and r < 0.30 else '',
-        })
-
-    it_df = pd.DataFrame(rows).sort_values('r (item-total)', ascending=False).reset_index(drop=True)
+    it_df = _item_total_table(result)
 
     # Styled table — apply styling on numeric it_df, format via styler
     def _style_it(row):
@@ -439,10 +399,15 @@ def _section_7_4(num_df):
 def display(df, scale_map=None):
     st.header("Section 7 — Correlation Analysis")
 
-    num_df = _build_numeric_df(df)
+    num_df = item_frame(df)
     if num_df.empty:
         st.error("No quantitative columns found in the dataset.")
         return
+    fp = data_fingerprint(df)
+
+    method = st.radio("Correlation method", ["Pearson", "Spearman"],
+                      horizontal=True, key="eda7_method").lower()
+    result = cached_correlations(num_df, fp, method)
 
     tab1, tab2, tab3, tab4 = st.tabs([
         "7.1 Correlation Matrix",
@@ -452,10 +417,10 @@ def display(df, scale_map=None):
     ])
 
     with tab1:
-        _section_7_1(num_df)
+        _section_7_1(result, fp)
     with tab2:
-        _section_7_2(num_df)
+        _section_7_2(num_df, result)
     with tab3:
-        _section_7_3(num_df)
+        _section_7_3(result)
     with tab4:
-        _section_7_4(num_df)
+        _section_7_4(result)
@@ -14,6 +14,7 @@ Results are read from  results/lme/
     model_diagnostics.png
     random_effects_distribution.png
     forest_plot_fixed_effects.png
+    cv_scores.csv                  (python src/run_lme_pipeline.py --cv)
 """
 
 import os
@@ -300,6 +301,65 @@ A CI that does not cross zero (red dashed line) indicates a statistically signif
     _show_img('forest_plot_fixed_effects.png', 'Fixed effect estimates with 95% confidence intervals')
 
 
+def _render_cross_validation():
+    st.subheader("Leave-One-Participant-Out Cross-Validation")
+
+    cv = _read('cv_scores.csv')
+    if cv is None:
+        st.info(
+            "Cross-validation scores have not been generated yet.  \n"
+            "Run `python src/run_lme_pipeline.py --cv` (add `--parallel` to spread "
+            "the folds over worker processes)."
+        )
+        return
+
+    st.markdown("""
+Each participant is held out in turn, every candidate model is refitted on the
+remaining participants, and the held-out records are predicted at the
+population level (no random intercept is available for an unseen participant).
+
+- **RMSE / MAE** — prediction error of the held-out Engagement Scores (lower is better)
+- **ELPD** — summed held-out log predictive density of each participant's records,
+  using the fitted random-intercept covariance (higher is better)
+
+Scores are only comparable **within a dataset**: Models 1–2 use the full data,
+the sentiment models use the sentiment subset.
+""")
+
+    st.dataframe(cv, use_container_width=True, hide_index=True)
+
+    summary = _read('lme_summary.csv')
+    if summary is not None:
+        lrt_best = summary.set_index('Metric')['Value'].get('Best_Model')
+        sent = cv[cv['Dataset'] == 'sent']
+        if lrt_best is not None and not sent.empty:
+            cv_best = sent.loc[sent['ELPD'].idxmax(), 'Model']
+            if cv_best == lrt_best:
+                st.success(f"Cross-validation agrees with the LRT selection: **{lrt_best}** "
+                           "has the highest held-out ELPD on the sentiment subset.")
+            else:
+                st.warning(f"The LRT selected **{lrt_best}**, but **{cv_best}** has the "
+                           "highest held-out ELPD on the sentiment subset.")
+
+    import matplotlib.pyplot as plt
+    fig, axes = plt.subplots(1, 2, figsize=(12, 4))
+    colours = ['#d62728' if b else '#1f77b4' for b in cv['Best_in_Dataset'].astype(bool)]
+    labels = [f"{m}\n[{d}]" for m, d in zip(cv['Model'], cv['Dataset'])]
+    axes[0].bar(labels, cv['RMSE'], color=colours, edgecolor='black')
+    axes[0].set_ylabel('Held-out RMSE')
+    axes[0].set_title('Prediction error (lower is better)')
+    axes[1].bar(labels, cv['ELPD'], yerr=cv['ELPD_SE'], color=colours,
+                edgecolor='black', capsize=4)
+    axes[1].set_ylabel('ELPD')
+    axes[1].set_title('Held-out log predictive density (red = best in dataset)')
+    for ax in axes:
+        ax.tick_params(axis='x', rotation=20, labelsize=8)
+        ax.grid(axis='y', alpha=0.3)
+    plt.tight_layout()
+    st.pyplot(fig)
+    plt.close()
+
+
 def _render_rq_summary():
     st.subheader("Research Question Summary")
 
@@ -435,6 +495,7 @@ def display(df=None, scale_map=None):
         "Coefficients",
         "Diagnostics",
         "Forest Plot",
+        "Cross-Validation",
         "RQ Summary",
     ])
 
@@ -454,4 +515,7 @@ def display(df=None, scale_map=None):
         _render_forest()
 
     with tabs[5]:
+        _render_cross_validation()
+
+    with tabs[6]:
         _render_rq_summary()
@@ -38,14 +38,19 @@ from silver_to_gold_transformation import (  # noqa: E402
     norm_label  as _norm_label,
     get_gold_path as _gold_path,
     build_gold_df,
+    save_aggregate_cube,
 )
+from layer_storage import write_parquet  # noqa: E402
+from data_schema import attach_fingerprint, data_fingerprint, derived_fingerprint  # noqa: E402
+from render_cache import invalidate, memo  # noqa: E402
 
 
 # ── Cached wrapper (Streamlit cache stays in the UI layer) ────────────────────
-@st.cache_data(show_spinner=False)
 def _build_gold_df(df: pd.DataFrame) -> pd.DataFrame:
-    """Cached wrapper around build_gold_df for Streamlit."""
-    return build_gold_df(df)
+    """build_gold_df memoised per Silver data fingerprint; the Gold frame carries its own."""
+    fp = data_fingerprint(df)
+    gold = memo("gold.build", fp, lambda: build_gold_df(df))
+    return attach_fingerprint(gold, derived_fingerprint(fp, 'gold'))
 
 
 # ── Helpers ────────────────────────────────────────────────────────────────────
@@ -197,10 +202,13 @@ def _render_a4(gold: pd.DataFrame):
     if st.button("💾  Save / Overwrite Gold Dataset", type="primary"):
         os.makedirs(os.path.dirname(path), exist_ok=True)
         gold.to_csv(path, index=False)
+        write_parquet(gold, path)
         st.success(f"Saved → `{path}`")
         st.caption(f"Rows: {len(gold):,}   Columns: {len(gold.columns)}")
-        # Clear cache so next load picks up new file
-        st.cache_data.clear()
+        st.caption(save_aggregate_cube(gold))
+        # The cube may have been read from the file just rewritten; nothing
+        # else cached is read from the Gold files
+        invalidate('session_cube')
 
     if already_saved:
         try:
@@ -1,8 +1,17 @@
+import os
+import sys
+
 import streamlit as st
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+if _current_dir not in sys.path:
+    sys.path.insert(0, _current_dir)
+
+from session_cube import load_cube, session_means
+
 def display(df, scale_map=None):
     """Display RQ1: Emotional Growth Analysis"""
     st.subheader("RQ1: Growth in Engagement & Connection")
@@ -14,7 +23,8 @@ def display(df, scale_map=None):
     st.markdown("**Q1 (Engagement):** " + q1)
     st.markdown("**Q3 (Connection):** " + q3)
     
-    trend = df.groupby('Session number')[[q1, q3]].mean().reset_index()
+    cube = load_cube(df)
+    trend = session_means(cube, [q1, q3])
     
     fig, ax = plt.subplots(figsize=(12, 7))
     fig.patch.set_facecolor('white')
@@ -76,19 +86,18 @@ def display(df, scale_map=None):
     st.markdown("**Engagement and Emotional Connection: Comparing Parent and Therapist Observations**")
     
     # Map Submitted_by to standardize parent/therapist labels (P/C already mapped to P in Silver data)
-    df_perspective = df.copy()
-    df_perspective['Perspective'] = df_perspective['Submitted_by'].map({
+    df_perspective = df.assign(Perspective=df['Submitted_by'].map({
         'T': 'Therapist',
         'P': 'Parent'
-    }).fillna('Other')
+    }).fillna('Other'))
     
     # Filter to only Parent and Therapist data
-    df_perspective = df_perspective[df_perspective['Perspective'].isin(['Parent', 'Therapist'])].copy()
+    df_perspective = df_perspective[df_perspective['Perspective'].isin(['Parent', 'Therapist'])]
     
     if len(df_perspective) > 0:
         # Calculate trends by perspective and session
-        parent_trend = df_perspective[df_perspective['Perspective'] == 'Parent'].groupby('Session number')[[q1, q3]].mean().reset_index()
-        therapist_trend = df_perspective[df_perspective['Perspective'] == 'Therapist'].groupby('Session number')[[q1, q3]].mean().reset_index()
+        parent_trend = session_means(cube, [q1, q3], observer='P')
+        therapist_trend = session_means(cube, [q1, q3], observer='T')
         
         # Create visualization
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
@@ -221,7 +230,7 @@ def display(df, scale_map=None):
         
         # Plot 1: Engagement (Q1) trends by autism level
         for autism_level in autism_levels:
-            autism_trend = df[df['Autism Level'] == autism_level].groupby('Session number')[[q1, q3]].mean().reset_index()
+            autism_trend = session_means(cube, [q1, q3], autism=autism_level)
             
             if len(autism_trend) > 0:
                 color = colors_map.get(autism_level, '#95a5a6')
@@ -256,7 +265,7 @@ def display(df, scale_map=None):
         
         # Plot 2: Emotional Connection (Q3) trends by autism level
         for autism_level in autism_levels:
-            autism_trend = df[df['Autism Level'] == autism_level].groupby('Session number')[[q1, q3]].mean().reset_index()
+            autism_trend = session_means(cube, [q1, q3], autism=autism_level)
             
             if len(autism_trend) > 0:
                 color = colors_map.get(autism_level, '#95a5a6')
@@ -324,8 +333,8 @@ def display(df, scale_map=None):
     
     if len(age_filtered_df) > 0:
         # Calculate trends by gender and session
-        male_trend = age_filtered_df[age_filtered_df['Gender'] == 'Male'].groupby('Session number')[[q1, q3]].mean().reset_index()
-        female_trend = age_filtered_df[age_filtered_df['Gender'] == 'Female'].groupby('Session number')[[q1, q3]].mean().reset_index()
+        male_trend = session_means(cube, [q1, q3], age_group='8-14', gender='Male')
+        female_trend = session_means(cube, [q1, q3], age_group='8-14', gender='Female')
         
         # Create visualization
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
@@ -434,8 +443,8 @@ def display(df, scale_map=None):
     
     if len(age_filtered_df_15_19) > 0:
         # Calculate trends by gender and session
-        male_trend_15_19 = age_filtered_df_15_19[age_filtered_df_15_19['Gender'] == 'Male'].groupby('Session number')[[q1, q3]].mean().reset_index()
-        female_trend_15_19 = age_filtered_df_15_19[age_filtered_df_15_19['Gender'] == 'Female'].groupby('Session number')[[q1, q3]].mean().reset_index()
+        male_trend_15_19 = session_means(cube, [q1, q3], age_group='15-19', gender='Male')
+        female_trend_15_19 = session_means(cube, [q1, q3], age_group='15-19', gender='Female')
         
         # Create visualization
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
@@ -544,8 +553,8 @@ def display(df, scale_map=None):
     
     if len(age_filtered_df_20_26) > 0:
         # Calculate trends by gender and session
-        male_trend_20_26 = age_filtered_df_20_26[age_filtered_df_20_26['Gender'] == 'Male'].groupby('Session number')[[q1, q3]].mean().reset_index()
-        female_trend_20_26 = age_filtered_df_20_26[age_filtered_df_20_26['Gender'] == 'Female'].groupby('Session number')[[q1, q3]].mean().reset_index()
+        male_trend_20_26 = session_means(cube, [q1, q3], age_group='20-26', gender='Male')
+        female_trend_20_26 = session_means(cube, [q1, q3], age_group='20-26', gender='Female')
         
         # Create visualization
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
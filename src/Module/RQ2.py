@@ -1,19 +1,16 @@
+import os
+import sys
+
 import streamlit as st
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 
-def categorize_age_groups(age):
-    """Categorize age into groups"""
-    if pd.isna(age):
-        return None
-    age = int(age)
-    if age <= 14:
-        return '8-14'
-    elif age <= 19:
-        return '15-19'
-    else:
-        return '20-26'
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+if _current_dir not in sys.path:
+    sys.path.insert(0, _current_dir)
+
+from participant_dim import STUDY_AGE_GROUPS, join_participants, load_participants, study_age_group
+from session_cube import load_cube, session_means
 
 def display(df, scale_map=None):
     """Display RQ2: Distress Reduction Analysis"""
@@ -22,7 +19,8 @@ def display(df, scale_map=None):
     q8 = "Did the participant exhibit distress, boredom, or frustration?"
     st.markdown("**Q8:** " + q8)
     
-    trend = df.groupby('Session number')[q8].mean().reset_index()
+    cube = load_cube(df)
+    trend = session_means(cube, q8)
     
     fig, ax = plt.subplots(figsize=(12, 7))
     fig.patch.set_facecolor('white')
@@ -72,13 +70,14 @@ def display(df, scale_map=None):
     st.markdown("**Age Group Analysis**")
     
     # Prepare data with age groups
-    df_with_age = df[["Session number", q8, "Age"]].copy()
+    age_groups_order = ['8-14', '15-19', '20-26']
+    df_with_age = df[["Session number", q8, "Participant id"]].copy()
     df_with_age = df_with_age.dropna(subset=[q8])
-    df_with_age['Age Group'] = df_with_age['Age'].apply(categorize_age_groups)
+    df_with_age['Age Group'] = study_age_group(
+        join_participants(df_with_age, 'Age_Group', load_participants(df)))
     df_with_age = df_with_age.dropna(subset=['Age Group'])
     
     # Create age group trend analysis
-    age_groups_order = ['8-14', '15-19', '20-26']
     
     fig, ax = plt.subplots(figsize=(12, 7))
     fig.patch.set_facecolor('white')
@@ -90,7 +89,8 @@ def display(df, scale_map=None):
     for age_group in age_groups_order:
         age_data = df_with_age[df_with_age['Age Group'] == age_group]
         if len(age_data) > 0:
-            trend_age = age_data.groupby('Session number')[q8].mean().reset_index()
+            trend_age = session_means(cube, q8, dropna=True,
+                                      age_group=STUDY_AGE_GROUPS[age_group])
             if not trend_age.empty:
                 ax.plot(trend_age['Session number'], trend_age[q8], 
                        marker='o', linewidth=2.5, markersize=10, 
@@ -151,7 +151,8 @@ def display(df, scale_map=None):
         for gender in genders:
             gender_data = df_age_8_14[df_age_8_14['Gender'] == gender]
             if len(gender_data) > 0:
-                trend_gender = gender_data.groupby('Session number')[q8].mean().reset_index()
+                trend_gender = session_means(cube, q8, dropna=True,
+                                             age_group=STUDY_AGE_GROUPS['8-14'], gender=gender)
                 if not trend_gender.empty:
                     marker = 'o' if gender == 'Male' else 's'
                     ax.plot(trend_gender['Session number'], trend_gender[q8], 
@@ -211,7 +212,7 @@ def display(df, scale_map=None):
     for autism_level in autism_levels:
         autism_data = df_with_autism[df_with_autism["Autism Level"] == autism_level]
         if len(autism_data) > 0:
-            trend_autism = autism_data.groupby('Session number')[q8].mean().reset_index()
+            trend_autism = session_means(cube, q8, dropna=True, autism=autism_level)
             if not trend_autism.empty:
                 ax.plot(trend_autism['Session number'], trend_autism[q8], 
                        marker='o', linewidth=2.5, markersize=10, 
@@ -260,8 +261,8 @@ def display(df, scale_map=None):
     df_with_perspective = df[["Session number", q8, "Submitted_by"]].copy()
     df_with_perspective = df_with_perspective.dropna(subset=[q8, "Submitted_by"])
     
-    trend_T = df_with_perspective[df_with_perspective['Submitted_by']=='T'].groupby('Session number')[q8].mean().reset_index()
-    trend_P = df_with_perspective[df_with_perspective['Submitted_by']=='P'].groupby('Session number')[q8].mean().reset_index()
+    trend_T = session_means(cube, q8, dropna=True, observer='T')
+    trend_P = session_means(cube, q8, dropna=True, observer='P')
     
     fig, ax = plt.subplots(figsize=(12, 7))
     fig.patch.set_facecolor('white')
@@ -1,8 +1,18 @@
+import os
+import sys
+
 import streamlit as st
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+if _current_dir not in sys.path:
+    sys.path.insert(0, _current_dir)
+
+from participant_dim import join_participants
+from session_cube import load_cube, session_means
+
 def display(df, scale_map=None):
     """Display RQ3: Real-World Generalization Analysis"""
     st.subheader("RQ3: Skill Transfer to Daily Life")
@@ -13,7 +23,8 @@ def display(df, scale_map=None):
     st.markdown("**Q22 (Generalization):** " + q22)
     st.markdown("**Q25 (Linking to Life):** " + q25)
     
-    trend = df.groupby('Session number')[[q22, q25]].mean().reset_index()
+    cube = load_cube(df)
+    trend = session_means(cube, [q22, q25])
     
     fig, ax = plt.subplots(figsize=(12, 7))
     fig.patch.set_facecolor('white')
@@ -69,19 +80,18 @@ def display(df, scale_map=None):
     st.markdown("**Generalization and Real-Life Linking: Comparing Parent and Therapist Observations**")
     
     # Map Submitted_by to standardize parent/therapist labels
-    df_perspective = df.copy()
-    df_perspective['Perspective'] = df_perspective['Submitted_by'].map({
+    df_perspective = df.assign(Perspective=df['Submitted_by'].map({
         'T': 'Therapist',
         'P': 'Parent'
-    }).fillna('Other')
+    }).fillna('Other'))
     
     # Filter to only Parent and Therapist data
-    df_perspective = df_perspective[df_perspective['Perspective'].isin(['Parent', 'Therapist'])].copy()
+    df_perspective = df_perspective[df_perspective['Perspective'].isin(['Parent', 'Therapist'])]
     
     if len(df_perspective) > 0:
         # Calculate trends by perspective and session
-        parent_trend = df_perspective[df_perspective['Perspective'] == 'Parent'].groupby('Session number')[[q22, q25]].mean().reset_index()
-        therapist_trend = df_perspective[df_perspective['Perspective'] == 'Therapist'].groupby('Session number')[[q22, q25]].mean().reset_index()
+        parent_trend = session_means(cube, [q22, q25], observer='P')
+        therapist_trend = session_means(cube, [q22, q25], observer='T')
         
         # Create visualization
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
@@ -193,7 +203,7 @@ def display(df, scale_map=None):
         
         # Plot 1: Generalization (Q22) trends by autism level
         for autism_level in autism_levels:
-            autism_trend = df[df['Autism Level'] == autism_level].groupby('Session number')[[q22, q25]].mean().reset_index()
+            autism_trend = session_means(cube, [q22, q25], autism=autism_level)
             
             if len(autism_trend) > 0:
                 color = colors_map.get(autism_level, '#95a5a6')
@@ -232,7 +242,7 @@ def display(df, scale_map=None):
         
         # Plot 2: Real-Life Linking (Q25) trends by autism level
         for autism_level in autism_levels:
-            autism_trend = df[df['Autism Level'] == autism_level].groupby('Session number')[[q22, q25]].mean().reset_index()
+            autism_trend = session_means(cube, [q22, q25], autism=autism_level)
             
             if len(autism_trend) > 0:
                 color = colors_map.get(autism_level, '#95a5a6')
@@ -279,11 +289,10 @@ def display(df, scale_map=None):
     st.subheader("Age Group Analysis")
     st.markdown("**Generalization and Real-Life Linking Trends by Age Group**")
     
-    # Define age groups
-    age_bins = [8, 15, 20, 27]
+    # Age groups from the participant dimension, restricted to the study's three bands
     age_labels = ['8-14', '15-19', '20-26']
-    df_age = df.copy()
-    df_age['Age Group'] = pd.cut(df_age['Age'], bins=age_bins, labels=age_labels, right=False)
+    df_age = df.assign(**{'Age Group': pd.Categorical(join_participants(df, 'Age_Group'),
+                                                     categories=age_labels)})
     
     age_groups = sorted(df_age['Age Group'].dropna().unique())
     
@@ -301,7 +310,7 @@ def display(df, scale_map=None):
         
         # Plot 1: Generalization (Q22) trends by age group
         for age_group in age_groups:
-            age_trend = df_age[df_age['Age Group'] == age_group].groupby('Session number')[[q22, q25]].mean().reset_index()
+            age_trend = session_means(cube, [q22, q25], age_group=age_group)
             
             if len(age_trend) > 0:
                 color = age_colors_map.get(age_group, '#95a5a6')
@@ -338,7 +347,7 @@ def display(df, scale_map=None):
         
         # Plot 2: Real-Life Linking (Q25) trends by age group
         for age_group in age_groups:
-            age_trend = df_age[df_age['Age Group'] == age_group].groupby('Session number')[[q22, q25]].mean().reset_index()
+            age_trend = session_means(cube, [q22, q25], age_group=age_group)
             
             if len(age_trend) > 0:
                 color = age_colors_map.get(age_group, '#95a5a6')
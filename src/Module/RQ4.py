@@ -1,8 +1,17 @@
+import os
+import sys
+
 import streamlit as st
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+if _current_dir not in sys.path:
+    sys.path.insert(0, _current_dir)
+
+from session_cube import load_cube, session_means
+
 def display(df, scale_map=None):
     """Display RQ4: Family Relationship Impact"""
     st.subheader("RQ4: Family Relationship Impact")
@@ -14,8 +23,9 @@ def display(df, scale_map=None):
     base = df[['Session number', 'Submitted_by', q13]].copy()
     base = base.dropna(subset=[q13])
     
-    trend_T = base[base['Submitted_by']=='T'].groupby('Session number')[q13].mean().reset_index()
-    trend_P = base[base['Submitted_by']=='P'].groupby('Session number')[q13].mean().reset_index()
+    cube = load_cube(df)
+    trend_T = session_means(cube, q13, dropna=True, observer='T')
+    trend_P = session_means(cube, q13, dropna=True, observer='P')
     
     fig, ax = plt.subplots(figsize=(12, 7))
     fig.patch.set_facecolor('white')
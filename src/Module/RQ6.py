@@ -1,7 +1,18 @@
+import os
+import sys
+
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+if _current_dir not in sys.path:
+    sys.path.insert(0, _current_dir)
+
+from dataset_handle import derived_column
+from participant_dim import join_participants
+from session_cube import load_cube, session_means
+
 
 def display(df, scale_map=None):
     """Display RQ6: Response Time Trends"""
@@ -9,41 +20,12 @@ def display(df, scale_map=None):
     response_col = "What is the response time of the participant? (in minutes roughly)"
     st.markdown("**Q15:** " + response_col)
     
-    # Check if response_seconds column exists, if not parse it
-    if 'response_seconds' not in df.columns:
-        import numpy as np
-        import re
-        
-        def parse_response_time(val):
-            if pd.isna(val):
-                return np.nan
-            val = str(val).lower().strip()
-            if any(x in val for x in ['null', 'nothing', 'not response']):
-                return np.nan
-            # Range handling
-            range_match = re.findall(r'(\d+)\s*[-to]+\s*(\d+)\s*(min|minute|minutes|sec|second|seconds)?', val)
-            if range_match:
-                start, end, unit = range_match[0]
-                avg = (float(start) + float(end)) / 2
-                if unit and 'min' in unit:
-                    return avg * 60
-                return avg
-            # Minutes
-            min_match = re.search(r'(\d+(?:\.\d+)?)\s*(min|minute|minutes)', val)
-            if min_match:
-                return float(min_match.group(1)) * 60
-            # Seconds
-            sec_match = re.search(r'(\d+(?:\.\d+)?)\s*(sec|second|seconds)', val)
-            if sec_match:
-                return float(sec_match.group(1))
-            return np.nan
-        
-        if response_col in df.columns:
-            df['response_seconds'] = df[response_col].apply(parse_response_time)
-    
+    # response_seconds is parsed from Q15 in the Silver layer (data_transformation)
+    cube = load_cube(df)
+
     # Calculate average response time per session
     if 'response_seconds' in df.columns:
-        trend = df[df['response_seconds'].notna()].groupby('Session number')['response_seconds'].mean().reset_index()
+        trend = session_means(cube, 'response_seconds', dropna=True)
         
         fig, ax = plt.subplots(figsize=(12, 7))
         fig.patch.set_facecolor('white')
@@ -87,7 +69,11 @@ def display(df, scale_map=None):
         st.write("")
         
         if 'Autism Level' in df.columns:
-            autism_trend = df[df['response_seconds'].notna()].groupby(['Session number', 'Autism Level'])['response_seconds'].mean().reset_index()
+            autism_trend = pd.concat(
+                [session_means(cube, 'response_seconds', dropna=True, autism=level)
+                 .assign(**{'Autism Level': level})
+                 for level in sorted(df['Autism Level'].dropna().unique())],
+                ignore_index=True)
             
             fig2, ax2 = plt.subplots(figsize=(12, 7))
             fig2.patch.set_facecolor('white')
@@ -191,20 +177,16 @@ def display(df, scale_map=None):
     st.markdown("**Response Time Trends for Age Groups: 8-14, 15-19, 20-26**")
     
     if 'Age' in df.columns and 'response_seconds' in df.columns:
-        import numpy as np
-        
-        # Define age groups
-        age_bins = [0, 8, 15, 20, 27, 100]
-        age_labels = ['<8', '8-14', '15-19', '20-26', '27+']
-        df_age = df.copy()
-        df_age['Age_Group'] = pd.cut(df_age['Age'], bins=age_bins, labels=age_labels, right=False)
+        # Age group per row (participant dimension), shared across sessions
+        age_group = derived_column(df, 'participants.Age_Group',
+                                   lambda d: join_participants(d, 'Age_Group'))
         
         age_groups_to_plot = ['8-14', '15-19', '20-26']
-        df_age_filtered = df_age[df_age['Age_Group'].isin(age_groups_to_plot) & df_age['response_seconds'].notna()]
+        df_age_filtered = df[age_group.isin(age_groups_to_plot) & df['response_seconds'].notna()]
         
         # Age Group 8-14: Annotation ABOVE the line
         if len(df_age_filtered) > 0:
-            age_8_14_data = df_age_filtered[df_age_filtered['Age_Group'] == '8-14'].groupby('Session number')['response_seconds'].mean().reset_index()
+            age_8_14_data = session_means(cube, 'response_seconds', dropna=True, age_group='8-14')
             
             if len(age_8_14_data) > 0:
                 st.markdown("#### Age Group 8-14")
@@ -239,7 +221,7 @@ def display(df, scale_map=None):
                 st.write("")
         
         # Age Group 15-19: Annotation BELOW the line
-        age_15_19_data = df_age_filtered[df_age_filtered['Age_Group'] == '15-19'].groupby('Session number')['response_seconds'].mean().reset_index()
+        age_15_19_data = session_means(cube, 'response_seconds', dropna=True, age_group='15-19')
         
         if len(age_15_19_data) > 0:
             st.markdown("#### Age Group 15-19")
@@ -274,7 +256,7 @@ def display(df, scale_map=None):
             st.write("")
         
         # Age Group 20-26: Annotation IN THE MIDDLE of the line
-        age_20_26_data = df_age_filtered[df_age_filtered['Age_Group'] == '20-26'].groupby('Session number')['response_seconds'].mean().reset_index()
+        age_20_26_data = session_means(cube, 'response_seconds', dropna=True, age_group='20-26')
         
         if len(age_20_26_data) > 0:
             st.markdown("#### Age Group 20-26")
@@ -315,11 +297,9 @@ def display(df, scale_map=None):
     st.markdown("**Response Time Trends for Male and Female**")
     
     if 'Gender' in df.columns and 'response_seconds' in df.columns:
-        df_gender = df[df['response_seconds'].notna()].copy()
-        
         # Get data for both male and female
-        male_data = df_gender[df_gender['Gender'] == 'Male'].groupby('Session number')['response_seconds'].mean().reset_index()
-        female_data = df_gender[df_gender['Gender'] == 'Female'].groupby('Session number')['response_seconds'].mean().reset_index()
+        male_data = session_means(cube, 'response_seconds', dropna=True, gender='Male')
+        female_data = session_means(cube, 'response_seconds', dropna=True, gender='Female')
         
         if len(male_data) > 0 or len(female_data) > 0:
             fig_gender, ax_gender = plt.subplots(figsize=(12, 7))
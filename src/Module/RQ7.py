@@ -1,8 +1,17 @@
+import os
+import sys
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+if _current_dir not in sys.path:
+    sys.path.insert(0, _current_dir)
+
+from dataset_handle import derived_column
+
 
 def display(df, scale_map=None):
     """Display RQ7: Personalization & Verbal Participation Correlation"""
@@ -26,11 +35,11 @@ def display(df, scale_map=None):
     st.markdown("**Q2 (Personalization):** " + q2_col)
     st.markdown("**Q4 (Verbal Participation):** " + q4_col)
     
-    # Convert to numeric and drop nulls
-    df[q2_col] = pd.to_numeric(df[q2_col], errors='coerce')
-    df[q4_col] = pd.to_numeric(df[q4_col], errors='coerce')
-    
-    clean_df = df[[q2_col, q4_col]].dropna()
+    # Numeric Q2 / Q4 (shared derived columns — the dataset itself is read-only), drop nulls
+    clean_df = pd.DataFrame({
+        col: derived_column(df, f'numeric.{col}', lambda d, col=col: pd.to_numeric(d[col], errors='coerce'))
+        for col in [q2_col, q4_col]
+    }).dropna()
     
     if len(clean_df) == 0:
         st.info("No valid data pairs available for correlation analysis.")
@@ -1,15 +1,25 @@
+import os
+import sys
+
 import streamlit as st
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+if _current_dir not in sys.path:
+    sys.path.insert(0, _current_dir)
+
+from session_cube import load_cube, session_means
+
 def display(df, scale_map=None):
     """Display RQ8 Overall Social Behaviour Impact"""
     st.subheader("RQ8: Overall Social Behaviour Improvement")
     q26 = "How much different scenarios stories impact overall social behaviour ?"
     st.markdown("**Q26:** " + q26)
     
-    trend = df.groupby('Session number')[q26].mean().reset_index()
+    cube = load_cube(df)
+    trend = session_means(cube, q26)
     
     fig, ax = plt.subplots(figsize=(12, 7))
     fig.patch.set_facecolor('white')
@@ -55,7 +65,10 @@ def display(df, scale_map=None):
     
     # Prepare data by autism level
     if 'Autism Level' in df.columns:
-        autism_trend = df.groupby(['Session number', 'Autism Level'])[q26].mean().reset_index()
+        autism_trend = pd.concat(
+            [session_means(cube, q26, autism=level).assign(**{'Autism Level': level})
+             for level in sorted(df['Autism Level'].dropna().unique())],
+            ignore_index=True)
         
         fig2, ax2 = plt.subplots(figsize=(12, 7))
         fig2.patch.set_facecolor('white')
@@ -114,11 +127,13 @@ def display(df, scale_map=None):
     if 'Submitted_by' in df.columns:
         # Create perspective mapping
         perspective_map = {'T': 'Therapist', 'P': 'Parent'}
-        df_copy = df.copy()
-        df_copy['Perspective'] = df_copy['Submitted_by'].map(perspective_map)
+        df_copy = df.assign(Perspective=df['Submitted_by'].map(perspective_map))
         
         # Prepare data by perspective
-        perspective_trend = df_copy.groupby(['Session number', 'Perspective'])[q26].mean().reset_index()
+        perspective_trend = pd.concat(
+            [session_means(cube, q26, observer=code).assign(Perspective=label)
+             for code, label in perspective_map.items()],
+            ignore_index=True)
         
         fig3, ax3 = plt.subplots(figsize=(12, 7))
         fig3.patch.set_facecolor('white')
@@ -194,8 +209,7 @@ def display(df, scale_map=None):
         # Define age groups
         age_bins = [0, 8, 15, 20, 27, 36, 100]
         age_labels = ['<8', '8-14', '15-19', '20-26', '27-35', '36+']
-        df_age = df.copy()
-        df_age['Age_Group'] = pd.cut(df_age['Age'], bins=age_bins, labels=age_labels, right=False)
+        df_age = df.assign(Age_Group=pd.cut(df['Age'], bins=age_bins, labels=age_labels, right=False))
         
         # Get unique age groups
         age_groups = sorted(df_age['Age_Group'].dropna().unique())
@@ -211,7 +225,7 @@ def display(df, scale_map=None):
             
             # Plot line for each age group
             for age_group in age_groups:
-                age_trend = df_age[df_age['Age_Group'] == age_group].groupby('Session number')[q26].mean().reset_index()
+                age_trend = session_means(cube, q26, age_group=age_group)
                 
                 if len(age_trend) > 0:
                     ax4.plot(age_trend['Session number'], age_trend[q26], 
@@ -301,7 +315,7 @@ def display(df, scale_map=None):
             
             # Plot line for each gender
             for idx, gender in enumerate(sorted(gender_groups)):
-                gender_trend = df[df['Gender'] == gender].groupby('Session number')[q26].mean().reset_index()
+                gender_trend = session_means(cube, q26, gender=gender)
                 
                 if len(gender_trend) > 0:
                     color = gender_color_map.get(gender, colors_gender[idx % len(colors_gender)])
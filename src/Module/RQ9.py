@@ -1,9 +1,20 @@
+import os
+import sys
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+if _current_dir not in sys.path:
+    sys.path.insert(0, _current_dir)
+
+from questionnaire_mapping import QUESTION_MAPPING
+from data_schema import data_fingerprint
+from corr_engine import item_frame, cached_correlations, corr_matrix
+
 def display(df, scale_map=None):
     """Display RQ9: Correlation Heatmap of All Questions"""
     st.subheader("RQ9: Correlation Analysis - all Questions (Q1-Q25)")
@@ -42,9 +53,8 @@ def display(df, scale_map=None):
         return
     
     # Convert all question columns to numeric to avoid errors
-    df_numeric = df.copy()
-    for question in available_questions:
-        df_numeric[question] = pd.to_numeric(df_numeric[question], errors='coerce')
+    df_numeric = pd.DataFrame({question: pd.to_numeric(df[question], errors='coerce')
+                               for question in available_questions}, index=df.index)
 
     # Reverse-code Q8 (Distress/boredom/frustration): raw 0=good, 4=bad → apply 4 - Q8 so 4=good
     q8_col = next((q for q in available_questions if questions_mapping[q].startswith('Q8:')), None)
@@ -59,8 +69,12 @@ def display(df, scale_map=None):
     st.write("Shows correlation coefficients between all survey questions (values range from -1 to 1)")
     st.write("")
     
-    # Create correlation matrix
-    correlation_matrix = df_numeric[available_questions].corr()
+    # Create correlation matrix — sliced from the correlation engine result
+    # that EDA Section 7 caches for the same data (Q8 is reverse-coded there too)
+    num_df = item_frame(df)
+    result = cached_correlations(num_df, data_fingerprint(df), 'pearson')
+    q_labels = [QUESTION_MAPPING[q] for q in available_questions]
+    correlation_matrix = corr_matrix(result).loc[q_labels, q_labels]
     
     # Rename columns and index with short names
     correlation_matrix.columns = available_short_names
@@ -0,0 +1,241 @@
+"""
+Correlation Engine
+==================
+Pairwise-complete correlations and their significance for every item pair at
+once, from masked matrix products instead of a Python loop over pairs.
+
+For an items frame X (rows = observations, columns = items, NaN = missing)
+with presence mask M:
+
+    n   = Mᵀ M                        pairwise-complete observation counts
+    Sx  = Xᵀ M,  Sxx = (X²)ᵀ M        sums of item i over rows where j is present
+    Sxy = Xᵀ X                        cross-products (missing entries set to 0)
+
+give r for all pairs in one pass, followed by t = r·√((n−2)/(1−r²)) and the
+two-sided p-value.  Corrected item-total correlations (item vs the mean of the
+*other* items) use the row-sum trick — rest = (row_sum − x) / (row_count − 1) —
+so no per-item frame is rebuilt.
+
+method='spearman' ranks each item over its non-missing values first.  With
+pairwise missing data this is the standard matrix form; pandas instead
+re-ranks every pair on its own complete rows, so the two can differ slightly
+when items are missing on different rows.
+
+EDA Section 7 and RQ9 read the same memoised result through
+`cached_correlations(num_df, fp, method)`, keyed on the fingerprint of the
+frame num_df was built from (data_schema.data_fingerprint), so the matrix is
+computed once per dataset and method.
+
+Run this file directly to compare against pandas / scipy and time the engine
+on the Silver data:   python src/Module/corr_engine.py
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from questionnaire_mapping import QUESTION_MAPPING, QUANT_ITEMS
+
+METHODS = ('pearson', 'spearman')
+
+
+def item_frame(df):
+    """
+    One numeric column per QUANT_ITEM (labelled Q1, Q2…) in Q-number order,
+    with Q8 (Distress) reverse-coded as 4 − Q8 so that high = good.
+    """
+    cols_ordered = [(q, col) for col, q in QUESTION_MAPPING.items()
+                    if q in QUANT_ITEMS and col in df.columns]
+    cols_ordered.sort(key=lambda x: (int(x[0][1:]) if x[0][1:].isdigit() else 99))
+
+    num_df = pd.DataFrame(index=df.index)
+    for q, col in cols_ordered:
+        values = pd.to_numeric(df[col], errors='coerce').astype(float)
+        num_df[q] = 4 - values if q == 'Q8' else values
+    return num_df
+
+
+def _prepare(num_df, method):
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+    if method == 'spearman':
+        num_df = num_df.rank()
+    return num_df.to_numpy(dtype=float)
+
+
+def _t_and_p(r, n):
+    """t statistic and two-sided p-value of r on n − 2 df (NaN when n ≤ 2)."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = r * np.sqrt(n - 2) / np.sqrt(np.maximum(1 - r ** 2, 1e-12))
+        p = 2 * stats.t.sf(np.abs(t), df=n - 2)
+    small = n <= 2
+    return np.where(small, np.nan, t), np.where(small, np.nan, p)
+
+
+def pairwise_correlations(num_df, method='pearson'):
+    """
+    r, n, t and p for every pair of columns of `num_df`.
+
+    Parameters
+    ----------
+    num_df : pd.DataFrame
+        Numeric item frame (one column per item, NaN = missing).
+    method : {'pearson', 'spearman'}
+
+    Returns
+    -------
+    dict
+        'r', 'n', 't', 'p' : square DataFrames labelled by the item columns;
+        'method'           : the method used.
+        r is NaN where it is undefined (fewer than 2 pairs or no variance);
+        use `corr_matrix` to apply a minimum-n rule.
+    """
+    x = _prepare(num_df, method)
+    mask = ~np.isnan(x)
+    m = mask.astype(float)
+    # Centre on the column means first — shift-invariant, and keeps the
+    # sums-of-squares below well conditioned.
+    xc = np.where(mask, x - np.nanmean(x, axis=0), 0.0) if x.size else x
+
+    n   = m.T @ m
+    sx  = xc.T @ m
+    sxx = (xc ** 2).T @ m
+    sxy = xc.T @ xc
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sxy - sx * sx.T / n
+        vx  = sxx - sx ** 2 / n
+        r   = np.clip(cov / np.sqrt(vx * vx.T), -1.0, 1.0)
+    r[(n < 2) | ~np.isfinite(r)] = np.nan
+    t, p = _t_and_p(r, n)
+
+    labels = num_df.columns
+    frame = lambda a: pd.DataFrame(a, index=labels, columns=labels)
+    return {'r': frame(r), 'n': frame(n.astype(int)), 't': frame(t), 'p': frame(p),
+            'method': method}
+
+
+def cached_correlations(num_df, fp, method='pearson'):
+    """
+    pairwise_correlations() and item_total_correlations() memoised per
+    (source-data fingerprint, method) for the dashboard — every page asking for
+    the same data and method shares one result.
+
+    Returns the pairwise_correlations() dict with an extra 'item_total' entry.
+    """
+    from render_cache import memo
+
+    def _compute():
+        result = pairwise_correlations(num_df, method)
+        result['item_total'] = item_total_correlations(num_df, method)
+        return result
+
+    return memo(f"corr.{method}", fp, _compute)
+
+
+def corr_matrix(result, min_periods=1):
+    """Correlation matrix with pairs below `min_periods` observations blanked."""
+    return result['r'].where(result['n'] >= min_periods)
+
+
+def pair_table(result, min_periods=1):
+    """
+    Upper-triangle pairs with a defined r, strongest first.
+
+    Columns: Item A, Item B, r, n, t, p.
+    """
+    r = corr_matrix(result, min_periods).to_numpy()
+    iu, ju = np.triu_indices_from(r, k=1)
+    keep = ~np.isnan(r[iu, ju])
+    iu, ju = iu[keep], ju[keep]
+    labels = result['r'].columns
+    table = pd.DataFrame({
+        'Item A': labels[iu],
+        'Item B': labels[ju],
+        'r':      r[iu, ju],
+        'n':      result['n'].to_numpy()[iu, ju],
+        't':      result['t'].to_numpy()[iu, ju],
+        'p':      result['p'].to_numpy()[iu, ju],
+    })
+    return table.sort_values('r', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def item_total_correlations(num_df, method='pearson', min_n=5):
+    """
+    Corrected item-total correlation of every column (item vs the mean of the
+    other items on the same row, over the rows where both are defined).
+
+    Returns a DataFrame indexed by item with columns r, n, p; r and p are NaN
+    for items with fewer than `min_n` valid rows.
+    """
+    x = num_df.to_numpy(dtype=float)
+    mask = ~np.isnan(x)
+    x0 = np.where(mask, x, 0.0)
+    row_cnt = mask.sum(axis=1, keepdims=True)
+    rest_cnt = row_cnt - mask
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rest = (x0.sum(axis=1, keepdims=True) - x0) / rest_cnt
+    valid = mask & (rest_cnt > 0)
+    a = np.where(valid, x, np.nan)
+    b = np.where(valid, rest, np.nan)
+    if method == 'spearman':
+        a = pd.DataFrame(a).rank().to_numpy()
+        b = pd.DataFrame(b).rank().to_numpy()
+    elif method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+
+    n = valid.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ac = np.where(valid, a - np.nanmean(a, axis=0), 0.0)
+        bc = np.where(valid, b - np.nanmean(b, axis=0), 0.0)
+        r = np.clip((ac * bc).sum(axis=0)
+                    / np.sqrt((ac ** 2).sum(axis=0) * (bc ** 2).sum(axis=0)), -1.0, 1.0)
+    r[(n < min_n) | ~np.isfinite(r)] = np.nan
+    _, p = _t_and_p(r, n.astype(float))
+    p = np.where(np.isnan(r), np.nan, p)
+    return pd.DataFrame({'r': r, 'n': n, 'p': p}, index=num_df.columns)
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+    import time
+
+    _here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.normpath(os.path.join(_here, '..')))
+    sys.path.insert(0, _here)
+    from layer_storage import load_layer
+    num_df = item_frame(load_layer('silver', float32=False))
+
+    for method in METHODS:
+        t0 = time.perf_counter()
+        res = pairwise_correlations(num_df, method)
+        it = item_total_correlations(num_df, method)
+        ms = 1000 * (time.perf_counter() - t0)
+        ref = num_df.corr(method=method, min_periods=10)
+        d_r = np.nanmax(np.abs(corr_matrix(res, 10) - ref).to_numpy())
+        same_nan = (corr_matrix(res, 10).isna() == ref.isna()).all().all()
+        print(f"[Corr] {method:8s} {len(num_df.columns)} items: engine {ms:.1f} ms, "
+              f"max |Δr| vs pandas {d_r:.2e}, same blanks: {same_nan}")
+
+    # Reference for p-values / item-total: the per-pair scipy loop
+    res = pairwise_correlations(num_df)
+    t0 = time.perf_counter()
+    worst_p = 0.0
+    cols = list(num_df.columns)
+    for i in range(len(cols)):
+        for j in range(i + 1, len(cols)):
+            pair = num_df[[cols[i], cols[j]]].dropna()
+            if len(pair) > 2 and pair.std().min() > 0:
+                _, p_ref = stats.pearsonr(pair.iloc[:, 0], pair.iloc[:, 1])
+                worst_p = max(worst_p, abs(res['p'].iloc[i, j] - p_ref))
+    loop_ms = 1000 * (time.perf_counter() - t0)
+    print(f"[Corr] per-pair loop {loop_ms:.1f} ms, max |Δp| vs scipy.pearsonr {worst_p:.2e}")
+
+    it = item_total_correlations(num_df)
+    worst_it = 0.0
+    for q in cols:
+        rest = num_df.drop(columns=q).mean(axis=1)
+        pair = pd.concat([num_df[q], rest], axis=1).dropna()
+        r_ref, _ = stats.pearsonr(pair.iloc[:, 0], pair.iloc[:, 1])
+        worst_it = max(worst_it, abs(it.loc[q, 'r'] - r_ref))
+    print(f"[Corr] item-total max |Δr| vs per-item loop {worst_it:.2e}")
@@ -0,0 +1,168 @@
+"""
+Data Schema
+===========
+Target dtypes for the Silver and Gold frames, declared next to
+`questionnaire_mapping.QUESTION_MAPPING` so the item list has one home.
+
+    Survey items (Q1-Q26 columns, Q8_R)   →  Int8       (0-4, 0-10, 0-1 codes)
+    *_norm, Engagement_Score              →  float32    (compact, on load only)
+    response_seconds                      →  float64    (parsed from Q15 in Silver)
+    Submitted_by, Gender,
+    Autism Level, Level of Severity       →  category
+
+Items are only cast when every non-null value is a whole number, so free-text
+items (Q12, Q15) keep their original dtype.  float32 is applied when a layer is
+loaded for the dashboard; files on disk keep full float64 precision.
+
+Frames loaded through layer_storage carry a data fingerprint (file content hash
++ SCHEMA_VERSION) in df.attrs; data_fingerprint(df) is the cache key the
+dashboard's heavy computations use instead of hashing DataFrames.
+"""
+
+import hashlib
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from questionnaire_mapping import QUESTION_MAPPING
+
+# Bump when a dtype below changes, so anything keyed on the schema is rebuilt.
+SCHEMA_VERSION = 2
+
+# df.attrs key under which a frame carries the fingerprint of its source data
+FINGERPRINT_ATTR = 'data_fingerprint'
+
+ITEM_COLUMNS     = list(QUESTION_MAPPING.keys()) + ['Q8_R']
+FLOAT32_COLUMNS  = ['Engagement_Score']            # plus every '*_norm' column
+FLOAT64_COLUMNS  = ['response_seconds']
+CATEGORY_COLUMNS = ['Submitted_by', 'Gender', 'Autism Level', 'Level of Severity']
+
+
+def _is_float32_column(col: str) -> bool:
+    return col.endswith('_norm') or col in FLOAT32_COLUMNS
+
+
+def apply_schema(df: pd.DataFrame, float32: bool = True) -> pd.DataFrame:
+    """
+    Cast the columns of `df` that the schema knows about (in place; `df` is returned).
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Silver or Gold frame.
+    float32 : bool, default True
+        Downcast *_norm / Engagement_Score to float32.  Pass False when the
+        frame is about to be written to disk or used for model fitting.
+    """
+    for col in ITEM_COLUMNS:
+        if col not in df.columns or not pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        values = pd.to_numeric(df[col], errors='coerce')
+        valid  = values.dropna()
+        if ((valid % 1) == 0).all() and valid.between(-128, 127).all():
+            df[col] = values.astype('Int8')
+
+    for col in df.columns:
+        if not _is_float32_column(col) or not pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        target = 'float32' if float32 else 'float64'
+        if df[col].dtype != target:
+            df[col] = df[col].astype(target)
+
+    for col in FLOAT64_COLUMNS:
+        if col in df.columns and df[col].dtype != 'float64':
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    return df
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Short content hash of a frame (values, index, columns + dtypes, schema version).
+
+    Used as the cache key for heavy derived outputs, so they are recomputed
+    only when the data they were built from actually changes.
+    """
+    values = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    header = pd.util.hash_array(np.asarray([f'{c}:{t}' for c, t in df.dtypes.items()], dtype=object))
+    digest = hashlib.sha256(values.tobytes() + header.tobytes()
+                            + f'schema-v{SCHEMA_VERSION}'.encode())
+    return digest.hexdigest()[:16]
+
+
+def bytes_fingerprint(*parts) -> str:
+    """
+    Short hash of raw parts (file bytes, names, flags) and the schema version,
+    in the same form as frame_fingerprint().
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b'\0')
+    digest.update(f'schema-v{SCHEMA_VERSION}'.encode())
+    return digest.hexdigest()[:16]
+
+
+def derived_fingerprint(fingerprint: str, *steps) -> str:
+    """Fingerprint of data produced from `fingerprint`'s data by `steps`."""
+    return bytes_fingerprint(fingerprint, *steps)
+
+
+def _columns_key(df: pd.DataFrame) -> str:
+    return '\x1f'.join(map(str, df.columns))
+
+
+# id → frame a fingerprint was attached to (weak, so a reused id never matches a dead frame)
+_attached = weakref.WeakValueDictionary()
+
+
+def attach_fingerprint(df: pd.DataFrame, fingerprint: str) -> pd.DataFrame:
+    """
+    Record `fingerprint` for this frame object (in df.attrs); returns `df`.
+    Only `df` itself is vouched for — see data_fingerprint.
+    """
+    df.attrs[FINGERPRINT_ATTR] = (fingerprint, id(df), df.shape, _columns_key(df))
+    _attached[id(df)] = df
+    return df
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """
+    The fingerprint attached to `df` (attach_fingerprint), or
+    frame_fingerprint(df) otherwise.
+
+    The carried key is only valid for the unmodified frame it was attached to
+    — the one load_layer returned, or a DatasetHandle.view().  pandas copies
+    attrs onto derived frames (assign, fillna, sort_values, slices …), so the
+    key is only trusted on that same object, and only while it still has the
+    shape and columns it had; every other frame is hashed by content.  Values
+    changed in place on the attached frame itself are not detected.
+    """
+    carried = df.attrs.get(FINGERPRINT_ATTR)
+    if (carried and len(carried) == 4 and carried[1] == id(df)
+            and _attached.get(id(df)) is df
+            and carried[2] == df.shape and carried[3] == _columns_key(df)):
+        return carried[0]
+    return frame_fingerprint(df)
+
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-column memory usage (deep, so string columns are counted in full).
+
+    Returns one row per column — Column, Dtype, Memory_KB, Share_% — largest
+    first.
+    """
+    usage = df.memory_usage(deep=True, index=False)
+    total = usage.sum()
+    report = pd.DataFrame({
+        'Column':    usage.index,
+        'Dtype':     [str(df[c].dtype) for c in usage.index],
+        'Memory_KB': np.round(usage.to_numpy() / 1024, 1),
+        'Share_%':   np.round(100 * usage.to_numpy() / total, 1) if total else 0.0,
+    })
+    return report.sort_values('Memory_KB', ascending=False).reset_index(drop=True)
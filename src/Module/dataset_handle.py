@@ -0,0 +1,153 @@
+"""
+Shared Dataset Handle
+=====================
+One loaded dataset per Streamlit server process, shared by every session.
+
+`st.cache_data` hands each rerun a freshly unpickled copy of the frame, so
+memory grows with the number of viewers; app.py instead keeps the Silver
+frame in a `DatasetHandle` cached with `st.cache_resource` and gives each
+page a read-only view of it:
+
+    handle = DatasetHandle(df, scale_map)        # once per process and data version
+    df     = handle.view()                       # per rerun: shares the data
+
+Views rely on pandas Copy-on-Write (always on from pandas 3, switched on by
+`enable_copy_on_write()` for older versions): a page that assigns a column or
+filters a view gets its own copy of just what it changed, and the shared frame
+is never modified.  Pages still should not write into a view in place.
+
+Columns a page needs in a different form are computed once per data version
+and shared too, instead of being written back into the frame:
+
+    q2 = derived_column(df, 'numeric.Q2', lambda d: pd.to_numeric(d[q2_col], errors='coerce'))
+
+Run this file directly to check that the memory each session holds does not
+grow with the data (views vs deep copies, at 1x and 10x the Silver rows):
+    python src/Module/dataset_handle.py [sessions]
+tests/test_dataset_handle.py checks the same through app.load_dataset with
+concurrent sessions, and that they all get one handle.
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+if _current_dir not in sys.path:
+    sys.path.insert(0, _current_dir)
+
+from data_schema import attach_fingerprint, data_fingerprint, memory_report
+
+DERIVED_MAX_ENTRIES = 64
+
+
+def enable_copy_on_write():
+    """Turn on pandas Copy-on-Write where it is optional (pandas < 3)."""
+    if int(pd.__version__.split('.')[0]) < 3:
+        pd.set_option('mode.copy_on_write', True)
+
+
+class DatasetHandle:
+    """An immutable dataset shared across sessions; pages work on `view()`s of it."""
+
+    def __init__(self, df: pd.DataFrame, scale_map=None):
+        self._frame = df
+        self.scale_map = scale_map
+        self.fingerprint = data_fingerprint(df)
+
+    def view(self) -> pd.DataFrame:
+        """A shallow, copy-on-write view of the frame, carrying the data fingerprint."""
+        return attach_fingerprint(self._frame.copy(deep=False), self.fingerprint)
+
+    def memory_report(self) -> pd.DataFrame:
+        """Per-column memory of the one shared frame (data_schema.memory_report)."""
+        return memory_report(self._frame)
+
+    def __len__(self):
+        return len(self._frame)
+
+
+@st.cache_resource(show_spinner=False)
+def _derived_store():
+    return OrderedDict()
+
+
+@st.cache_resource(show_spinner=False)
+def _derived_lock():
+    return threading.Lock()
+
+
+def derived_column(df: pd.DataFrame, name: str, compute) -> pd.Series:
+    """
+    compute(df) — a Series aligned to `df` — computed once per (data
+    fingerprint, name) for the whole process and returned as a copy-on-write
+    view.  `name` must identify the computation (include the column it reads).
+
+    The store is shared by every session's script thread, so lookup, compute,
+    insert and eviction happen under one lock.
+    """
+    key = (data_fingerprint(df), name)
+    store = _derived_store()
+    with _derived_lock():
+        if key in store:
+            store.move_to_end(key)
+        else:
+            store[key] = compute(df)
+            while len(store) > DERIVED_MAX_ENTRIES:
+                store.popitem(last=False)
+        return store[key].copy(deep=False)
+
+
+if __name__ == '__main__':
+    import gc
+    import tracemalloc
+
+    sys.path.insert(0, os.path.normpath(os.path.join(_current_dir, '..')))
+    from layer_storage import load_layer
+
+    try:
+        import pyarrow
+        _arrow_bytes = pyarrow.total_allocated_bytes
+    except ImportError:
+        _arrow_bytes = lambda: 0  # noqa: E731
+
+    enable_copy_on_write()
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    silver = load_layer('silver')
+    item = next(c for c in silver.columns if c.startswith('How engaged'))
+
+    def _held_kb(handle, make_frame):
+        """KB per session still allocated while `sessions` frames are alive, each with one page-local column."""
+        gc.collect()
+        arrow0 = _arrow_bytes()
+        tracemalloc.start()
+        frames = []
+        for _ in range(sessions):
+            df = make_frame()
+            df['Engaged_numeric'] = derived_column(
+                df, f'numeric.{item}', lambda d: pd.to_numeric(d[item], errors='coerce'))
+            frames.append(df)
+        held, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        held += _arrow_bytes() - arrow0
+        del frames
+        return held / 1024 / sessions
+
+    per_session = {}
+    for scale in (1, 10):
+        handle = DatasetHandle(pd.concat([silver] * scale, ignore_index=True))
+        copies = _held_kb(handle, lambda handle=handle: handle.view().copy())
+        views = _held_kb(handle, handle.view)
+        per_session[scale] = views
+        print(f"[Handle] {len(handle):6d} rows ({handle.memory_report()['Memory_KB'].sum():,.0f} KB shared), "
+              f"{sessions} sessions — per session: deep copy {copies:,.1f} KB, view {views:,.1f} KB")
+
+    # A view's cost is per-column bookkeeping, not data: 10x the rows must not
+    # make each session's view noticeably larger
+    if per_session[10] > 2 * per_session[1]:
+        raise SystemExit("[Handle] FAIL: per-session memory of views grows with the data")
+    print("[Handle] OK: sessions share the data; per-session memory does not grow with it")
@@ -0,0 +1,220 @@
+"""
+Batch ICC Engine
+================
+Intraclass correlations for many items at once from a single wide pivot,
+using the two-way ANOVA sums of squares directly in NumPy.
+
+For every item the targets are the Participant × Session pairs rated by both
+raters (duplicate ratings per target × rater are averaged, as pingouin's
+pivot does), and the following are returned:
+
+  ICC(3,1)  two-way mixed, consistency, single measures  (pingouin 'ICC3' / 'ICC(C,1)')
+  ICC(2,1)  two-way random, absolute agreement, single   (pingouin 'ICC2' / 'ICC(A,1)')
+
+with the F-based 95% CIs and the F-test p-value (F = MS_targets / MS_error),
+using the same formulas as pingouin.intraclass_corr (McGraw & Wong, 1996).
+
+Run this file directly to validate the engine against pingouin on the Silver
+data:   python src/Module/icc_engine.py
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.stats import f as f_dist
+
+ICC_COLUMNS = [
+    'n', 'ICC3', 'ICC3_CI_Lower', 'ICC3_CI_Upper',
+    'ICC2', 'ICC2_CI_Lower', 'ICC2_CI_Upper',
+    'F', 'df1', 'df2', 'pval',
+]
+
+
+def paired_matrices(df, item_cols, target_cols=('Participant id', 'Session number'),
+                    rater_col='Submitted_by', raters=('T', 'P')):
+    """
+    One pivot for all items: returns two (n_targets × n_items) float arrays
+    holding the mean rating of each target by the first and second rater.
+    Missing ratings are NaN.
+    """
+    sub = df[list(target_cols) + [rater_col] + list(item_cols)].copy()
+    sub[rater_col] = sub[rater_col].astype(str)
+    sub = sub[sub[rater_col].isin(raters)]
+    for col in item_cols:
+        sub[col] = pd.to_numeric(sub[col], errors='coerce').astype(float)
+    wide = sub.groupby(list(target_cols) + [rater_col], observed=True)[list(item_cols)].mean()
+    wide = wide.unstack(rater_col)
+    out = []
+    for rater in raters:
+        if rater in wide.columns.get_level_values(1):
+            out.append(wide.xs(rater, axis=1, level=1)[list(item_cols)].to_numpy(dtype=float))
+        else:
+            out.append(np.full((len(wide), len(item_cols)), np.nan))
+    return out[0], out[1]
+
+
+def icc_batch(x, y, alpha=0.05):
+    """
+    ICC(3,1) and ICC(2,1) for every column of two paired rating matrices.
+
+    Parameters
+    ----------
+    x, y : np.ndarray
+        (n_targets × n_items) ratings by rater 1 and rater 2; rows where
+        either rating is NaN are dropped per item (listwise, as pingouin).
+    alpha : float
+        1 − confidence level of the intervals.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per item with the columns in ICC_COLUMNS.  Items with fewer
+        than 3 complete pairs (or no between-target variance) are NaN.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    mask = ~(np.isnan(x) | np.isnan(y))
+    k = 2.0
+    n = mask.sum(axis=0).astype(float)
+
+    xm = np.where(mask, x, 0.0)
+    ym = np.where(mask, y, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        grand  = (xm.sum(axis=0) + ym.sum(axis=0)) / (k * n)
+        mean_x = xm.sum(axis=0) / n
+        mean_y = ym.sum(axis=0) / n
+        row_mean = (xm + ym) / k
+
+        # Two-way ANOVA sums of squares (targets × raters, one rating per cell)
+        ss_rows  = k * np.where(mask, (row_mean - grand) ** 2, 0.0).sum(axis=0)
+        ss_cols  = n * ((mean_x - grand) ** 2 + (mean_y - grand) ** 2)
+        ss_total = np.where(mask, (x - grand) ** 2 + (y - grand) ** 2, 0.0).sum(axis=0)
+        ss_error = ss_total - ss_rows - ss_cols
+
+        df1 = n - 1
+        df2 = (n - 1) * (k - 1)
+        msb = ss_rows / df1
+        msj = ss_cols / (k - 1)
+        mse = ss_error / df2
+
+        icc3 = (msb - mse) / (msb + (k - 1) * mse)
+        icc2 = (msb - mse) / (msb + (k - 1) * mse + k * (msj - mse) / n)
+
+        F    = msb / mse
+        pval = f_dist.sf(F, df1, df2)
+
+        # ICC(3,1) confidence interval
+        f_lo = F / f_dist.ppf(1 - alpha / 2, df1, df2)
+        f_hi = F * f_dist.ppf(1 - alpha / 2, df2, df1)
+        icc3_lo = (f_lo - 1) / (f_lo + (k - 1))
+        icc3_hi = (f_hi - 1) / (f_hi + (k - 1))
+
+        # ICC(2,1) confidence interval (Satterthwaite df)
+        fj = msj / mse
+        vn = df2 * (k * icc2 * fj + n * (1 + (k - 1) * icc2) - k * icc2) ** 2
+        vd = df1 * k ** 2 * icc2 ** 2 * fj ** 2 + (n * (1 + (k - 1) * icc2) - k * icc2) ** 2
+        v  = vn / vd
+        f2u = f_dist.ppf(1 - alpha / 2, df1, v)
+        f2l = f_dist.ppf(1 - alpha / 2, v, df1)
+        denom = k * msj + (k * n - k - n) * mse
+        icc2_lo = n * (msb - f2u * mse) / (f2u * denom + n * msb)
+        icc2_hi = n * (f2l * msb - mse) / (denom + n * f2l * msb)
+
+    out = pd.DataFrame({
+        'n': n.astype(int), 'ICC3': icc3, 'ICC3_CI_Lower': icc3_lo, 'ICC3_CI_Upper': icc3_hi,
+        'ICC2': icc2, 'ICC2_CI_Lower': icc2_lo, 'ICC2_CI_Upper': icc2_hi,
+        'F': F, 'df1': df1, 'df2': df2, 'pval': pval,
+    })
+    too_few = n < 3
+    out.loc[too_few, ICC_COLUMNS[1:]] = np.nan
+    return out.replace([np.inf, -np.inf], np.nan)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# VALIDATION AGAINST PINGOUIN
+# ══════════════════════════════════════════════════════════════════════════════
+
+def validate_against_pingouin(df, item_cols, atol=1e-8):
+    """
+    Compare icc_batch() with pingouin.intraclass_corr item by item.
+
+    Returns a DataFrame of absolute differences (ICC, CI bounds, p-value) for
+    ICC(3,1) and ICC(2,1); raises ImportError when pingouin is not installed.
+    Pingouin rounds CIs to 2 decimals unless its rounding option can be turned
+    off, in which case CI bounds are compared at 5e-3 instead of `atol`.
+    """
+    import pingouin as pg
+
+    options = getattr(pg, 'options', {})
+    saved   = dict(options)
+    ci_atol = atol
+    if 'round.column.CI95' in options:
+        options['round.column.CI95'] = None
+    else:
+        ci_atol = 5e-3
+    try:
+        return _compare_with_pingouin(pg, df, item_cols, atol, ci_atol)
+    finally:
+        options.update(saved)
+
+
+def _compare_with_pingouin(pg, df, item_cols, atol, ci_atol):
+    x, y = paired_matrices(df, item_cols)
+    ours = icc_batch(x, y)
+    rows = []
+    for j, col in enumerate(item_cols):
+        keep = ~(np.isnan(x[:, j]) | np.isnan(y[:, j]))
+        if keep.sum() < 3:
+            continue
+        long = pd.DataFrame({
+            'target': np.tile(np.arange(keep.sum()), 2),
+            'rater':  np.repeat(['T', 'P'], keep.sum()),
+            'score':  np.concatenate([x[keep, j], y[keep, j]]),
+        })
+        ref = pg.intraclass_corr(data=long, targets='target', raters='rater', ratings='score')
+        ref = ref.set_index('Type')
+        for ours_key, types in [('ICC3', ['ICC3', 'ICC(C,1)']), ('ICC2', ['ICC2', 'ICC(A,1)'])]:
+            t = next(t for t in types if t in ref.index)
+            r = ref.loc[t]
+            if 'CI95%' in ref.columns:
+                lo, hi = r['CI95%']
+            elif 'CI95' in ref.columns:
+                lo, hi = r['CI95']
+            else:
+                lo, hi = r['CI95%_lower'], r['CI95%_upper']
+            o = ours.iloc[j]
+            rows.append({
+                'Item': col[:40], 'Type': ours_key,
+                'd_ICC':   abs(o[ours_key] - r['ICC']),
+                'd_lower': abs(o[f'{ours_key}_CI_Lower'] - lo),
+                'd_upper': abs(o[f'{ours_key}_CI_Upper'] - hi),
+                'd_pval':  abs(o['pval'] - r['pval']),
+            })
+    report = pd.DataFrame(rows)
+    report['ok'] = ((report[['d_ICC', 'd_pval']].max(axis=1) <= atol) &
+                    (report[['d_lower', 'd_upper']].max(axis=1) <= ci_atol))
+    return report
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+    import time
+
+    _here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.normpath(os.path.join(_here, '..')))
+    sys.path.insert(0, _here)
+    from layer_storage import load_layer
+    from questionnaire_mapping import QUESTION_MAPPING, QUANT_ITEMS
+
+    silver = load_layer('silver', float32=False)
+    silver = silver[silver['Participant id'] != 128]
+    cols = [c for c, q in QUESTION_MAPPING.items() if q in QUANT_ITEMS and c in silver.columns]
+
+    t0 = time.perf_counter()
+    x, y = paired_matrices(silver, cols)
+    icc_batch(x, y)
+    print(f"[ICC] Batch engine: {len(cols)} items in {1000 * (time.perf_counter() - t0):.1f} ms")
+
+    report = validate_against_pingouin(silver, cols)
+    print(report.to_string(index=False))
+    print(f"[ICC] {int(report['ok'].sum())}/{len(report)} comparisons within tolerance")
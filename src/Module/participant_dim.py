@@ -0,0 +1,139 @@
+"""
+Participant Dimension
+=====================
+One row per participant, built once from the Silver rows when the Silver
+layer is written (data_transformation) and persisted as the 'participants'
+layer, so demographic pages render from a table of a few dozen rows instead
+of de-duplicating and banding the session rows on every render.
+
+    Participant id                        key
+    Age, Age_Group                        age and its band (pd.cut, see AGE_BINS)
+    Gender, Autism Level, Level of Severity,
+    Any co-existing disabiltiy diagnosis,
+    Stimming behaviour Identified?        as recorded on the participant's first row
+    Records, Sessions                     session rows / distinct sessions
+    Therapist_Records, Parent_Records     rows per observer
+    First_Session, Last_Session
+
+    participants = load_participants(df)                        # dashboard
+    age_group    = join_participants(df, 'Age_Group')           # by key
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+if _current_dir not in sys.path:
+    sys.path.insert(0, _current_dir)
+
+from data_schema import apply_schema, data_fingerprint, frame_fingerprint
+
+KEY = 'Participant id'
+AGE_BINS   = [0, 8, 15, 20, 27, np.inf]
+AGE_LABELS = ['<8', '8-14', '15-19', '20-26', '27+']
+UNKNOWN_AGE = 'Unknown'
+# RQ2/RQ5 report the study's three groups, which take in the outer bands:
+# under 15 → '8-14', 20 and over → '20-26'
+STUDY_AGE_GROUPS = {'8-14': ['<8', '8-14'], '15-19': ['15-19'], '20-26': ['20-26', '27+']}
+DEMOGRAPHIC_COLUMNS = [
+    'Age', 'Gender', 'Autism Level', 'Level of Severity',
+    'Any co-existing disabiltiy diagnosis', 'Stimming behaviour Identified?',
+]
+_SOURCE_COLUMNS = [KEY] + DEMOGRAPHIC_COLUMNS + ['Session number', 'Submitted_by']
+
+
+def age_group(ages: pd.Series) -> pd.Series:
+    """Age bands <8, 8-14, 15-19, 20-26, 27+ (right-open), 'Unknown' when age is missing."""
+    bands = pd.cut(pd.to_numeric(ages, errors='coerce'), bins=AGE_BINS,
+                   labels=AGE_LABELS, right=False)
+    return bands.astype(object).where(bands.notna(), UNKNOWN_AGE).astype(str)
+
+
+def study_age_group(bands: pd.Series) -> pd.Series:
+    """The STUDY_AGE_GROUPS group of each Age_Group band (NaN when age is unknown)."""
+    return bands.map({band: group for group, members in STUDY_AGE_GROUPS.items()
+                      for band in members})
+
+
+def _canonical(series: pd.Series) -> pd.Series:
+    """Numbers as float64, everything else as text — independent of the load dtype."""
+    values = series.astype(object)
+    numeric = pd.to_numeric(values, errors='coerce')
+    if numeric.notna().sum() == values.notna().sum():
+        return numeric.astype('float64')
+    return values.where(values.isna(), values.astype(str)).astype(object)
+
+
+def participant_source(df: pd.DataFrame) -> pd.DataFrame:
+    """The columns the table is built from, with load-independent dtypes."""
+    cols = [c for c in _SOURCE_COLUMNS if c in df.columns]
+    return pd.DataFrame({c: _canonical(df[c]) for c in cols}).reset_index(drop=True)
+
+
+def source_fingerprint(df: pd.DataFrame) -> str:
+    """Fingerprint of the data the table is built from (see data_schema.frame_fingerprint)."""
+    return frame_fingerprint(participant_source(df))
+
+
+def build_participants(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The participant dimension of a Silver (or Gold) frame.
+
+    Demographics are taken from each participant's first row (as
+    drop_duplicates(subset=['Participant id']) does); the session counts are
+    one groupby over all rows.  The table carries the layer schema's dtypes
+    (data_schema.apply_schema), as it has when read back from disk.
+    """
+    demo = [c for c in DEMOGRAPHIC_COLUMNS if c in df.columns]
+    table = (df.drop_duplicates(subset=[KEY])[[KEY] + demo]
+             .set_index(KEY))
+    table.insert(table.columns.get_loc('Age') + 1 if 'Age' in table else 0,
+                 'Age_Group', age_group(table['Age']) if 'Age' in table else UNKNOWN_AGE)
+
+    observer = df['Submitted_by'].astype(str).str.strip().str.upper()
+    grouped = df.assign(_T=observer.eq('T'), _P=observer.eq('P')).groupby(KEY, sort=False)
+    sessions = grouped['Session number']
+    table['Records']           = grouped.size()
+    table['Sessions']          = sessions.nunique()
+    table['Therapist_Records'] = grouped['_T'].sum().astype(int)
+    table['Parent_Records']    = grouped['_P'].sum().astype(int)
+    table['First_Session']     = sessions.min()
+    table['Last_Session']      = sessions.max()
+    return apply_schema(table.reset_index(), float32=False)
+
+
+def join_participants(df: pd.DataFrame, columns, participants: pd.DataFrame = None):
+    """
+    Participant-level column(s) aligned to the rows of `df` by Participant id
+    (a Series for one column name, a DataFrame for a list).
+    """
+    participants = load_participants(df) if participants is None else participants
+    table = participants.set_index(KEY)
+    if isinstance(columns, str):
+        return df[KEY].map(table[columns])
+    return pd.DataFrame({c: df[KEY].map(table[c]) for c in columns}, index=df.index)
+
+
+def save_participants(table: pd.DataFrame, fingerprint: str, csv_path: str = None):
+    """Write the table as the 'participants' layer (CSV, Parquet, fingerprint sidecar)."""
+    from layer_storage import save_derived_layer
+    return save_derived_layer('participants', table, fingerprint, csv_path)
+
+
+def _load_or_build(df: pd.DataFrame, fingerprint: str) -> pd.DataFrame:
+    from layer_storage import load_derived_layer
+    table = load_derived_layer('participants', fingerprint)
+    return table if table is not None else build_participants(df)
+
+
+def load_participants(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The participant table for `df` — the persisted one when it matches the
+    data, otherwise built here; either way once per data fingerprint.
+    """
+    from render_cache import memo
+    return memo('participants', data_fingerprint(df),
+                lambda: _load_or_build(df, source_fingerprint(df)))
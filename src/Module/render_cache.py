@@ -0,0 +1,63 @@
+"""
+Render Cache
+============
+Memoisation helpers for heavy dashboard outputs, keyed by a data fingerprint
+(`data_schema.data_fingerprint`: carried by frames loaded through
+layer_storage, computed from content otherwise) instead of hashing whole
+DataFrames.
+
+    fp    = data_fingerprint(df)
+    table = memo("eda6.icc_table", fp, lambda: _build_icc_table(df))
+    pyplot_cached("eda3.hist_grid", fp, lambda: _hist_grid_figure(df))
+
+`name` must identify everything other than the data that changes the output
+(e.g. include a widget value in it).  Figures are cached as PNG bytes rendered
+with the same settings st.pyplot uses (dpi=200, tight bounding box).
+
+The part of `name` before the first '.' is its namespace; `invalidate(ns)`
+drops the outputs of that namespace only (e.g. after a derived layer it reads
+was rewritten), instead of clearing every st.cache_data entry.
+"""
+
+import io
+
+import matplotlib.pyplot as plt
+import streamlit as st
+
+
+# namespace → generation; bumped by invalidate() so older entries are no longer hit
+_generations = {}
+
+
+def _generation(name):
+    return _generations.get(name.split('.', 1)[0], 0)
+
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def _memo(name, fingerprint, generation, _compute):
+    return _compute()
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _figure_png(name, fingerprint, generation, _build):
+    fig = _build()
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=200, bbox_inches='tight')
+    plt.close(fig)
+    return buf.getvalue()
+
+
+def memo(name, fingerprint, compute):
+    """Return compute() — computed once per (name, fingerprint)."""
+    return _memo(name, fingerprint, _generation(name), compute)
+
+
+def pyplot_cached(name, fingerprint, build):
+    """Display the figure returned by build(); it is rendered once per (name, fingerprint)."""
+    st.image(_figure_png(name, fingerprint, _generation(name), build))
+
+
+def invalidate(*namespaces):
+    """Recompute the memoised outputs of `namespaces` on their next use."""
+    for ns in namespaces:
+        _generations[ns] = _generations.get(ns, 0) + 1
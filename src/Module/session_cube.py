@@ -0,0 +1,230 @@
+"""
+Session Aggregate Cube
+======================
+Pre-aggregated session trends for the dashboard: mean, count, SD and 95% CI
+half-width of every questionnaire item per
+
+    Session × Observer × Autism_Level × Age_Group × Gender × Item
+
+with an 'All' member on the four breakdown dimensions (every combination of
+them is rolled up, so e.g. "Therapist, any autism level, age 8-14, any
+gender" is one slice).  The cube is built once when Gold is built
+(silver_to_gold_transformation) and persisted as the 'gold_cube' layer; the
+RQ pages and EDA Section 4 slice it instead of re-running groupbys.
+
+    cube  = load_cube(df)                                     # dashboard
+    trend = session_means(cube, [q1, q3], observer='T')       # ≙ groupby(...).mean()
+    line  = session_trend(cube, 'Q1', autism=2)               # Session, Mean, Count, SD, CI95
+
+Age groups use the project's bands (participant_dim.AGE_BINS, pd.cut, right=False):
+    <8, 8-14, 15-19, 20-26, 27+
+"""
+
+import itertools
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+if _current_dir not in sys.path:
+    sys.path.insert(0, _current_dir)
+
+from data_schema import data_fingerprint, frame_fingerprint
+from participant_dim import AGE_BINS, AGE_LABELS
+from questionnaire_mapping import QUESTION_MAPPING
+
+ALL = 'All'
+SESSION_COL = 'Session number'
+EXTRA_ITEMS = ['Success_percentage', 'response_seconds']
+
+# filter keyword → (cube column, source column)
+DIMENSIONS = {
+    'observer':  ('Observer',     'Submitted_by'),
+    'autism':    ('Autism_Level', 'Autism Level'),
+    'age_group': ('Age_Group',    'Age'),
+    'gender':    ('Gender',       'Gender'),
+}
+DIMENSIONS_BY_COLUMN = {c: s for c, s in DIMENSIONS.values()}
+CUBE_COLUMNS = (['Session'] + [c for c, _ in DIMENSIONS.values()]
+                + ['Item', 'Mean', 'Count', 'SD', 'CI95'])
+
+
+def item_key(col: str) -> str:
+    """Cube item key of a source column: the Q label for questionnaire items."""
+    return QUESTION_MAPPING.get(col, col)
+
+
+def cube_items(df: pd.DataFrame) -> list:
+    """Source columns aggregated into the cube (numeric questionnaire items + extras)."""
+    return [c for c in list(QUESTION_MAPPING) + EXTRA_ITEMS
+            if c in df.columns and (pd.api.types.is_numeric_dtype(df[c])
+                                    or c in EXTRA_ITEMS)]
+
+
+def cube_source(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The cube's input: session, the four dimensions as labels and the items as
+    float64 (rounded to 6 dp, so float32 and float64 loads of the same layer
+    fingerprint identically).
+    """
+    src = pd.DataFrame({'Session': pd.to_numeric(df[SESSION_COL], errors='coerce')},
+                       index=df.index)
+    src['Observer'] = df['Submitted_by'].astype(str).str.strip().str.upper()
+    src['Autism_Level'] = df['Autism Level'].astype(str)
+    src['Age_Group'] = pd.cut(pd.to_numeric(df['Age'], errors='coerce'), bins=AGE_BINS,
+                              labels=AGE_LABELS, right=False).astype(str)
+    src['Gender'] = df['Gender'].astype(str)
+    for col in ['Observer', 'Autism_Level', 'Age_Group', 'Gender']:
+        src.loc[df[DIMENSIONS_BY_COLUMN[col]].isna(), col] = np.nan
+    for col in cube_items(df):
+        src[item_key(col)] = pd.to_numeric(df[col], errors='coerce').astype('float64').round(6)
+    return src.dropna(subset=['Session']).reset_index(drop=True)
+
+
+def source_fingerprint(df: pd.DataFrame) -> str:
+    """Fingerprint of the data a cube is built from (see data_schema.frame_fingerprint)."""
+    return frame_fingerprint(cube_source(df))
+
+
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregate every item over every roll-up of the four dimensions.
+
+    The frame is melted to long form once; each of the 2⁴ grouping sets is
+    then a single groupby over (Session, its dimensions, Item).  Cells exist
+    for every group that has rows — an item that is all-NaN in a cell has
+    Count 0 and Mean NaN, as groupby(...).mean() would give.
+    """
+    src = cube_source(df)
+    dims = [c for c, _ in DIMENSIONS.values()]
+    items = [c for c in src.columns if c not in dims and c != 'Session']
+    long = src.melt(id_vars=['Session'] + dims, value_vars=items,
+                    var_name='Item', value_name='Value')
+
+    blocks = []
+    for k in range(len(dims) + 1):
+        for kept in itertools.combinations(dims, k):
+            g = (long.groupby(['Session', *kept, 'Item'], sort=False)['Value']
+                 .agg(Mean='mean', Count='count', SD='std').reset_index())
+            for d in dims:
+                if d not in kept:
+                    g[d] = ALL
+            blocks.append(g)
+    cube = pd.concat(blocks, ignore_index=True)
+
+    n = cube['Count'].to_numpy(dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        half = stats.t.ppf(0.975, n - 1) * cube['SD'].to_numpy() / np.sqrt(n)
+    cube['CI95'] = np.where(n >= 2, half, 0.0)
+    cube['Session'] = cube['Session'].astype(int)
+    cube['Count'] = cube['Count'].astype(int)
+    return cube[CUBE_COLUMNS].sort_values(CUBE_COLUMNS[:6], kind='stable').reset_index(drop=True)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SLICING
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _select(cube: pd.DataFrame, filters: dict) -> pd.Series:
+    unknown = set(filters) - set(DIMENSIONS)
+    if unknown:
+        raise TypeError(f"unknown cube dimension(s): {', '.join(sorted(unknown))}")
+    mask = pd.Series(True, index=cube.index)
+    for key, (col, _) in DIMENSIONS.items():
+        value = filters.get(key)
+        if isinstance(value, (list, tuple)):
+            mask &= cube[col].isin([str(v) for v in value])
+        else:
+            mask &= cube[col] == (ALL if value is None else str(value))
+    return mask
+
+
+def _pooled(rows: pd.DataFrame) -> pd.DataFrame:
+    """Count-weighted Mean per (Session, Item) over several cells — the mean of their pooled rows."""
+    grouped = (rows.assign(Weighted=rows['Mean'].fillna(0) * rows['Count'])
+               .groupby(['Session', 'Item'], sort=False)[['Weighted', 'Count']].sum())
+    mean = grouped['Weighted'] / grouped['Count'].where(grouped['Count'] > 0)
+    return mean.rename('Mean').reset_index()
+
+
+def session_trend(cube: pd.DataFrame, item: str, **filters) -> pd.DataFrame:
+    """
+    One item's trend in one slice: Session, Mean, Count, SD, CI95 for the
+    sessions with at least one observed value, in session order.
+
+    `item` is a source column or its Q label; dimensions not given in
+    `filters` (observer, autism, age_group, gender) are rolled up.
+    """
+    rows = cube[_select(cube, filters) & (cube['Item'] == item_key(item))
+                & (cube['Count'] > 0)]
+    return (rows[['Session', 'Mean', 'Count', 'SD', 'CI95']]
+            .sort_values('Session').reset_index(drop=True))
+
+
+def session_means(cube: pd.DataFrame, items, dropna: bool = False, **filters) -> pd.DataFrame:
+    """
+    Mean per session of one or more items in one slice, shaped like
+    ``df[mask].groupby('Session number')[items].mean().reset_index()``.
+
+    With `dropna`, sessions where no item was observed are left out (as when
+    the rows are filtered with ``dropna(subset=items)`` before grouping).
+    A filter given as a list selects the union of those members, e.g.
+    ``age_group=['<8', '8-14']``.
+    """
+    cols = [items] if isinstance(items, str) else list(items)
+    rows = cube[_select(cube, filters) & cube['Item'].isin([item_key(c) for c in cols])]
+    if any(isinstance(v, (list, tuple)) for v in filters.values()):
+        rows = _pooled(rows)
+    wide = rows.pivot(index='Session', columns='Item', values='Mean')
+    wide = wide.reindex(columns=[item_key(c) for c in cols])
+    wide.columns = cols
+    wide.index.name = SESSION_COL
+    if dropna:
+        wide = wide.dropna(how='all')
+    return wide.sort_index().reset_index()
+
+
+def members(cube: pd.DataFrame, dimension: str) -> list:
+    """Values of one dimension present in the cube (without 'All')."""
+    col = DIMENSIONS[dimension][0]
+    return [v for v in cube[col].unique() if v != ALL]
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PERSISTENCE
+# ══════════════════════════════════════════════════════════════════════════════
+
+def save_cube(cube: pd.DataFrame, fingerprint: str, csv_path: str = None):
+    """Write the cube as the 'gold_cube' layer (CSV, Parquet, fingerprint sidecar)."""
+    from layer_storage import save_derived_layer
+    save_derived_layer('gold_cube', cube, fingerprint, csv_path)
+
+
+def read_persisted(fingerprint: str):
+    """The persisted 'gold_cube' layer if it was built from data with `fingerprint`, else None."""
+    from layer_storage import load_derived_layer
+    cube = load_derived_layer('gold_cube', fingerprint)
+    if cube is None:
+        return None
+    for col, _ in DIMENSIONS.values():
+        cube[col] = cube[col].astype(str)
+    return cube
+
+
+def _load_or_build(df: pd.DataFrame, fingerprint: str) -> pd.DataFrame:
+    cube = read_persisted(fingerprint)
+    return cube if cube is not None else build_cube(df)
+
+
+def load_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The cube for `df` — the persisted one when it matches the data, otherwise
+    built here; either way once per data fingerprint (render_cache.memo), so
+    the source is only hashed when the cube is not cached.
+    """
+    from render_cache import memo
+    return memo('session_cube', data_fingerprint(df),
+                lambda: _load_or_build(df, source_fingerprint(df)))
@@ -1,65 +1,74 @@
 import streamlit as st
-import pandas as pd
 import os
-import importlib.util
 import sys
-import time
-from data_transformation import get_scale_map
+from data_transformation import add_response_seconds, get_scale_map
+from layer_storage import load_layer, layer_csv_path, layer_fingerprint
+from module_registry import load_page_module, import_times
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Module"))
+from data_schema import attach_fingerprint, derived_fingerprint
+from dataset_handle import DatasetHandle, enable_copy_on_write
+
+# Pages get copy-on-write views of one shared frame (see dataset_handle)
+enable_copy_on_write()
 
 # --- 1. PAGE CONFIG (Must be the very first Streamlit command) ---
 st.set_page_config(page_title="AI Therapy Dashboard", layout="wide")
 
 # --- 2. FAIL-SAFE DATA LOADING WITH AUTO-CACHE INVALIDATION ---
-@st.cache_data
-def load_data_cached(file_mod_time):
-    """Cached data loading that invalidates when file changes"""
-    # Get the directory of this script
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    silver_path = os.path.join(script_dir, "..", "Data", "Silver", "data_silver_cleaned.csv")
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_dataset(fingerprint):
+    """Load the Silver data once per process and data version; every session shares the handle"""
+    silver_path = layer_csv_path('silver')
     
     # Check if file exists to prevent black screen crash
-    if not os.path.exists(silver_path):
+    if not fingerprint:
         return None, f"Error: '{silver_path}' not found."
     
     try:
-        # Load Silver data directly (already cleaned)
-        df = pd.read_csv(silver_path, encoding='cp1252')
-        df.columns = df.columns.str.strip()
+        # Load Silver data directly (already cleaned) — typed Parquet when available;
+        # the frame carries its data fingerprint (df.attrs) to every page's caches
+        df = load_layer('silver')
+        # Silver files written before response_seconds became a Silver column
+        if 'response_seconds' not in df.columns:
+            df = add_response_seconds(df, inplace=True)
+            attach_fingerprint(df, derived_fingerprint(fingerprint, 'response_seconds'))
         
         # Get scale mapping
         scale_map = get_scale_map()
             
-        return df, scale_map
+        return DatasetHandle(df, scale_map), None
     except Exception as e:
         return None, f"Data Load Error: {str(e)}"
 
+def silver_fingerprint():
+    """Content fingerprint of the Silver file (None if missing); the file is only re-hashed when it changes"""
+    try:
+        return layer_fingerprint('silver')
+    except FileNotFoundError:
+        return None
+
 def load_data():
-    """Wrapper function that checks file modification time"""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    silver_path = os.path.join(script_dir, "..", "Data", "Silver", "data_silver_cleaned.csv")
-    
-    # Get file modification time to invalidate cache when file changes
-    if os.path.exists(silver_path):
-        file_mod_time = os.path.getmtime(silver_path)
-    else:
-        file_mod_time = 0
-    
-    return load_data_cached(file_mod_time)
+    """This rerun's read-only view of the shared dataset and the scale map (or None and an error)"""
+    handle, error = load_dataset(silver_fingerprint())
+    if handle is None:
+        return None, error
+    return handle.view(), handle.scale_map
+
+@st.cache_data
+def memory_report_cached(fingerprint):
+    """Per-column memory usage of the shared dataset (recomputed when the data changes)"""
+    handle, _ = load_dataset(fingerprint)
+    return handle.memory_report()
 
 # --- 3. DYNAMIC MODULE LOADER ---
 def load_module(module_name):
-    """Dynamically load a module from the Module folder"""
+    """Load a module from the Module folder (executed once per process, reloaded when the file changes)"""
     # Get the directory of this script
     script_dir = os.path.dirname(os.path.abspath(__file__))
     module_path = os.path.join(script_dir, "Module", f"{module_name}.py")
     
-    if not os.path.exists(module_path):
-        return None
-    
-    spec = importlib.util.spec_from_file_location(module_name, module_path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
+    return load_page_module(module_path, module_name)
 
 # --- 4. RUN LOAD ---
 df, status = load_data()
@@ -94,6 +103,12 @@ else:
     selected = st.sidebar.radio("Analysis View", list(rq_options.keys()))
     rq_module = rq_options[selected]
 
+    # Per-column memory footprint of the dataset held by this process
+    with st.sidebar.expander("Dataset memory usage"):
+        mem = memory_report_cached(silver_fingerprint())
+        st.caption(f"Total: {mem['Memory_KB'].sum() / 1024:.2f} MB across {len(mem)} columns")
+        st.dataframe(mem, use_container_width=True, hide_index=True)
+
     if selected == "Welcome / Overview":
         st.subheader("Project Summary")
         st.write("Welcome to the AI Storytelling Research Dashboard.")
@@ -112,4 +127,8 @@ else:
         if module and hasattr(module, 'display'):
             module.display(df, status)
         else:
-            st.error(f"Could not load module for {selected}")
\ No newline at end of file
+            st.error(f"Could not load module for {selected}")
+
+        # Import cost is paid once per process (and again only after a file edit)
+        with st.sidebar.expander("Page module import times"):
+            st.dataframe(import_times(), use_container_width=True, hide_index=True)
\ No newline at end of file
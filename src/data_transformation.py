@@ -2,8 +2,23 @@
 Data Transformation Module
 Handles all data cleaning and transformation from Bronze to Silver layer
 """
+import numpy as np
 import pandas as pd
 import os
+import sys
+
+from layer_storage import apply_layer_schema, layer_csv_path, write_parquet
+from memory_profile import StageMemory
+from record_watermark import (
+    build_watermark, load_watermark, merge_increment, plan_increment, save_watermark,
+)
+
+_module_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Module')
+if _module_dir not in sys.path:
+    sys.path.insert(0, _module_dir)
+
+from data_schema import ITEM_COLUMNS  # noqa: E402
+from participant_dim import build_participants, save_participants, source_fingerprint  # noqa: E402
 
 # ── Scale mappings ──────────────────────────────────────────────────────────
 # Standard scale: Not at all=0, Slightly=1, Moderately=2, Very=3, Fully=4
@@ -51,31 +66,57 @@ _YESNO_MAP = {
     'Yes': 1, 'yes': 1,
 }
 
+# Items already numeric in Bronze (0-10), cast rather than mapped
+_NUMERIC_ITEM_COLUMNS = [
+    "How would you rate the participant\u2019s verbal participation?",
+    "How much different scenarios stories impact overall social behaviour ?",
+]
+
 # Strings treated as missing / not applicable
 _NULL_STRINGS = {'NULL', 'Null', 'null', 'No data', 'no data', 'No Data',
                  'nan', '', 'Attentive listening', 'Verbal Communication'}
 
+# ── Response time (Q15 free text → seconds) ─────────────────────────────────
+RESPONSE_TIME_COL = "What is the response time of the participant? (in minutes roughly)"
+RESPONSE_TIME_CSV = "response_time_cleaned.csv"
+_NO_RESPONSE_PATTERN = r'null|nothing|not response'
+_RANGE_PATTERN  = (r'(?P<start>\d+)\s*[-to]+\s*(?P<end>\d+)\s*'
+                   r'(?P<unit>min|minute|minutes|sec|second|seconds)?')
+_MINUTE_PATTERN = r'(?P<value>\d+(?:\.\d+)?)\s*(?:min|minute|minutes)'
+# 'seond' is a typo in one Bronze answer, kept as seconds as in the hand-cleaned file
+_SECOND_PATTERN = r'(?P<value>\d+(?:\.\d+)?)\s*(?:sec|second|seconds|seond)'
 
-def replace_null_strings(df):
+
+def replace_null_strings(df, inplace=False):
     """
     Strip whitespace from all text cells and replace known NULL-like strings
     with NaN so they are treated as missing values in analysis.
+
+    Stripping and NULL matching run on each column's distinct values only and
+    are gathered back, so the column is not re-materialised as strings.
+    With inplace=True the columns of `df` are replaced without copying the frame.
     """
-    df = df.copy()
+    if not inplace:
+        df = df.copy()
     for col in df.select_dtypes(include='object').columns:
-        df[col] = df[col].astype(str).str.strip()
-        df[col] = df[col].replace(list(_NULL_STRINGS), pd.NA)
+        codes, uniques = pd.factorize(df[col])
+        cleaned = pd.Index(uniques).astype(str).str.strip()
+        cleaned = pd.array(cleaned.where(~cleaned.isin(_NULL_STRINGS)), dtype=object)
+        values  = cleaned.take(codes, allow_fill=True)
+        values[pd.isna(values)] = pd.NA
+        df[col] = pd.Series(values, index=df.index, name=col, dtype=object)
     return df
 
 
-def clean_submitted_by(df):
+def clean_submitted_by(df, inplace=False):
     """
     Standardise Submitted_by values:
       - uppercase + strip whitespace
       - P/C  → P   (parent/carer joint entries counted as parent)
       - p    → P   (lowercase typo)
     """
-    df = df.copy()
+    if not inplace:
+        df = df.copy()
     df['Submitted_by'] = df['Submitted_by'].astype(str).str.upper().str.strip()
     df['Submitted_by'] = df['Submitted_by'].replace({'P/C': 'P', 'P': 'P'})
     return df
@@ -89,7 +130,7 @@ def clean_column_names(df):
     return df
 
 
-def map_scale_columns_to_numeric(df):
+def map_scale_columns_to_numeric(df, inplace=False):
     """
     Map all text-scale survey columns to numeric values using predefined
     dictionaries. Typos and case variants are corrected inline via the maps.
@@ -101,12 +142,21 @@ def map_scale_columns_to_numeric(df):
     Behaviour (0-4): No / Slightly / Sometimes / Often / Very Often
     Yes/No    (0-1): No / Yes
     Numeric        : already numeric in Bronze – just cast to float
+
+    Mapped columns come out as nullable Int8.  Each column is factorized into
+    its handful of distinct raw strings, the scale map is applied to those
+    uniques only, and the codes are gathered back — no per-cell Python call.
+    With inplace=True the columns of `df` are replaced without copying the frame.
     """
-    df = df.copy()
+    if not inplace:
+        df = df.copy()
 
     def _apply(series, mapping):
-        return (series.astype(str).str.strip()
-                      .map(lambda v: mapping.get(v, pd.NA)))
+        codes, uniques = pd.factorize(series)
+        keys   = pd.Index(uniques).astype(str).str.strip()
+        lookup = pd.array([mapping.get(k, pd.NA) for k in keys], dtype='Int8')
+        return pd.Series(lookup.take(codes, allow_fill=True),
+                         index=series.index, name=series.name)
 
     # ── Standard scale ──────────────────────────────────────
     standard_cols = [
@@ -160,41 +210,229 @@ def map_scale_columns_to_numeric(df):
             df[col] = _apply(df[col], _YESNO_MAP)
 
     # ── Already numeric – cast only ─────────────────────────
-    numeric_cols = [
-        "How would you rate the participant\u2019s verbal participation?",
-        "How much different scenarios stories impact overall social behaviour ?",
-    ]
-    for col in numeric_cols:
+    for col in _NUMERIC_ITEM_COLUMNS:
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors='coerce')
 
     return df
 
 
-def load_and_transform_silver_data(bronze_path):
+def parse_response_seconds(series):
+    """
+    Parse Q15 free-text response times ("2 Minutes", "15 sec", "3-4 minutes",
+    "About 10 to 20 seconds") into seconds, as float64.
+
+    Rules, first match wins:
+      - "null" / "nothing" / "not response"  → NaN
+      - range "a-b" or "a to b" [unit]       → midpoint (× 60 if the unit is minutes)
+      - "<n> min…"                           → n × 60
+      - "<n> sec…" (or the "seond" typo)     → n
+    Anything else is NaN.  Like the scale mapping, the column is factorized
+    and each rule is one str.extract over its distinct answers only; the
+    parsed values are gathered back by code.
+    """
+    codes, uniques = pd.factorize(series)
+    text = pd.Series(uniques, dtype=object).astype(str).str.lower().str.strip()
+    no_response = text.str.contains(_NO_RESPONSE_PATTERN, regex=True)
+
+    rng = text.str.extract(_RANGE_PATTERN)
+    midpoint = (pd.to_numeric(rng['start']) + pd.to_numeric(rng['end'])) / 2
+    in_minutes = rng['unit'].fillna('').str.contains('min', regex=False)
+    from_range = midpoint.where(~in_minutes, midpoint * 60)
+
+    minutes = pd.to_numeric(text.str.extract(_MINUTE_PATTERN)['value']) * 60
+    seconds = pd.to_numeric(text.str.extract(_SECOND_PATTERN)['value'])
+
+    parsed = from_range.fillna(minutes).fillna(seconds).where(~no_response)
+    # code -1 (missing answer) picks the trailing NaN
+    values = np.append(parsed.to_numpy(dtype='float64'), np.nan)[codes]
+    return pd.Series(values, index=series.index, name='response_seconds')
+
+
+def add_response_seconds(df, inplace=False):
+    """
+    Add the typed `response_seconds` column parsed from Q15 (see
+    parse_response_seconds).  Frames without the Q15 column are returned as is.
+    """
+    if RESPONSE_TIME_COL not in df.columns:
+        return df
+    if not inplace:
+        df = df.copy()
+    df['response_seconds'] = parse_response_seconds(df[RESPONSE_TIME_COL])
+    return df
+
+
+def unparseable_response_times(df):
+    """
+    Q15 answers that are present but did not parse to seconds, with their
+    row counts (most frequent first).
+    """
+    if RESPONSE_TIME_COL not in df.columns or 'response_seconds' not in df.columns:
+        return pd.Series(dtype='int64', name='count')
+    text = df[RESPONSE_TIME_COL]
+    return text[text.notna() & df['response_seconds'].isna()].value_counts()
+
+
+def save_response_times(df, path):
+    """
+    Write the parsed response times (one row per answered session) to `path`
+    and print which Q15 answers could not be parsed.
+
+    Returns:
+        Success/error message
+    """
+    try:
+        cols = [c for c in ['Participant id', 'Session number', RESPONSE_TIME_COL,
+                            'response_seconds', 'Autism Level'] if c in df.columns]
+        parsed = df.loc[df['response_seconds'].notna(), cols]
+        parsed.to_csv(path, index=False, encoding='cp1252')
+        unparsed = unparseable_response_times(df)
+        print(f"[Pipeline] Response time: {len(parsed)} row(s) parsed to seconds, "
+              f"{int(unparsed.sum())} answer(s) not parseable")
+        for value, count in unparsed.items():
+            print(f"[Pipeline]   {count:3d} × {value!r}")
+        return f"Response times saved to {path}"
+    except Exception as e:
+        return f"Error saving response times: {str(e)}"
+
+
+def save_participant_table(df, path=None):
+    """
+    Build the participant dimension (Module/participant_dim.py) from the
+    Silver rows and persist it with the fingerprint of its source data.
+
+    Returns:
+        Success/error message
+    """
+    if path is None:
+        path = layer_csv_path('participants')
+    try:
+        table = build_participants(df)
+        save_participants(table, source_fingerprint(df), path)
+        return f"Participants saved to {path} ({len(table)} participant(s))"
+    except Exception as e:
+        return f"Error saving participant table: {str(e)}"
+
+
+def transform_bronze_rows(df, inplace=False, memory=None):
+    """
+    Apply the Silver transformations to (a subset of) Bronze rows:
+      1. Replace NULL strings / No data → NaN
+      2. Standardise Submitted_by (P/C, p → P)
+      3. Map all text scale columns to numeric (0-4 / 0-1 / 0-10)
+      4. Parse Q15 response time text → response_seconds
+
+    With inplace=True only the first step copies (or none, if the caller owns
+    `df`), so the wide frame is not duplicated once per step.  `memory` is an
+    optional StageMemory that records peak memory per step.
+    """
+    memory = memory or StageMemory(enabled=False)
+    with memory.stage('replace_null_strings'):
+        df = replace_null_strings(df, inplace=inplace)
+    with memory.stage('clean_submitted_by'):
+        df = clean_submitted_by(df, inplace=inplace)
+    with memory.stage('map_scale_columns_to_numeric'):
+        df = map_scale_columns_to_numeric(df, inplace=inplace)
+    with memory.stage('add_response_seconds'):
+        df = add_response_seconds(df, inplace=inplace)
+    return df
+
+
+def load_and_transform_silver_data(bronze_path, inplace=False, memory=None):
     """
     Load Bronze data and apply all transformations for the Silver layer:
       1. Strip column-name whitespace
       2. Replace NULL strings / No data → NaN
       3. Standardise Submitted_by (P/C, p → P)
       4. Map all text scale columns to numeric (0-4 / 0-1 / 0-10)
+      5. Parse Q15 response time text → response_seconds
+
+    The freshly read frame is owned here, so inplace=True transforms it
+    without any intermediate copies.
     """
+    memory = memory or StageMemory(enabled=False)
     try:
-        df = pd.read_csv(bronze_path, encoding='cp1252')
+        with memory.stage('read_bronze'):
+            df = pd.read_csv(bronze_path, encoding='cp1252')
 
         df = clean_column_names(df)
-        df = replace_null_strings(df)
-        df = clean_submitted_by(df)
-        df = map_scale_columns_to_numeric(df)
+        df = transform_bronze_rows(df, inplace=inplace, memory=memory)
 
         return df, None
     except Exception as e:
         return None, f"Error loading data: {str(e)}"
 
 
+def full_transform_dtypes(df):
+    """
+    Item dtypes a full transform gives the merged Silver frame `df`.
+
+    Scale-mapped items are nullable Int8 whatever the rows hold.  The two
+    already-numeric items go through pd.to_numeric over the whole column, so
+    they are int64 only when every value is a whole number and none is
+    missing, float64 otherwise.  Decided on the merged column, never on the
+    changed rows alone, whose NaN pattern can differ.
+    """
+    dtypes = {}
+    for col in ITEM_COLUMNS:
+        if col not in df.columns or not pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        if col in _NUMERIC_ITEM_COLUMNS:
+            values = pd.to_numeric(df[col], errors='coerce')
+            whole = not values.isna().any() and ((values % 1) == 0).all()
+            dtypes[col] = 'int64' if whole else 'float64'
+        else:
+            dtypes[col] = 'Int8'
+    return dtypes
+
+
+def load_and_transform_silver_incremental(bronze_path, silver_path, memory=None):
+    """
+    Incremental variant of load_and_transform_silver_data.
+
+    Bronze rows are matched to the existing Silver output on
+    (Participant id, Session number, Submitted_by) and a row hash stored in the
+    Silver watermark; only new or changed rows are transformed and merged into
+    the existing Silver rows.  Falls back to a full transform when there is no
+    usable watermark.  `memory` is an optional StageMemory, as for
+    load_and_transform_silver_data.
+
+    Returns:
+        Tuple of (Silver DataFrame or None, watermark, rows transformed, error message)
+    """
+    memory = memory or StageMemory(enabled=False)
+    try:
+        with memory.stage('read_bronze'):
+            bronze = clean_column_names(pd.read_csv(bronze_path, encoding='cp1252'))
+        existing = None
+        with memory.stage('read_silver'):
+            if os.path.exists(silver_path):
+                existing = pd.read_csv(silver_path, encoding='cp1252', low_memory=False,
+                                       float_precision='round_trip')
+                existing = apply_layer_schema(clean_column_names(existing))
+                if 'response_seconds' not in existing.columns:
+                    existing = add_response_seconds(existing, inplace=True)
+            previous = load_watermark(silver_path, len(existing)) if existing is not None else None
+
+        if previous is None:
+            df = transform_bronze_rows(bronze, memory=memory)
+            return df, build_watermark(bronze), len(df), None
+
+        with memory.stage('plan_increment'):
+            reuse_pos, changed, watermark = plan_increment(bronze, previous)
+        fresh = apply_layer_schema(transform_bronze_rows(bronze[changed], memory=memory))
+        with memory.stage('merge_increment'):
+            df = apply_layer_schema(merge_increment(existing, fresh, reuse_pos, changed))
+            # Items back in the full transform's dtypes, so Silver is written as a full run writes it
+            df = df.astype(full_transform_dtypes(df))
+        return df, watermark, int(changed.sum()), None
+    except Exception as e:
+        return None, None, 0, f"Error loading data: {str(e)}"
+
+
 def save_to_silver(df, silver_path):
     """
-    Save cleaned data to Silver layer
+    Save cleaned data to Silver layer (CSV plus a typed Parquet copy alongside)
     
     Args:
         df: Cleaned DataFrame
@@ -205,12 +443,14 @@ def save_to_silver(df, silver_path):
     """
     try:
         df.to_csv(silver_path, index=False, encoding='cp1252')
+        write_parquet(df, silver_path)
         return f"Data successfully saved to {silver_path}"
     except Exception as e:
         return f"Error saving data: {str(e)}"
 
 
-def run_bronze_to_silver_pipeline(bronze_path=None, silver_path=None):
+def run_bronze_to_silver_pipeline(bronze_path=None, silver_path=None, incremental=False,
+                                  inplace=False, memory_report=False):
     """
     Full Bronze to Silver pipeline:
     Loads Bronze raw data, applies all transformations, and saves to Silver layer.
@@ -218,6 +458,10 @@ def run_bronze_to_silver_pipeline(bronze_path=None, silver_path=None):
     Args:
         bronze_path: Path to Bronze CSV. Defaults to Data/Bronze/data_bronze_numeric_format_data.csv
         silver_path: Path to save Silver CSV. Defaults to Data/Silver/data_silver_cleaned.csv
+        incremental: Only transform Bronze rows that are new or changed since the
+                     last run (see record_watermark) and merge them into Silver
+        inplace: Run the cleaning chain on the loaded frame without per-step copies
+        memory_report: Print peak memory per stage (traced with tracemalloc)
 
     Returns:
         Tuple of (DataFrame or None, status message)
@@ -237,19 +481,39 @@ def run_bronze_to_silver_pipeline(bronze_path=None, silver_path=None):
 
     print(f"[Pipeline] Loading Bronze data from: {bronze_path}")
 
+    memory = StageMemory(enabled=memory_report)
+
     # Step 2: Load and transform
-    df, error_msg = load_and_transform_silver_data(bronze_path)
+    if incremental:
+        df, watermark, n_changed, error_msg = load_and_transform_silver_incremental(
+            bronze_path, silver_path, memory=memory)
+    else:
+        df, error_msg = load_and_transform_silver_data(bronze_path, inplace=inplace, memory=memory)
     if error_msg:
+        memory.stop()
         return None, error_msg
 
     print(f"[Pipeline] Transformations applied. Rows: {len(df)}, Columns: {len(df.columns)}")
+    if incremental:
+        print(f"[Pipeline] Incremental: {n_changed} new/changed row(s) transformed, "
+              f"{len(df) - n_changed} reused from existing Silver")
 
     # Step 3: Ensure Silver directory exists
     os.makedirs(os.path.dirname(silver_path), exist_ok=True)
 
     # Step 4: Save to Silver
-    status = save_to_silver(df, silver_path)
+    with memory.stage('save_to_silver'):
+        status = save_to_silver(df, silver_path)
     print(f"[Pipeline] {status}")
+    if incremental and status.startswith("Data successfully"):
+        save_watermark(watermark, silver_path)
+    if 'response_seconds' in df.columns:
+        rt_path = os.path.join(os.path.dirname(silver_path), RESPONSE_TIME_CSV)
+        print(f"[Pipeline] {save_response_times(df, rt_path)}")
+    with memory.stage('participants'):
+        pt_path = os.path.join(os.path.dirname(silver_path), 'participants.csv')
+        print(f"[Pipeline] {save_participant_table(df, pt_path)}")
+    memory.print_report(tag='[Pipeline]')
 
     return df, status
 
@@ -271,7 +535,9 @@ def get_scale_map():
 
 
 if __name__ == "__main__":
-    df, status = run_bronze_to_silver_pipeline()
+    df, status = run_bronze_to_silver_pipeline(incremental='--incremental' in sys.argv,
+                                               inplace='--inplace' in sys.argv,
+                                               memory_report='--memory-report' in sys.argv)
     if df is not None:
         print(f"\nSilver layer generated successfully.")
         print(f"Shape: {df.shape[0]} rows x {df.shape[1]} columns")
@@ -0,0 +1,248 @@
+"""
+Medallion Layer Storage
+=======================
+Typed, columnar storage for the Bronze / Silver / Gold layers.
+
+Every layer keeps its CSV (the human-readable copy the project has always
+shipped) and, when `pyarrow` is installed, a Parquet file written alongside it
+with the explicit dtypes declared in `Module/data_schema.py` (Int8 items,
+categorical observer / demographics, full-precision floats).
+
+`load_layer(name, columns=[...])` reads the Parquet copy with column projection
+when it is at least as new as the CSV, and otherwise falls back to parsing the
+CSV and applying the same schema, so callers always get identical dtypes.
+By default float columns are downcast to float32 on load; model-fitting code
+passes `float32=False`.
+
+    Layer            CSV path                                       Encoding
+    ───────────────  ─────────────────────────────────────────────  ────────
+    bronze           Data/Bronze/data_bronze_raw_data.csv           cp1252
+    silver           Data/Silver/data_silver_cleaned.csv            cp1252
+    gold             Data/Gold/data_gold_analytical.csv             utf-8
+    gold_sentiment   results/nlp/data_gold_with_sentiment.csv       utf-8
+    gold_cube        Data/Gold/aggregate_cube.csv                   utf-8
+    participants     Data/Silver/participants.csv                   utf-8
+
+'gold_cube' and 'participants' are derived tables: they are written with a
+`.fingerprint` sidecar naming the data they were built from, and
+`load_derived_layer(name, fingerprint)` only returns them while it matches.
+
+Every loaded frame carries the fingerprint of the file it was read from
+(`layer_fingerprint`: content hash + schema version + load options) in
+df.attrs — see data_schema.data_fingerprint.
+"""
+
+import hashlib
+import os
+import sys
+
+import pandas as pd
+
+_src_dir     = os.path.dirname(os.path.abspath(__file__))
+_module_dir  = os.path.join(_src_dir, 'Module')
+_project_dir = os.path.normpath(os.path.join(_src_dir, '..'))
+if _module_dir not in sys.path:
+    sys.path.insert(0, _module_dir)
+
+from data_schema import ITEM_COLUMNS, apply_schema, attach_fingerprint, bytes_fingerprint  # noqa: E402
+
+try:
+    import pyarrow  # noqa: F401
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+
+# ── Layer registry ────────────────────────────────────────────────────────────
+LAYERS = {
+    'bronze':         (os.path.join('Data', 'Bronze', 'data_bronze_raw_data.csv'),        'cp1252'),
+    'silver':         (os.path.join('Data', 'Silver', 'data_silver_cleaned.csv'),         'cp1252'),
+    'gold':           (os.path.join('Data', 'Gold', 'data_gold_analytical.csv'),          'utf-8'),
+    'gold_sentiment': (os.path.join('results', 'nlp', 'data_gold_with_sentiment.csv'),    'utf-8'),
+    'gold_cube':      (os.path.join('Data', 'Gold', 'aggregate_cube.csv'),                'utf-8'),
+    'participants':   (os.path.join('Data', 'Silver', 'participants.csv'),                'utf-8'),
+}
+
+
+def layer_csv_path(name: str) -> str:
+    """Absolute path of a layer's CSV file."""
+    if name not in LAYERS:
+        raise KeyError(f"Unknown layer '{name}'. Expected one of: {', '.join(LAYERS)}")
+    return os.path.join(_project_dir, LAYERS[name][0])
+
+
+def parquet_path_for(csv_path: str) -> str:
+    """Parquet file that sits next to a CSV (same stem, .parquet suffix)."""
+    return os.path.splitext(csv_path)[0] + '.parquet'
+
+
+def layer_mtime(name: str) -> float:
+    """Latest modification time across a layer's CSV and Parquet files (0 if neither exists)."""
+    csv_path = layer_csv_path(name)
+    times = [os.path.getmtime(p) for p in (csv_path, parquet_path_for(csv_path))
+             if os.path.exists(p)]
+    return max(times) if times else 0
+
+
+def _source_file(name: str):
+    """(path, is_parquet) of the file load_layer(name) reads — Parquet when at least as new as the CSV."""
+    csv_path     = layer_csv_path(name)
+    parquet_path = parquet_path_for(csv_path)
+    parquet_fresh = (
+        _HAS_PYARROW and os.path.exists(parquet_path) and
+        (not os.path.exists(csv_path) or
+         os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path))
+    )
+    return (parquet_path, True) if parquet_fresh else (csv_path, False)
+
+
+_file_hashes = {}
+
+
+def file_hash(path: str) -> str:
+    """sha256 of a file's content, re-read only when its mtime or size changes."""
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key not in _file_hashes:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as fh:
+            for block in iter(lambda: fh.read(1 << 20), b''):
+                digest.update(block)
+        _file_hashes[key] = digest.hexdigest()
+    return _file_hashes[key]
+
+
+def layer_fingerprint(name: str, columns: list = None, float32: bool = True) -> str:
+    """
+    Fingerprint of the frame load_layer(name, columns, float32) returns: the
+    content hash of the file it reads, the load options and the schema version.
+    Raises FileNotFoundError when the layer does not exist.
+    """
+    path, _ = _source_file(name)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Layer '{name}' not found at '{path}'")
+    return bytes_fingerprint(name, file_hash(path), columns, float32)
+
+
+def apply_layer_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast known columns to their storage dtypes (lossless: floats stay float64).
+    """
+    return apply_schema(df, float32=False)
+
+
+def csv_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    `df` with its whole-number item columns in the dtype a CSV read gives
+    them (int64 when complete, float64 when a value is missing).  Gold is
+    built from the Silver CSV, so this is how a full run writes its items;
+    Gold built from typed frames (Int8 items from load_layer or an
+    incremental merge) is written the same way.
+    """
+    casts = {}
+    for col in ITEM_COLUMNS:
+        if col not in df.columns or not pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        values = pd.to_numeric(df[col], errors='coerce')
+        if ((values.dropna() % 1) == 0).all():
+            casts[col] = values.astype('float64' if values.isna().any() else 'int64')
+    return df.assign(**casts) if casts else df
+
+
+def write_parquet(df: pd.DataFrame, csv_path: str):
+    """
+    Write the typed Parquet copy of a layer next to its CSV.
+
+    Returns the Parquet path, or None when pyarrow is not installed.
+    """
+    if not _HAS_PYARROW:
+        return None
+    path = parquet_path_for(csv_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    apply_layer_schema(df.copy()).to_parquet(path, index=False)
+    return path
+
+
+def load_layer(name: str, columns: list = None, float32: bool = True) -> pd.DataFrame:
+    """
+    Load one medallion layer with the explicit schema applied.
+
+    Parameters
+    ----------
+    name : str
+        A name in LAYERS ('bronze', 'silver', 'gold', 'gold_sentiment',
+        'gold_cube', 'participants').
+    columns : list, optional
+        Column projection — only these columns are read from disk.
+    float32 : bool, default True
+        Downcast *_norm / Engagement_Score to float32 (see data_schema).
+
+    Returns
+    -------
+    pd.DataFrame
+        Carrying its layer_fingerprint() in df.attrs.
+    """
+    csv_path = layer_csv_path(name)
+    encoding = LAYERS[name][1]
+
+    path, is_parquet = _source_file(name)
+    if is_parquet:
+        df = pd.read_parquet(path, columns=columns)
+        df = apply_schema(df, float32=float32) if float32 else df
+        return attach_fingerprint(df, layer_fingerprint(name, columns, float32))
+
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"Layer '{name}' not found at '{csv_path}'")
+
+    usecols = None
+    if columns is not None:
+        wanted  = set(columns)
+        usecols = lambda c: c.strip() in wanted  # noqa: E731
+    df = pd.read_csv(csv_path, encoding=encoding, usecols=usecols, low_memory=False)
+    df.columns = df.columns.str.strip()
+    if name != 'bronze':
+        df = apply_schema(df, float32=float32)
+    return attach_fingerprint(df, layer_fingerprint(name, columns, float32))
+
+
+# ── Derived layers ────────────────────────────────────────────────────────────
+
+def fingerprint_path(csv_path: str) -> str:
+    """Sidecar holding the source fingerprint of a derived layer."""
+    return os.path.splitext(csv_path)[0] + '.fingerprint'
+
+
+def read_fingerprint(csv_path: str):
+    """The source fingerprint stored next to a derived layer's CSV, or None."""
+    try:
+        with open(fingerprint_path(csv_path), encoding='utf-8') as fh:
+            return fh.read().strip()
+    except OSError:
+        return None
+
+
+def save_derived_layer(name: str, df: pd.DataFrame, fingerprint: str, csv_path: str = None) -> str:
+    """
+    Write a derived layer (CSV, typed Parquet copy and fingerprint sidecar).
+
+    Returns the CSV path.
+    """
+    csv_path = csv_path or layer_csv_path(name)
+    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+    df.to_csv(csv_path, index=False, encoding=LAYERS[name][1])
+    write_parquet(df, csv_path)
+    with open(fingerprint_path(csv_path), 'w', encoding='utf-8') as fh:
+        fh.write(fingerprint + '\n')
+    return csv_path
+
+
+def load_derived_layer(name: str, fingerprint: str):
+    """
+    A derived layer if it was built from data with `fingerprint`, else None
+    (missing, or built from other data).
+    """
+    if read_fingerprint(layer_csv_path(name)) != fingerprint:
+        return None
+    try:
+        return load_layer(name, float32=False)
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,159 @@
+"""
+Parametric Bootstrap LRT
+========================
+Likelihood-ratio tests for nested random-intercept models with a p-value from
+a parametric bootstrap instead of the asymptotic χ² reference:
+
+  1. fit the reduced and full models to the data → observed LR
+  2. simulate B responses from the fitted reduced model
+         y* = X_r β̂_r + u*_group + e*,   u* ~ N(0, σ̂²_u),  e* ~ N(0, σ̂²)
+  3. refit both models to every y*       → LR*_1 … LR*_B
+  4. p = (1 + #{LR* ≥ LR}) / (B + 1)
+
+Replicate b draws from its own generator, seeded by (seed, b), so a replicate
+gives the same LR* whichever worker runs it and in whatever order.  Replicates
+are fitted in chunks (in a process pool under `parallel`) on a design matrix
+built once, and every finished chunk is appended to a results CSV — an
+interrupted run resumes from the replicates already on disk.  The file name
+carries a hash of (data, formulas, seed, solver), so a changed setup starts a
+fresh file rather than mixing replicates.
+
+Results directory  →  results/lme/bootstrap/
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from lme_model_cache import dataset_hash, model_key
+from lme_nested import NestedDesign, fit_arrays
+
+CHUNK_SIZE  = 25
+_CSV_FIELDS = ['replicate', 'lr_stat', 'converged']
+
+
+def _fit(y, X, groups, fast):
+    """ML fit of one model on arrays; returns (llf, converged)."""
+    result = fit_arrays(y, X, groups, fast)
+    return result.llf, bool(result.converged)
+
+
+def _replicate_chunk(replicates, seed, mean, sd_re, sd_resid, X_full, cols_reduced,
+                     codes, n_groups, fast):
+    """Worker: simulate and refit the replicates in `replicates`; returns rows."""
+    X_red = X_full[:, cols_reduced]
+    rows = []
+    for b in replicates:
+        rng = np.random.default_rng([seed, b])
+        y = (mean + rng.normal(0.0, sd_re, n_groups)[codes]
+             + rng.normal(0.0, sd_resid, len(mean)))
+        try:
+            llf_r, conv_r = _fit(y, X_red, codes, fast)
+            llf_f, conv_f = _fit(y, X_full, codes, fast)
+        except (np.linalg.LinAlgError, ValueError):
+            rows.append({'replicate': b, 'lr_stat': np.nan, 'converged': False})
+            continue
+        rows.append({'replicate': b, 'lr_stat': max(2 * (llf_f - llf_r), 0.0),
+                     'converged': conv_r and conv_f})
+    return rows
+
+
+def results_path(out_dir: str, name: str, data: pd.DataFrame, reduced: str, full: str,
+                 seed: int, fast: bool) -> str:
+    """Replicate file for one test; the hash changes with data, formulas, seed or solver."""
+    solver = 'ri_lmm' if fast else 'statsmodels'
+    key = model_key(dataset_hash(data), f"{reduced} | {full}", 'Participant_ID',
+                    reml=False, variant=f"bootstrap-{seed}-{solver}")
+    return os.path.join(out_dir, f"lrt_{name}_{key[:12]}.csv")
+
+
+def _load_done(path: str) -> pd.DataFrame:
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=_CSV_FIELDS)
+    done = pd.read_csv(path)
+    return done.drop_duplicates('replicate', keep='last')
+
+
+def bootstrap_lrt(data: pd.DataFrame, reduced: str, full: str, n_boot: int, out_dir: str,
+                  name: str, seed: int = 2024, parallel: bool = False, fast: bool = False,
+                  max_workers: int = None, groups: str = 'Participant_ID') -> dict:
+    """
+    Parametric bootstrap LRT of `reduced` against `full` (nested formulas on
+    `data`), resuming from any replicates already in the results file.
+
+    Returns
+    -------
+    dict
+        name, lr_stat, df, p_chi2, p_boot, n_boot (valid replicates used),
+        n_failed, seconds and path of the replicate file.
+    """
+    t0 = time.perf_counter()
+    design = NestedDesign(data, [reduced, full], groups=groups)
+    full_cols = design.columns(full)
+    red_cols  = design.columns(reduced)
+    X_full = design.exog[full_cols].to_numpy(dtype=float)
+    cols_reduced = [full_cols.index(c) for c in red_cols]
+    y_obs = design.endog.to_numpy(dtype=float)
+    codes, labels = pd.factorize(design.groups, sort=True)
+
+    # The reduced fit is also the null model the replicates are simulated from
+    ref = fit_arrays(y_obs, X_full[:, cols_reduced], codes, fast)
+    llf_f, _ = _fit(y_obs, X_full, codes, fast)
+    lr_obs = max(2 * (llf_f - ref.llf), 0.0)
+    extra = len(full_cols) - len(red_cols)
+
+    mean     = X_full[:, cols_reduced] @ np.asarray(ref.fe_params)
+    sd_re    = float(np.sqrt(max(np.asarray(ref.cov_re)[0, 0], 0.0)))
+    sd_resid = float(np.sqrt(ref.scale))
+
+    os.makedirs(out_dir, exist_ok=True)
+    path = results_path(out_dir, name, data, reduced, full, seed, fast)
+    done = _load_done(path)
+    todo = sorted(set(range(n_boot)) - set(done['replicate'].astype(int)))
+    chunks = [todo[i:i + CHUNK_SIZE] for i in range(0, len(todo), CHUNK_SIZE)]
+    args = (seed, mean, sd_re, sd_resid, X_full, cols_reduced, codes, len(labels), fast)
+
+    def _append(rows):
+        pd.DataFrame(rows, columns=_CSV_FIELDS).to_csv(
+            path, mode='a', header=not os.path.exists(path), index=False)
+
+    if parallel and len(chunks) > 1:
+        workers = max_workers or min(len(chunks), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_replicate_chunk, chunk, *args) for chunk in chunks]
+            for future in as_completed(futures):
+                _append(future.result())
+    else:
+        for chunk in chunks:
+            _append(_replicate_chunk(chunk, *args))
+
+    reps = _load_done(path)
+    reps = reps[reps['replicate'] < n_boot]
+    lr_star = reps['lr_stat'].dropna().to_numpy(dtype=float)
+    p_boot = (1 + np.sum(lr_star >= lr_obs - 1e-10)) / (len(lr_star) + 1)
+    return {
+        'name':      name,
+        'lr_stat':   lr_obs,
+        'df':        extra,
+        'p_chi2':    float(stats.chi2.sf(lr_obs, extra)),
+        'p_boot':    float(p_boot),
+        'n_boot':    len(lr_star),
+        'n_resumed': n_boot - len(todo),
+        'n_failed':  int(reps['lr_stat'].isna().sum()),
+        'seconds':   time.perf_counter() - t0,
+        'path':      path,
+    }
+
+
+def print_bootstrap_report(rows, tag: str = '[LME]'):
+    print(f"\n{tag} Parametric bootstrap LRTs:")
+    for r in rows:
+        resumed = f", {r['n_resumed']} resumed" if r['n_resumed'] else ''
+        failed  = f", {r['n_failed']} failed" if r['n_failed'] else ''
+        print(f"{tag}   {r['name']:<8s} LR={r['lr_stat']:8.4f} (df={r['df']})  "
+              f"p_chi2={r['p_chi2']:.6f}  p_boot={r['p_boot']:.6f}  "
+              f"B={r['n_boot']}{resumed}{failed}  {r['seconds']:.1f}s")
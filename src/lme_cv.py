@@ -0,0 +1,143 @@
+"""
+Leave-One-Participant-Out Cross-Validation
+==========================================
+Out-of-sample scores for the LME candidate models: every Participant_ID is
+held out in turn, each candidate formula is refitted on the remaining
+participants and the held-out participant's records are predicted.
+
+A held-out participant has no estimated random intercept, so predictions are
+population-level (X β̂).  Three scores are reported per model:
+
+    RMSE, MAE         of the population-level predictions
+    ELPD              summed held-out log predictive density of each
+                      participant's records as one vector,
+                      y_g ~ N(X_g β̂, σ̂² I + σ̂²_u 11ᵀ)  — higher is better,
+                      and unlike RMSE it rewards a well-estimated variance split
+
+The models of one dataset are fitted from a single shared design matrix
+(lme_nested.NestedDesign); folds are split into chunks and run in a process
+pool under `parallel`.  Scores are only comparable between models fitted on
+the same dataset ('full' or 'sent'), which the output marks.
+
+Output  →  results/lme/cv_scores.csv
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from lme_nested import NestedDesign, fit_arrays
+
+
+def heldout_logpdf(resid, var_re, scale):
+    """Log density of one participant's residual vector under N(0, σ² I + σ²_u 11ᵀ)."""
+    n = len(resid)
+    c = var_re / (scale + n * var_re)
+    quad = (float(resid @ resid) - c * float(resid.sum()) ** 2) / scale
+    logdet = n * np.log(scale) + np.log1p(n * var_re / scale)
+    return -0.5 * (n * np.log(2 * np.pi) + logdet + quad)
+
+
+def _score_folds(folds, y, X_full, model_cols, codes, fast):
+    """
+    Worker: for each held-out group code in `folds`, fit every model on the
+    other groups and score the held-out rows.  Returns one row per fold × model.
+    """
+    rows = []
+    for g in folds:
+        test = codes == g
+        train = ~test
+        for key, cols in model_cols.items():
+            X = X_full[:, cols]
+            try:
+                result = fit_arrays(y[train], X[train], codes[train], fast)
+            except (np.linalg.LinAlgError, ValueError):
+                continue
+            resid = y[test] - X[test] @ np.asarray(result.fe_params)
+            var_re = max(float(np.asarray(result.cov_re)[0, 0]), 0.0)
+            rows.append({
+                'key':     key,
+                'fold':    int(g),
+                'n':       int(test.sum()),
+                'sse':     float(resid @ resid),
+                'sae':     float(np.abs(resid).sum()),
+                'logpdf':  heldout_logpdf(resid, var_re, float(result.scale)),
+            })
+    return rows
+
+
+def cross_validate(data: pd.DataFrame, models: dict, parallel: bool = False,
+                   fast: bool = False, max_workers: int = None,
+                   groups: str = 'Participant_ID') -> pd.DataFrame:
+    """
+    Leave-one-group-out scores for `models` (key → formula, all on `data`).
+
+    Returns one row per fold × model: key, fold, n, sse, sae, logpdf.
+    """
+    formulas = list(models.values())
+    design = NestedDesign(data, formulas, groups=groups)
+    full_cols = list(design.exog.columns)
+    model_cols = {key: [full_cols.index(c) for c in design.columns(f)]
+                  for key, f in models.items()}
+    y = design.endog.to_numpy(dtype=float)
+    X_full = design.exog.to_numpy(dtype=float)
+    codes, _ = pd.factorize(design.groups, sort=True)
+    folds = list(np.unique(codes))
+
+    if parallel and len(folds) > 1:
+        workers = max_workers or min(len(folds), os.cpu_count() or 1)
+        chunks = [folds[i::workers] for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_score_folds, chunk, y, X_full, model_cols, codes, fast)
+                       for chunk in chunks if chunk]
+            rows = [row for future in futures for row in future.result()]
+    else:
+        rows = _score_folds(folds, y, X_full, model_cols, codes, fast)
+    return pd.DataFrame(rows)
+
+
+def summarise(fold_scores: pd.DataFrame, labels: dict, dataset: str) -> pd.DataFrame:
+    """One row per model: RMSE, MAE, ELPD (± its fold-level standard error)."""
+    out = []
+    for key, block in fold_scores.groupby('key', sort=False):
+        n = block['n'].sum()
+        out.append({
+            'Model':    labels[key],
+            'Dataset':  dataset,
+            'N':        int(n),
+            'Folds':    len(block),
+            'RMSE':     np.sqrt(block['sse'].sum() / n),
+            'MAE':      block['sae'].sum() / n,
+            'ELPD':     block['logpdf'].sum(),
+            'ELPD_SE':  block['logpdf'].std(ddof=1) * np.sqrt(len(block)),
+        })
+    table = pd.DataFrame(out)
+    table['Best_in_Dataset'] = table['ELPD'] == table['ELPD'].max()
+    return table
+
+
+def run_cv(datasets: dict, candidates: dict, out_path: str, parallel: bool = False,
+           fast: bool = False) -> pd.DataFrame:
+    """
+    Cross-validate every candidate (key → (label, formula, dataset name)) on
+    its dataset, write `out_path` and return the score table.
+    """
+    t0 = time.perf_counter()
+    tables = []
+    for ds, data in datasets.items():
+        models = {k: f for k, (_, f, d) in candidates.items() if d == ds}
+        if data is None or len(data) == 0 or not models:
+            continue
+        folds = cross_validate(data, models, parallel=parallel, fast=fast)
+        tables.append(summarise(folds, {k: candidates[k][0] for k in models}, ds))
+    table = pd.concat(tables, ignore_index=True)
+    table.round(6).to_csv(out_path, index=False)
+
+    mode = ("process pool" if parallel else "sequential") + (", ri_lmm solver" if fast else "")
+    print(f"\n[LME] Leave-one-participant-out CV ({mode}, {time.perf_counter() - t0:.1f}s):")
+    print(table.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    print(f"[LME] Saved: {os.path.basename(out_path)}")
+    return table
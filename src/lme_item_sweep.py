@@ -0,0 +1,159 @@
+"""
+Item-Level LME Sweep
+====================
+Fits the Model 2 structure (Session + Observer + Autism, random intercept per
+participant) to each of the 21 normalised items in NORM_ITEMS, so the change
+in the composite Engagement_Score can be traced to individual behaviours.
+
+The predictors are identical for every item, so the fixed-effect design
+matrix is built once for the whole dataset; each item model takes the rows
+where that item is observed (no per-item patsy call).  Items are split into
+one chunk per worker and fitted in a process pool under `parallel`, with
+statsmodels MixedLM or — with `fast` — the closed-form ri_lmm solver.
+
+Outputs written to  results/lme/items/
+    item_coefficients.csv   every fixed effect of every item model
+    item_summary.csv        one row per item × predictor, with Benjamini–Hochberg
+                            (FDR) and Holm adjusted p-values across the items
+
+Usage (from the project root):
+    python src/run_lme_pipeline.py --item-sweep [--parallel] [--fast-solver]
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import patsy
+from statsmodels.stats.multitest import multipletests
+
+from lme_nested import fit_arrays
+from silver_to_gold_transformation import NORM_ITEMS, norm_label
+
+MIN_ITEM_ROWS = 30      # items observed on fewer rows are reported but not modelled
+
+
+def _coefficient_rows(item, result, n_obs, n_groups):
+    fe = result.fe_params
+    se = result.bse.loc[fe.index]
+    ci = result.conf_int().loc[fe.index]
+    pv = result.pvalues.loc[fe.index]
+    return [{
+        'Item':         item,
+        'Label':        norm_label(item),
+        'Parameter':    name,
+        'Estimate':     fe[name],
+        'Std_Error':    se[name],
+        'CI_Lower':     ci.loc[name].iloc[0],
+        'CI_Upper':     ci.loc[name].iloc[1],
+        'z_value':      fe[name] / se[name],
+        'p_value':      pv[name],
+        'N':            n_obs,
+        'Participants': n_groups,
+        'Converged':    bool(getattr(result, 'converged', True)),
+    } for name in fe.index]
+
+
+def _fit_items(items, Y, X, groups, fast):
+    """
+    Worker: fit every item in `items` (columns of Y) on the shared design X.
+    Returns (coefficient rows, {item: seconds}, {item: skip reason}).
+    """
+    rows, seconds, skipped = [], {}, {}
+    for item in items:
+        mask = Y[item].notna().to_numpy()
+        if mask.sum() < MIN_ITEM_ROWS:
+            skipped[item] = f"only {int(mask.sum())} observed rows"
+            continue
+        t0 = time.perf_counter()
+        try:
+            result = fit_arrays(Y[item][mask], X[mask], groups[mask], fast)
+        except (np.linalg.LinAlgError, ValueError) as exc:
+            skipped[item] = f"fit failed: {exc}"
+            continue
+        seconds[item] = time.perf_counter() - t0
+        rows += _coefficient_rows(item, result, int(mask.sum()), len(np.unique(groups[mask])))
+    return rows, seconds, skipped
+
+
+def build_design(df: pd.DataFrame, rhs: str, items=None, groups: str = 'Participant_ID'):
+    """
+    The shared design matrix (rows with complete predictors), the items frame
+    aligned to it and the group labels.
+    """
+    items = [c for c in (items or NORM_ITEMS) if c in df.columns]
+    X = patsy.dmatrix(rhs, df, return_type='dataframe', NA_action='drop')
+    Y = df.loc[X.index, items].apply(pd.to_numeric, errors='coerce').astype(float)
+    return X, Y, df.loc[X.index, groups].to_numpy()
+
+
+def adjust_pvalues(coef_table: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per item × predictor (intercepts excluded) with FDR (Benjamini–
+    Hochberg) and Holm adjusted p-values, each computed across the items
+    within one predictor.
+    """
+    summary = coef_table[coef_table['Parameter'] != 'Intercept'].copy()
+    for name, block in summary.groupby('Parameter', sort=False):
+        summary.loc[block.index, 'p_FDR']  = multipletests(block['p_value'], method='fdr_bh')[1]
+        summary.loc[block.index, 'p_Holm'] = multipletests(block['p_value'], method='holm')[1]
+    summary['Significance'] = ['***' if p < 0.001 else '**' if p < 0.01 else '*' if p < 0.05
+                               else 'ns' for p in summary['p_FDR']]
+    summary = summary[['Item', 'Label', 'Parameter', 'Estimate', 'Std_Error', 'z_value',
+                       'p_value', 'p_FDR', 'p_Holm', 'Significance', 'N']]
+    return summary.sort_values(['Parameter', 'p_value'], kind='stable').reset_index(drop=True)
+
+
+def run_item_sweep(df: pd.DataFrame, rhs: str, out_dir: str, parallel: bool = False,
+                   fast: bool = False, max_workers: int = None):
+    """
+    Fit the item models, write item_coefficients.csv / item_summary.csv to
+    `out_dir` and return (coefficient table, adjusted summary).
+    """
+    t_start = time.perf_counter()
+    X, Y, groups = build_design(df, rhs)
+    items = list(Y.columns)
+
+    if parallel and len(items) > 1:
+        workers = max_workers or min(len(items), os.cpu_count() or 1)
+        chunks = [items[i::workers] for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_fit_items, chunk, Y[chunk], X, groups, fast)
+                       for chunk in chunks if chunk]
+            outputs = [future.result() for future in futures]
+        mode = f"process pool, {workers} worker(s)"
+    else:
+        outputs = [_fit_items(items, Y, X, groups, fast)]
+        mode = "sequential"
+    mode += ", ri_lmm solver" if fast else ", statsmodels"
+
+    rows, seconds, skipped = [], {}, {}
+    for r, s, k in outputs:
+        rows += r
+        seconds.update(s)
+        skipped.update(k)
+
+    coef_table = pd.DataFrame(rows)
+    coef_table['_order'] = coef_table['Item'].map({c: i for i, c in enumerate(items)})
+    coef_table = (coef_table.sort_values('_order', kind='stable')
+                  .drop(columns='_order').reset_index(drop=True))
+    summary = adjust_pvalues(coef_table)
+
+    os.makedirs(out_dir, exist_ok=True)
+    coef_table.round(6).to_csv(os.path.join(out_dir, 'item_coefficients.csv'), index=False)
+    summary.round(6).to_csv(os.path.join(out_dir, 'item_summary.csv'), index=False)
+
+    wall = time.perf_counter() - t_start
+    print(f"\n[LME] Item sweep: {len(seconds)} item models ({mode}) in {wall:.2f}s "
+          f"(sum of fits {sum(seconds.values()):.2f}s)")
+    for item, reason in skipped.items():
+        print(f"[LME]   Skipped {norm_label(item)}: {reason}")
+    sig = summary[summary['p_FDR'] < 0.05]
+    print(f"[LME] Effects significant after FDR correction: {len(sig)} of {len(summary)}")
+    if len(sig):
+        print(sig[['Label', 'Parameter', 'Estimate', 'p_value', 'p_FDR']]
+              .to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    print("[LME] Saved: items/item_coefficients.csv, items/item_summary.csv")
+    return coef_table, summary
@@ -0,0 +1,184 @@
+"""
+LME Fitted-Model Cache
+======================
+Persistent store of fitted mixed-model results so `run_lme_pipeline.py` only
+refits a model when its data or specification actually changed.
+
+Each entry is keyed by a SHA-256 hash of
+    (dataset content hash, formula, grouping column, reml flag, statsmodels version)
+and holds everything the pipeline's reporting steps read from a result:
+fixed effects, standard errors, p-values, confidence intervals, the full
+parameter vector, cov_re / scale, llf / AIC / BIC, random effects, residuals
+and fitted values.  A cache hit comes back as a `CachedMixedLMResult`, which
+exposes those under the same attribute names as statsmodels' MixedLMResults.
+
+Default location  →  results/lme/model_cache.sqlite
+"""
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import time
+
+import pandas as pd
+import statsmodels
+
+_src_dir     = os.path.dirname(os.path.abspath(__file__))
+_project_dir = os.path.normpath(os.path.join(_src_dir, '..'))
+
+
+def get_cache_path() -> str:
+    """Return the default on-disk location of the model cache."""
+    return os.path.join(_project_dir, 'results', 'lme', 'model_cache.sqlite')
+
+
+def dataset_hash(df: pd.DataFrame) -> str:
+    """Content hash of a model's dataset (values, index, column names)."""
+    values = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    header = '\x1f'.join(map(str, df.columns)).encode('utf-8')
+    return hashlib.sha256(values.tobytes() + header).hexdigest()
+
+
+def model_key(data_hash: str, formula: str, groups: str, reml: bool,
+              variant: str = '') -> str:
+    """
+    Content hash identifying one (dataset, formula, grouping, reml, statsmodels)
+    fit.  `variant` separates fits made a different way (e.g. warm-started),
+    whose estimates only agree to optimiser tolerance.
+    """
+    payload = (f"{data_hash}\x1f{' '.join(formula.split())}\x1f{groups}"
+               f"\x1f{int(bool(reml))}\x1f{statsmodels.__version__}")
+    if variant:
+        payload += f"\x1f{variant}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CachedMixedLMResult:
+    """
+    The parts of a MixedLMResults the LME pipeline reports on, restored from
+    the cache.  Attribute names match statsmodels, so reporting code can take
+    either object.
+    """
+
+    _FIELDS = ('params', 'fe_params', 'bse', 'pvalues', 'tvalues', 'cov_re', 'scale',
+               'llf', 'aic', 'bic', 'random_effects', 'resid', 'fittedvalues',
+               'converged', 'nobs', 'formula')
+
+    def __init__(self, state: dict):
+        self._conf_int = state.pop('conf_int')
+        for name in self._FIELDS:
+            setattr(self, name, state[name])
+
+    @classmethod
+    def from_result(cls, result, formula: str) -> 'CachedMixedLMResult':
+        """Copy what the pipeline needs out of a fitted MixedLMResults."""
+        return cls(_state_of(result, formula))
+
+    def conf_int(self, alpha: float = 0.05) -> pd.DataFrame:
+        if alpha != 0.05:
+            raise ValueError("only the 95% interval is cached")
+        return self._conf_int.copy()
+
+    def summary(self) -> str:
+        """Plain-text coefficient table (statsmodels' summary is not cached)."""
+        ci  = self._conf_int
+        idx = self.fe_params.index
+        table = pd.DataFrame({
+            'Coef.':    self.fe_params.round(3),
+            'Std.Err.': self.bse.reindex(idx).round(3),
+            'z':        self.tvalues.reindex(idx).round(3),
+            'P>|z|':    self.pvalues.reindex(idx).round(3),
+            '[0.025':   ci.iloc[:, 0].reindex(idx).round(3),
+            '0.975]':   ci.iloc[:, 1].reindex(idx).round(3),
+        })
+        header = (f"Mixed Linear Model (cached)  {self.formula}\n"
+                  f"No. Observations: {self.nobs}   Groups: {len(self.random_effects)}   "
+                  f"Scale: {self.scale:.4f}   Group Var: {self.cov_re.iloc[0, 0]:.4f}   "
+                  f"Log-Likelihood: {self.llf:.4f}   "
+                  f"Converged: {'Yes' if self.converged else 'No'}")
+        return header + '\n' + table.to_string()
+
+
+def _state_of(result, formula: str) -> dict:
+    if isinstance(result, CachedMixedLMResult):
+        state = {name: getattr(result, name) for name in CachedMixedLMResult._FIELDS}
+        state['conf_int'] = result.conf_int()
+        return state
+    return {
+        'params':         pd.Series(result.params).copy(),
+        'fe_params':      pd.Series(result.fe_params).copy(),
+        'bse':            pd.Series(result.bse).copy(),
+        'pvalues':        pd.Series(result.pvalues).copy(),
+        'tvalues':        pd.Series(result.tvalues).copy(),
+        'conf_int':       result.conf_int().copy(),
+        'cov_re':         result.cov_re.copy(),
+        'scale':          float(result.scale),
+        'llf':            float(result.llf),
+        'aic':            float(result.aic),
+        'bic':            float(result.bic),
+        'random_effects': {g: v.copy() for g, v in result.random_effects.items()},
+        'resid':          pd.Series(result.resid).copy(),
+        'fittedvalues':   pd.Series(result.fittedvalues).copy(),
+        'converged':      bool(getattr(result, 'converged', True)),
+        'nobs':           int(result.nobs),
+        'formula':        formula,
+    }
+
+
+class ModelCache:
+    """
+    Thin wrapper around a single-table SQLite database of pickled result states.
+
+    Usage
+    -----
+        with ModelCache() as cache:
+            hit = cache.get(key)              # CachedMixedLMResult or None
+            cache.put(key, result, formula)
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or get_cache_path()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS models ("
+            "  key     TEXT PRIMARY KEY,"
+            "  formula TEXT NOT NULL,"
+            "  created TEXT NOT NULL,"
+            "  state   BLOB NOT NULL"
+            ")"
+        )
+        self._conn.commit()
+
+    def get(self, key: str):
+        """Return the cached result for `key`, or None."""
+        row = self._conn.execute("SELECT state FROM models WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        try:
+            return CachedMixedLMResult(pickle.loads(row[0]))
+        except Exception:
+            # Unreadable entry (e.g. written by an incompatible pandas) — refit
+            return None
+
+    def put(self, key: str, result, formula: str):
+        """Insert or replace the entry for `key` from a fitted result."""
+        state = pickle.dumps(_state_of(result, formula), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO models (key, formula, created, state) VALUES (?, ?, ?, ?)",
+                (key, formula, time.strftime('%Y-%m-%d %H:%M:%S'), state),
+            )
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM models").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,281 @@
+"""
+Simulation-Based Power Analysis — Standalone Runner
+===================================================
+Power to detect the Session effect and the Session × Observer interaction of
+the final LME model for cohorts of different sizes, by simulation:
+
+  1. generating values — variance components from Model 1
+     (null_model_variance.csv: σ²_u between, σ² within) and fixed effects from
+     final_model_coefficients.csv (both written by run_lme_pipeline.py);
+     --interaction=β sets the Session × Observer effect, which the final
+     model only contains when the LRT selected Model 4
+  2. for every (participants, sessions) cell of the grid, draw R synthetic
+     cohorts at once with NumPy: every participant is rated by both observers
+     (T, P) in every session, Autism level is drawn per participant with the
+     observed Level-2 share, Sentiment scores are resampled from the observed
+     ones, and
+         y = X β + u_participant + e,   u ~ N(0, σ²_u),  e ~ N(0, σ²)
+  3. refit each cohort with the closed-form random-intercept solver (ri_lmm)
+     and record whether the Wald test of each target effect rejects at α
+
+Chunks of cohorts run in a process pool under --parallel; every chunk has its
+own seed (seed, participants, sessions, chunk), so the table does not depend
+on the number of workers.
+
+Usage (from the project root, after run_lme_pipeline.py):
+    python src/lme_power.py                    # default grid, 1000 cohorts per cell
+    python src/lme_power.py --reps=200 --parallel
+    python src/lme_power.py --interaction=-0.015   # Session × Observer β when the
+                                                   # final model is not Model 4
+
+Outputs written to  results/lme/power/
+    power_curve.csv
+    power_curve.png
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+import numpy as np
+import pandas as pd
+
+_script_dir  = os.path.dirname(os.path.abspath(__file__))
+_project_dir = os.path.normpath(os.path.join(_script_dir, '..'))
+if _script_dir not in sys.path:
+    sys.path.insert(0, _script_dir)
+
+import ri_lmm  # noqa: E402
+
+PARTICIPANTS   = (16, 24, 32, 48, 64)
+SESSIONS       = (4, 6, 8)
+TARGET_EFFECTS = ('Session_Centred', 'Session_Centred:Observer_Numeric')
+ALPHA          = 0.05
+CHUNK_SIZE     = 100
+
+
+def _lme(filename: str = '') -> str:
+    base = os.path.join(_project_dir, 'results', 'lme')
+    return os.path.join(base, filename) if filename else base
+
+
+def load_generating_values():
+    """(fixed effects Series, σ²_u, σ²) from the pipeline's saved results."""
+    coef = pd.read_csv(_lme('final_model_coefficients.csv'))
+    var = pd.read_csv(_lme('null_model_variance.csv')).set_index('Component')['Value']
+    var_between = float(var[var.index.str.startswith('Between')].iloc[0])
+    var_within  = float(var[var.index.str.startswith('Within')].iloc[0])
+    return coef.set_index('Parameter')['Estimate'], var_between, var_within
+
+
+def with_target_effects(fe: pd.Series, interaction: float = None) -> pd.Series:
+    """
+    Generating fixed effects with the Session × Observer term set to
+    `interaction` when one is given (added if the final model lacks it, e.g.
+    when the LRT kept Model 3, or Model 2 on Gold-only data).  Prints a
+    warning for every TARGET_EFFECTS term that is still missing, since its
+    power cannot be simulated.
+    """
+    fe = fe.copy()
+    if interaction is not None:
+        fe[TARGET_EFFECTS[1]] = float(interaction)
+    for term in TARGET_EFFECTS:
+        if term not in fe.index:
+            print(f"[Power] WARNING: {term} is not in final_model_coefficients.csv — "
+                  f"no power reported for it"
+                  + (" (pass --interaction=β to simulate it)" if term == TARGET_EFFECTS[1] else ""))
+    return fe
+
+
+def load_covariate_pool():
+    """Observed Level-2 autism share and Sentiment scores (defaults if no data)."""
+    try:
+        import contextlib
+        import io
+        from run_lme_pipeline import load_data, prepare_variables
+        with contextlib.redirect_stdout(io.StringIO()):
+            df_full, df_sent, has_sentiment = prepare_variables(load_data())
+        autism_share = float(df_full.groupby('Participant_ID')['Autism_Numeric'].first().mean())
+        sentiment = (df_sent['Sentiment_Score'].to_numpy(dtype=float)
+                     if has_sentiment and len(df_sent) else None)
+        return autism_share, sentiment
+    except FileNotFoundError:
+        return 0.5, None
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SIMULATION
+# ══════════════════════════════════════════════════════════════════════════════
+
+def simulate_cohorts(rng, n_cohorts, n_participants, n_sessions, fe, var_between,
+                     var_within, autism_share=0.5, sentiment=None):
+    """
+    Draw `n_cohorts` synthetic datasets of one design in one vectorised pass.
+
+    Returns (y, X, codes): y is (R × N), X is (R × N × p) with columns in
+    fe.index order, and codes (N,) maps rows to participants.
+    """
+    n_rows = n_participants * n_sessions * 2
+    codes    = np.repeat(np.arange(n_participants), n_sessions * 2)
+    session  = np.tile(np.repeat(np.arange(n_sessions, dtype=float), 2), n_participants)
+    observer = np.tile([0.0, 1.0], n_participants * n_sessions)
+
+    autism = (rng.random((n_cohorts, n_participants)) < autism_share).astype(float)[:, codes]
+    if sentiment is not None and len(sentiment):
+        sent = rng.choice(sentiment, size=(n_cohorts, n_rows))
+    else:
+        sent = rng.random((n_cohorts, n_rows))
+
+    columns = {
+        'Intercept':        np.ones((n_cohorts, n_rows)),
+        'Session_Centred':  np.broadcast_to(session, (n_cohorts, n_rows)),
+        'Observer_Numeric': np.broadcast_to(observer, (n_cohorts, n_rows)),
+        'Autism_Numeric':   autism,
+        'Sentiment_Score':  sent,
+    }
+
+    def _column(name):
+        if ':' in name:
+            return np.prod([_column(part) for part in name.split(':')], axis=0)
+        if name not in columns:
+            raise ValueError(f"cannot simulate fixed effect {name!r}")
+        return columns[name]
+
+    X = np.stack([_column(name) for name in fe.index], axis=-1)
+    y = (X @ fe.to_numpy(dtype=float)
+         + rng.normal(0.0, np.sqrt(var_between), (n_cohorts, n_participants))[:, codes]
+         + rng.normal(0.0, np.sqrt(var_within), (n_cohorts, n_rows)))
+    return y, X, codes
+
+
+def _power_chunk(seed, n_participants, n_sessions, chunk, n_cohorts, fe, var_between,
+                 var_within, autism_share, sentiment, alpha):
+    """Worker: simulate and refit one chunk; returns {effect: (rejections, estimates)}."""
+    rng = np.random.default_rng([seed, n_participants, n_sessions, chunk])
+    y, X, codes = simulate_cohorts(rng, n_cohorts, n_participants, n_sessions, fe,
+                                   var_between, var_within, autism_share, sentiment)
+    names = list(fe.index)
+    targets = [t for t in TARGET_EFFECTS if t in names]
+    out = {t: ([], []) for t in targets}
+    for r in range(n_cohorts):
+        try:
+            res = ri_lmm.fit(ri_lmm.GroupedData(y[r], X[r], codes, exog_names=names))
+        except np.linalg.LinAlgError:
+            continue
+        for t in targets:
+            out[t][0].append(bool(res.pvalues[t] < alpha))
+            out[t][1].append(float(res.fe_params[t]))
+    return n_participants, n_sessions, out
+
+
+def power_grid(fe, var_between, var_within, participants=PARTICIPANTS, sessions=SESSIONS,
+               reps=1000, alpha=ALPHA, autism_share=0.5, sentiment=None, seed=2024,
+               parallel=False, max_workers=None) -> pd.DataFrame:
+    """
+    Power for each TARGET_EFFECTS term over the participants × sessions grid.
+
+    Returns one row per (participants, sessions, effect) with the power, its
+    Monte-Carlo standard error and the mean estimate across the cohorts.
+    """
+    tasks = []
+    for n_p in participants:
+        for n_s in sessions:
+            for chunk, start in enumerate(range(0, reps, CHUNK_SIZE)):
+                tasks.append((seed, n_p, n_s, chunk, min(CHUNK_SIZE, reps - start), fe,
+                              var_between, var_within, autism_share, sentiment, alpha))
+
+    if parallel and len(tasks) > 1:
+        workers = max_workers or min(len(tasks), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(_power_chunk, *zip(*tasks)))
+    else:
+        outputs = [_power_chunk(*task) for task in tasks]
+
+    cells = {}
+    for n_p, n_s, out in outputs:
+        for effect, (hits, estimates) in out.items():
+            h, e = cells.setdefault((n_p, n_s, effect), ([], []))
+            h += hits
+            e += estimates
+
+    rows = []
+    for (n_p, n_s, effect), (hits, estimates) in sorted(cells.items()):
+        power = float(np.mean(hits))
+        rows.append({
+            'Participants':  n_p,
+            'Sessions':      n_s,
+            'Records':       n_p * n_s * 2,
+            'Effect':        effect,
+            'True_Beta':     float(fe[effect]),
+            'Mean_Estimate': float(np.mean(estimates)),
+            'Power':         power,
+            'MC_SE':         float(np.sqrt(power * (1 - power) / len(hits))),
+            'Cohorts':       len(hits),
+        })
+    return pd.DataFrame(rows)
+
+
+def save_power_plot(table: pd.DataFrame, path: str, target: float = 0.8):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    effects = list(dict.fromkeys(table['Effect']))
+    fig, axes = plt.subplots(1, len(effects), figsize=(6 * len(effects), 4.5), squeeze=False)
+    for ax, effect in zip(axes[0], effects):
+        block = table[table['Effect'] == effect]
+        for n_s, line in block.groupby('Sessions'):
+            ax.errorbar(line['Participants'], line['Power'], yerr=1.96 * line['MC_SE'],
+                        marker='o', capsize=3, label=f'{n_s} sessions')
+        ax.axhline(target, color='red', linestyle='--', linewidth=1, label=f'{target:.0%} power')
+        ax.set_ylim(0, 1.02)
+        ax.set_xlabel('Participants')
+        ax.set_ylabel('Power')
+        ax.set_title(f"{effect.replace('_Centred', '').replace('_Numeric', '')} "
+                     f"(β = {block['True_Beta'].iloc[0]:.4f})")
+        ax.grid(alpha=0.3)
+        ax.legend(fontsize=8)
+    plt.tight_layout()
+    plt.savefig(path, dpi=150, bbox_inches='tight')
+    plt.close()
+
+
+def main(reps: int = 1000, parallel: bool = False, interaction: float = None):
+    print("\n" + "=" * 60)
+    print("LME POWER ANALYSIS (SIMULATION)")
+    print("=" * 60)
+
+    fe, var_between, var_within = load_generating_values()
+    fe = with_target_effects(fe, interaction)
+    autism_share, sentiment = load_covariate_pool()
+    print(f"[Power] σ²_u = {var_between:.6f}, σ² = {var_within:.6f} (Model 1); "
+          f"fixed effects: {', '.join(fe.index)}")
+    print(f"[Power] Autism Level-2 share {autism_share:.3f}; Sentiment "
+          f"{'resampled from ' + str(len(sentiment)) + ' records' if sentiment is not None else 'U(0, 1)'}")
+
+    t0 = time.perf_counter()
+    table = power_grid(fe, var_between, var_within, reps=reps, autism_share=autism_share,
+                       sentiment=sentiment, parallel=parallel)
+    seconds = time.perf_counter() - t0
+    n_fits = len(PARTICIPANTS) * len(SESSIONS) * reps
+    print(f"[Power] {n_fits} cohorts simulated and refitted in {seconds:.1f}s "
+          f"({'process pool' if parallel else 'sequential'}, {1000 * seconds / n_fits:.2f} ms each)")
+
+    out_dir = _lme('power')
+    os.makedirs(out_dir, exist_ok=True)
+    table.round(6).to_csv(os.path.join(out_dir, 'power_curve.csv'), index=False)
+    save_power_plot(table, os.path.join(out_dir, 'power_curve.png'))
+    print(table.pivot_table(index=['Effect', 'Sessions'], columns='Participants',
+                            values='Power').round(3).to_string())
+    print("[Power] Saved: power/power_curve.csv, power/power_curve.png")
+
+
+if __name__ == '__main__':
+    reps = next((int(a.split('=', 1)[1]) for a in sys.argv[1:] if a.startswith('--reps=')), 1000)
+    interaction = next((float(a.split('=', 1)[1]) for a in sys.argv[1:]
+                        if a.startswith('--interaction=')), None)
+    main(reps=reps, parallel='--parallel' in sys.argv, interaction=interaction)
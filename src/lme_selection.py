@@ -0,0 +1,256 @@
+"""
+Covariate Selection Sweep
+=========================
+Searches over participant covariates added to the Model 2 structure
+(Session + Observer + Autism, random intercept per participant) on the full
+dataset, and ranks every model it fitted by AIC.
+
+Candidate covariates (encoded here, so the pipeline's own datasets and their
+cache keys are untouched):
+
+    Age_Centred        Age − mean participant age
+    Gender_Numeric     Male = 0 (reference), Female = 1
+    Severity_Numeric   Level of Severity as recorded (ordinal, treated as numeric)
+    Stimming_Numeric   Stimming behaviour identified: No = 0, Yes = 1
+
+Strategies
+    forward      start from Model 2, add the covariate that lowers AIC most,
+                 stop when no addition improves AIC by at least `min_gain`
+    backward     start from Model 2 + all covariates (or, with `max_terms`, the
+                 `max_terms` covariates whose single-covariate model has the
+                 lowest AIC), drop while AIC improves
+    exhaustive   every subset of up to `max_terms` covariates, built level by
+                 level; a subset is only extended when its AIC is within
+                 `prune_delta` of the best model so far (beam pruning)
+
+Formulas are canonicalised (sorted covariate set), so a model reached twice
+is fitted once.  Each round's new formulas are fitted together — in a process
+pool under `parallel` — and every fit goes through the LME model cache
+(keyed by dataset hash + formula), so a repeated sweep only fits what changed.
+
+Output  →  results/lme/covariate_selection_table.csv
+           (same columns as model_comparison_table.csv)
+"""
+
+import itertools
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import statsmodels.formula.api as smf
+from scipy import stats
+
+import ri_lmm
+from lme_model_cache import CachedMixedLMResult, ModelCache, dataset_hash, model_key
+
+BASE_TERMS = ['Session_Centred', 'Observer_Numeric', 'Autism_Numeric']
+COVARIATES = {
+    'Age_Centred':      'Age',
+    'Gender_Numeric':   'Gender',
+    'Severity_Numeric': 'Severity',
+    'Stimming_Numeric': 'Stimming',
+}
+_TERM_LABELS = {'Session_Centred': 'Session', 'Observer_Numeric': 'Observer',
+                'Autism_Numeric': 'Autism', **COVARIATES}
+STRATEGIES = ('forward', 'backward', 'exhaustive')
+
+
+def prepare_covariates(df_full: pd.DataFrame) -> pd.DataFrame:
+    """Copy of the full model dataset with the numeric covariate columns."""
+    df = df_full.copy()
+    ages = df.groupby('Participant_ID')['Age'].first()
+    df['Age_Centred']      = df['Age'] - ages.mean()
+    df['Gender_Numeric']   = (df['Gender'].astype(str) == 'Female').astype(int)
+    df['Severity_Numeric'] = pd.to_numeric(df['Severity_Level'].astype(str), errors='coerce')
+    df['Stimming_Numeric'] = (df['Stimming behaviour Identified?'].astype(str)
+                              .str.strip().str.lower() == 'yes').astype(int)
+    return df.dropna(subset=list(COVARIATES))
+
+
+def formula_for(covariates) -> str:
+    """Canonical formula for Model 2 + `covariates` (order-independent)."""
+    terms = BASE_TERMS + sorted(covariates)
+    return "Engagement_Score ~ " + " + ".join(terms)
+
+
+def _fit_state(formula: str, data: pd.DataFrame, fast: bool):
+    """Worker: fit one formula by ML; returns (formula, cacheable result, seconds)."""
+    t0 = time.perf_counter()
+    if fast:
+        result = ri_lmm.fit_formula(formula, data, groups='Participant_ID', reml=False)
+    else:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            result = smf.mixedlm(formula, data=data, groups=data['Participant_ID']).fit(reml=False)
+    return formula, CachedMixedLMResult.from_result(result, formula), time.perf_counter() - t0
+
+
+class _Fitter:
+    """Fits formulas once each: in-memory results, then the model cache, then a fit."""
+
+    def __init__(self, data, parallel, fast, use_cache, max_workers):
+        self.data, self.parallel, self.fast = data, parallel, fast
+        self.max_workers = max_workers
+        self.results, self.fit_seconds = {}, {}
+        self.cache = ModelCache() if use_cache else None
+        self._hash = dataset_hash(data)
+        self._variant = 'ri-lmm' if fast else ''
+        self.cache_hits = 0
+
+    def _key(self, formula):
+        return model_key(self._hash, formula, 'Participant_ID', reml=False,
+                         variant=self._variant)
+
+    def fit(self, formulas):
+        """Results for `formulas` (deduplicated; only unseen ones are fitted)."""
+        todo = [f for f in dict.fromkeys(formulas) if f not in self.results]
+        if self.cache is not None:
+            for f in list(todo):
+                hit = self.cache.get(self._key(f))
+                if hit is not None:
+                    self.results[f], self.fit_seconds[f] = hit, 0.0
+                    self.cache_hits += 1
+                    todo.remove(f)
+        if self.parallel and len(todo) > 1:
+            workers = self.max_workers or min(len(todo), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                outputs = list(pool.map(_fit_state, todo, [self.data] * len(todo),
+                                        [self.fast] * len(todo)))
+        else:
+            outputs = [_fit_state(f, self.data, self.fast) for f in todo]
+        for f, result, secs in outputs:
+            self.results[f], self.fit_seconds[f] = result, secs
+            if self.cache is not None:
+                self.cache.put(self._key(f), result, f)
+        return {f: self.results[f] for f in formulas}
+
+    def close(self):
+        if self.cache is not None:
+            self.cache.close()
+
+
+def _forward(fitter, max_terms, min_gain):
+    current = ()
+    best_aic = fitter.fit([formula_for(current)])[formula_for(current)].aic
+    while len(current) < max_terms:
+        options = [tuple(sorted(current + (c,))) for c in COVARIATES if c not in current]
+        if not options:
+            break
+        fits = fitter.fit([formula_for(o) for o in options])
+        aic, best = min((fits[formula_for(o)].aic, o) for o in options)
+        if best_aic - aic < min_gain:
+            break
+        current, best_aic = best, aic
+    return current
+
+
+def _backward(fitter, max_terms, min_gain):
+    current = tuple(sorted(COVARIATES))
+    if max_terms <= 0:
+        current = ()
+    elif max_terms < len(current):
+        singles = fitter.fit([formula_for((c,)) for c in COVARIATES])
+        ranked = sorted(COVARIATES, key=lambda c: singles[formula_for((c,))].aic)
+        current = tuple(sorted(ranked[:max_terms]))
+    best_aic = fitter.fit([formula_for(current)])[formula_for(current)].aic
+    while current:
+        options = [tuple(c for c in current if c != drop) for drop in current]
+        fits = fitter.fit([formula_for(o) for o in options])
+        aic, best = min((fits[formula_for(o)].aic, o) for o in options)
+        if best_aic - aic < min_gain:
+            break
+        current, best_aic = best, aic
+    return current
+
+
+def _exhaustive(fitter, max_terms, prune_delta):
+    level, evaluated = [()], [()]
+    best_aic = fitter.fit([formula_for(())])[formula_for(())].aic
+    for _ in range(max_terms):
+        keep = [s for s in level if fitter.results[formula_for(s)].aic <= best_aic + prune_delta]
+        level = sorted({tuple(sorted(s + (c,))) for s in keep for c in COVARIATES if c not in s})
+        if not level:
+            break
+        fits = fitter.fit([formula_for(s) for s in level])
+        best_aic = min(best_aic, min(r.aic for r in fits.values()))
+        evaluated += level
+    return min(evaluated, key=lambda s: fitter.results[formula_for(s)].aic)
+
+
+def _fixed_effects_label(formula: str) -> str:
+    terms = [t.strip() for t in formula.split('~', 1)[1].split('+')]
+    return ' + '.join(_TERM_LABELS.get(t, t) for t in terms)
+
+
+def ranking_table(fitter, n: int) -> pd.DataFrame:
+    """Every fitted model ranked by AIC, in the model_comparison_table.csv layout."""
+    base = formula_for(())
+    r_base = fitter.results.get(base)
+    rows = []
+    for formula, r in sorted(fitter.results.items(), key=lambda kv: kv[1].aic):
+        extra = len(r.fe_params) - len(BASE_TERMS) - 1
+        if r_base is None or formula == base:
+            lrt = ('—', '—', '—')
+        else:
+            chi2 = 2 * (r.llf - r_base.llf)
+            lrt = ('vs M2', round(chi2, 4), round(stats.chi2.sf(max(chi2, 0.0), extra), 6))
+        rows.append({
+            'Model':         '',
+            'N':             n,
+            'Fixed_Effects': _fixed_effects_label(formula),
+            'AIC':           round(r.aic, 2),
+            'BIC':           round(r.bic, 2),
+            'LogLik':        round(r.llf, 2),
+            'LRT_vs':        lrt[0],
+            'LRT_chi2':      lrt[1],
+            'LRT_p':         lrt[2],
+        })
+    table = pd.DataFrame(rows)
+    table['Model'] = [f"S{i + 1}" + (': Model 2' if fe == _fixed_effects_label(base) else '')
+                      for i, fe in enumerate(table['Fixed_Effects'])]
+    return table
+
+
+def run_selection(df_full: pd.DataFrame, out_path: str, strategy: str = 'forward',
+                  max_terms: int = None, min_gain: float = 0.0, prune_delta: float = 4.0,
+                  parallel: bool = False, fast: bool = False, use_cache: bool = True,
+                  max_workers: int = None) -> pd.DataFrame:
+    """
+    Run one selection strategy, write the ranked table to `out_path` and
+    return it.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"strategy must be one of {STRATEGIES}, got {strategy!r}")
+    max_terms = len(COVARIATES) if max_terms is None else max_terms
+    data = prepare_covariates(df_full)
+
+    t0 = time.perf_counter()
+    fitter = _Fitter(data, parallel, fast, use_cache, max_workers)
+    try:
+        if strategy == 'forward':
+            chosen = _forward(fitter, max_terms, min_gain)
+        elif strategy == 'backward':
+            chosen = _backward(fitter, max_terms, min_gain)
+        else:
+            chosen = _exhaustive(fitter, max_terms, prune_delta)
+    finally:
+        fitter.close()
+    wall = time.perf_counter() - t0
+
+    table = ranking_table(fitter, len(data))
+    table.to_csv(out_path, index=False)
+
+    n_all = sum(1 for k in range(max_terms + 1) for _ in itertools.combinations(COVARIATES, k))
+    n_fitted = len(fitter.results) - fitter.cache_hits
+    print(f"\n[LME] Covariate selection ({strategy}, up to {max_terms} covariate(s), "
+          f"{'process pool' if parallel else 'sequential'}"
+          f"{', ri_lmm solver' if fast else ''}): {len(fitter.results)} of {n_all} "
+          f"candidate models evaluated ({n_fitted} fitted, {fitter.cache_hits} from cache) "
+          f"in {wall:.2f}s")
+    chosen_label = ' + '.join(COVARIATES[c] for c in chosen) if chosen else 'none'
+    print(f"[LME] Selected covariates: {chosen_label}")
+    print(table.head(10).to_string(index=False))
+    print(f"[LME] Saved: {os.path.basename(out_path)}")
+    return table
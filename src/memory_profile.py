@@ -0,0 +1,74 @@
+"""
+Stage Memory Profiler
+=====================
+Peak-memory bookkeeping for the Bronze → Silver → Gold pipeline stages.
+
+Uses `tracemalloc`, which also sees NumPy / pandas buffer allocations, so the
+numbers reflect the frames each stage materialises.  Tracing is only switched
+on when a report is requested, because it slows every allocation down.
+
+Usage
+-----
+    memory = StageMemory()
+    with memory.stage('replace_null_strings'):
+        df = replace_null_strings(df, inplace=True)
+    memory.print_report()      # also stops tracing
+"""
+
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+_MB = 1024 * 1024
+
+
+class StageMemory:
+    """Collects peak / retained traced memory and wall time per named stage."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.rows = []
+        self._owns_tracing = False
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            self.rows.append({
+                'Stage':       name,
+                'Peak_MB':     round((peak - before) / _MB, 2),
+                'Retained_MB': round((current - before) / _MB, 2),
+                'Seconds':     round(time.perf_counter() - t0, 3),
+            })
+
+    def stop(self):
+        """Stop tracing if this profiler started it."""
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    def report(self) -> pd.DataFrame:
+        """One row per stage: peak and retained MB above the stage's starting point."""
+        return pd.DataFrame(self.rows, columns=['Stage', 'Peak_MB', 'Retained_MB', 'Seconds'])
+
+    def print_report(self, tag: str = '[Memory]'):
+        """Stop tracing and print the per-stage table."""
+        self.stop()
+        if not self.rows:
+            return
+        print(f"{tag} Peak memory per stage (MB above stage start):")
+        for line in self.report().to_string(index=False).splitlines():
+            print(f"{tag}   {line}")
@@ -0,0 +1,68 @@
+"""
+Page Module Registry
+====================
+Process-wide cache of the dashboard's page modules (RQ*, EDA*, NLP_*, LME …).
+
+Streamlit re-runs app.py on every interaction; executing each page's source
+again on every rerun re-ran its module-level setup (optional-dependency probes,
+mapping dicts) and put import cost into sidebar navigation latency.  The
+registry executes a module file once per process and re-executes it only when
+the file's mtime changes, so edits during development are still picked up.
+
+    module = load_page_module("/abs/path/Module/RQ1.py")
+    import_times()   # → DataFrame: Module, Import_Seconds, Loads, Loaded_At
+"""
+
+import importlib.util
+import os
+import threading
+import time
+
+import pandas as pd
+
+_lock     = threading.RLock()
+_registry = {}   # path → {'module', 'mtime', 'seconds', 'loads', 'loaded_at'}
+
+
+def load_page_module(path: str, name: str = None):
+    """
+    Return the module for `path`, executing the file only if it is new or
+    has changed on disk since it was last loaded.  Returns None if the file
+    does not exist.
+    """
+    if not os.path.exists(path):
+        return None
+    path  = os.path.abspath(path)
+    name  = name or os.path.splitext(os.path.basename(path))[0]
+    mtime = os.path.getmtime(path)
+
+    with _lock:
+        entry = _registry.get(path)
+        if entry is not None and entry['mtime'] == mtime:
+            return entry['module']
+
+        t0 = time.perf_counter()
+        spec   = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _registry[path] = {
+            'module':    module,
+            'mtime':     mtime,
+            'seconds':   time.perf_counter() - t0,
+            'loads':     (entry['loads'] + 1) if entry else 1,
+            'loaded_at': time.strftime('%H:%M:%S'),
+        }
+        return module
+
+
+def import_times() -> pd.DataFrame:
+    """Import time of the last (re)load of every registered module, slowest first."""
+    with _lock:
+        rows = [{
+            'Module':         os.path.splitext(os.path.basename(p))[0],
+            'Import_Seconds': round(e['seconds'], 4),
+            'Loads':          e['loads'],
+            'Loaded_At':      e['loaded_at'],
+        } for p, e in _registry.items()]
+    report = pd.DataFrame(rows, columns=['Module', 'Import_Seconds', 'Loads', 'Loaded_At'])
+    return report.sort_values('Import_Seconds', ascending=False).reset_index(drop=True)
@@ -0,0 +1,134 @@
+"""
+Record Watermark
+================
+Row-level change detection for incremental Bronze → Silver → Gold runs.
+
+Every record is identified by the survey key
+
+    (Participant id, Session number, Submitted_by)
+
+plus an occurrence counter, because the export contains a handful of repeated
+keys (e.g. participant 102 has sessions 2-9 entered twice).  Next to each
+layer output a small watermark file stores, per output row, that key and a
+hash of the *input* row it was built from:
+
+    Data/Silver/data_silver_cleaned.watermark.csv   (hash of the Bronze row)
+    Data/Gold/data_gold_analytical.watermark.csv    (hash of the Silver row)
+
+On the next run only rows whose key is new or whose hash changed are pushed
+through the transformation; every other output row is reused as-is.
+"""
+
+import os
+
+import pandas as pd
+
+KEY_COLUMNS = ['Participant id', 'Session number', 'Submitted_by']
+_OCCURRENCE = '_occurrence'
+_ROW_HASH   = '_row_hash'
+
+
+def watermark_path_for(csv_path: str) -> str:
+    """Watermark file that sits next to a layer CSV."""
+    return os.path.splitext(csv_path)[0] + '.watermark.csv'
+
+
+def record_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalised record keys for every row of a Bronze or Silver frame.
+
+    Submitted_by is normalised the same way as `clean_submitted_by`
+    (upper-case, stripped, P/C → P) so raw Bronze keys line up with Silver.
+    """
+    keys = pd.DataFrame({
+        'Participant id': df['Participant id'].astype(str).str.strip(),
+        'Session number': df['Session number'].astype(str).str.strip(),
+        'Submitted_by':   (df['Submitted_by'].astype(str).str.upper().str.strip()
+                           .replace({'P/C': 'P'})),
+    }, index=df.index)
+    keys[_OCCURRENCE] = keys.groupby(KEY_COLUMNS, sort=False).cumcount()
+    return keys
+
+
+def row_hashes(df: pd.DataFrame) -> pd.Series:
+    """64-bit content hash of each row (index excluded)."""
+    return pd.util.hash_pandas_object(df, index=False).astype('uint64')
+
+
+def build_watermark(source: pd.DataFrame) -> pd.DataFrame:
+    """Key + content hash for every row of the frame an output was built from."""
+    wm = record_keys(source).reset_index(drop=True)
+    wm[_ROW_HASH] = row_hashes(source).to_numpy()
+    return wm
+
+
+def save_watermark(watermark: pd.DataFrame, csv_path: str):
+    """Write the watermark for a layer CSV (call after the CSV itself is saved)."""
+    watermark.to_csv(watermark_path_for(csv_path), index=False)
+
+
+def load_watermark(csv_path: str, n_rows: int):
+    """
+    Load the watermark for an existing layer output.
+
+    Returns None when there is no watermark, when it is older than the CSV
+    (the output was rewritten by something else) or when its row count does
+    not match the output — in all of those cases the caller must do a full run.
+    """
+    path = watermark_path_for(csv_path)
+    if not (os.path.exists(path) and os.path.exists(csv_path)):
+        return None
+    if os.path.getmtime(path) < os.path.getmtime(csv_path):
+        return None
+    wm = pd.read_csv(path, dtype=str)
+    if len(wm) != n_rows:
+        return None
+    wm[_OCCURRENCE] = wm[_OCCURRENCE].astype(int)
+    wm[_ROW_HASH]   = wm[_ROW_HASH].astype('uint64')
+    return wm
+
+
+def plan_increment(source: pd.DataFrame, previous: pd.DataFrame):
+    """
+    Match the current input rows against the previous watermark.
+
+    Parameters
+    ----------
+    source : pd.DataFrame
+        Current input layer (Bronze for Silver, Silver for Gold).
+    previous : pd.DataFrame
+        Watermark of the existing output, row-aligned with that output.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, pd.DataFrame]
+        reuse_pos  : for each input row, the position of the output row that can
+                     be reused, or -1 when the row is new / changed;
+        changed    : boolean mask of input rows that must be transformed;
+        watermark  : the watermark describing the current input.
+    """
+    current = build_watermark(source)
+    key_cols = KEY_COLUMNS + [_OCCURRENCE, _ROW_HASH]
+    prev = previous[key_cols].copy()
+    prev['_pos'] = range(len(prev))
+    matched = current[key_cols].merge(prev, on=key_cols, how='left')
+    reuse_pos = matched['_pos'].fillna(-1).astype(int).to_numpy()
+    return reuse_pos, reuse_pos < 0, current
+
+
+def merge_increment(existing: pd.DataFrame, fresh: pd.DataFrame,
+                    reuse_pos, changed) -> pd.DataFrame:
+    """
+    Assemble the new output in input order from reused and freshly built rows.
+
+    `fresh` holds the transformed rows for `changed`, in input order; rows of
+    `existing` whose key disappeared from the input are dropped.
+    """
+    reused = existing.iloc[reuse_pos[~changed]]
+    order  = pd.Series(range(len(changed)))
+    reused.index = order[~changed].to_numpy()
+    fresh = fresh.copy()
+    fresh.index  = order[changed].to_numpy()
+    columns = list(existing.columns) + [c for c in fresh.columns if c not in existing.columns]
+    merged = pd.concat([reused, fresh], sort=False).reindex(columns=columns)
+    return merged.sort_index().reset_index(drop=True)
@@ -0,0 +1,316 @@
+"""
+Random-Intercept LMM Solver
+===========================
+Fast ML / REML fitting of Gaussian random-intercept models
+
+    y_ij = x_ijᵀ β + u_i + e_ij,    u_i ~ N(0, σ²_u),   e_ij ~ N(0, σ²)
+
+— the structure of every model in run_lme_pipeline.py (random intercept per
+Participant_ID).
+
+With γ = σ²_u / σ² the marginal covariance of group i is σ² (I + γ 11ᵀ), whose
+inverse and determinant are closed-form (w_i = γ / (1 + n_i γ)):
+
+    XᵀV⁻¹X · σ² = XᵀX − Σ_i w_i s_i s_iᵀ          s_i = Σ_j x_ij
+    XᵀV⁻¹y · σ² = Xᵀy − Σ_i w_i s_i t_i           t_i = Σ_j y_ij
+    log|V|      = N log σ² + Σ_i log(1 + n_i γ)
+
+so after one pass over the data for the per-group sufficient statistics
+(n_i, s_i, t_i) and the global XᵀX, Xᵀy, yᵀy, the likelihood profiled over β
+and σ² is a function of γ alone and is maximised by a bounded 1-D search —
+no per-group matrices, no iterative solver over the full parameter vector.
+
+The result exposes the quantities the pipeline reads, under statsmodels'
+names: fe_params, bse, tvalues, pvalues, conf_int(), cov_re, scale, llf, aic,
+bic, random_effects, resid, fittedvalues.
+
+Run this file directly for the parity check against statsmodels MixedLM and
+a timing comparison on the pipeline's models:   python src/ri_lmm.py
+"""
+
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+import patsy
+from scipy import optimize, stats
+
+_LOG_GAMMA_BOUNDS = (-25.0, 12.0)
+
+
+class GroupedData:
+    """
+    Per-group sufficient statistics of (y, X, groups) for a random-intercept fit.
+
+    Build once and refit with different column subsets via `subset()`, which
+    is how many model variants on one dataset stay cheap.
+    """
+
+    def __init__(self, endog, exog, groups, exog_names=None):
+        self.y = np.asarray(endog, dtype=float)
+        self.X = np.asarray(exog, dtype=float)
+        if self.X.ndim == 1:
+            self.X = self.X[:, None]
+        self.exog_names = list(exog_names) if exog_names is not None else (
+            list(exog.columns) if isinstance(exog, pd.DataFrame)
+            else [f'x{i}' for i in range(self.X.shape[1])])
+        self.index = endog.index if isinstance(endog, pd.Series) else pd.RangeIndex(len(self.y))
+
+        codes, self.group_labels = pd.factorize(np.asarray(groups), sort=True)
+        self.codes = codes
+        n_groups = len(self.group_labels)
+        self.n_i = np.bincount(codes, minlength=n_groups).astype(float)
+        self.S = np.zeros((n_groups, self.X.shape[1]))
+        np.add.at(self.S, codes, self.X)
+        self.t = np.bincount(codes, weights=self.y, minlength=n_groups)
+        self.XtX = self.X.T @ self.X
+        self.Xty = self.X.T @ self.y
+        self.yty = float(self.y @ self.y)
+
+    @property
+    def nobs(self) -> int:
+        return len(self.y)
+
+    def subset(self, columns):
+        """A view of these statistics restricted to the named exog columns."""
+        idx = [self.exog_names.index(c) for c in columns]
+        sub = object.__new__(GroupedData)
+        sub.__dict__.update(self.__dict__)
+        sub.X, sub.S = self.X[:, idx], self.S[:, idx]
+        sub.XtX = self.XtX[np.ix_(idx, idx)]
+        sub.Xty = self.Xty[idx]
+        sub.exog_names = [self.exog_names[i] for i in idx]
+        return sub
+
+
+def _profile(data: GroupedData, gamma: float, reml: bool):
+    """Profiled log-likelihood at variance ratio γ, plus β̂, σ̂², A = σ² XᵀV⁻¹X."""
+    n, p = data.nobs, data.X.shape[1]
+    w = gamma / (1.0 + data.n_i * gamma)
+    A = data.XtX - (data.S * w[:, None]).T @ data.S
+    b = data.Xty - data.S.T @ (w * data.t)
+    beta = np.linalg.solve(A, b)
+    q = data.yty - float(np.sum(w * data.t ** 2)) - float(b @ beta)
+    logdet_h = float(np.sum(np.log1p(data.n_i * gamma)))
+    if reml:
+        dof = n - p
+        _, logdet_a = np.linalg.slogdet(A)
+        scale = q / dof
+        llf = -0.5 * (dof * np.log(2 * np.pi * scale) + dof + logdet_h + logdet_a)
+    else:
+        scale = q / n
+        llf = -0.5 * (n * np.log(2 * np.pi * scale) + n + logdet_h)
+    return llf, beta, scale, A
+
+
+def _observed_information(data, gamma, beta, scale, reml):
+    """
+    Observed information of (β, σ²_u, σ²) at the optimum — used for the
+    fixed-effect standard errors so that they match statsmodels, which inverts
+    the full observed Hessian (including the β / variance cross terms).
+
+    The β blocks are closed-form from the group sums (V_i⁻¹ = (I − c_i 11ᵀ)/σ²
+    with c_i = σ²_u / (σ² + n_i σ²_u)):
+
+        −∂²ℓ/∂β∂βᵀ   = XᵀV⁻¹X
+        −∂²ℓ/∂β∂σ²_u = Xᵀ V⁻¹ 11ᵀ V⁻¹ r
+        −∂²ℓ/∂β∂σ²   = Xᵀ V⁻² r
+
+    The 2 × 2 variance block is taken by central differences of the
+    (restricted) log-likelihood at fixed β.
+    """
+    y, X, codes, n_i, S = data.y, data.X, data.codes, data.n_i, data.S
+    p = X.shape[1]
+    r = y - X @ beta
+    R = np.bincount(codes, weights=r, minlength=len(n_i))
+
+    def loglike(s2u, s2):
+        c = s2u / (s2 + n_i * s2u)
+        quad = (float(r @ r) - float(np.sum(c * R ** 2))) / s2
+        logdet = len(y) * np.log(s2) + float(np.sum(np.log1p(n_i * s2u / s2)))
+        dof = len(y)
+        if reml:
+            # −½ log|XᵀV⁻¹X|, with XᵀV⁻¹X = A / σ²
+            A = data.XtX - (S * c[:, None]).T @ S
+            logdet += np.linalg.slogdet(A)[1] - p * np.log(s2)
+            dof -= p
+        return -0.5 * (dof * np.log(2 * np.pi) + logdet + quad)
+
+    s2u, s2 = gamma * scale, scale
+    c = s2u / (s2 + n_i * s2u)
+    info = np.empty((p + 2, p + 2))
+    info[:p, :p] = (data.XtX - (S * c[:, None]).T @ S) / s2
+    info[:p, p] = S.T @ (R * (1 - c * n_i) ** 2) / s2 ** 2
+    info[:p, p + 1] = (X.T @ r - S.T @ (R * (2 * c - c ** 2 * n_i))) / s2 ** 2
+    info[p:, :p] = info[:p, p:].T
+
+    theta = np.array([s2u, s2])
+    h = 1e-4 * np.maximum(theta, 1e-8)
+    for i in range(2):
+        for j in range(i, 2):
+            def f(di, dj):
+                t = theta.copy()
+                t[i] += di * h[i]
+                t[j] += dj * h[j]
+                return loglike(*t)
+            info[p + i, p + j] = info[p + j, p + i] = -(
+                f(1, 1) - f(1, -1) - f(-1, 1) + f(-1, -1)) / (4 * h[i] * h[j])
+    return info
+
+
+class RandomInterceptResult:
+    """Fitted random-intercept model (attribute names follow MixedLMResults)."""
+
+    def __init__(self, data: GroupedData, gamma, beta, scale, llf, A, reml, converged):
+        p = len(beta)
+        names = data.exog_names
+        self.reml      = reml
+        self.converged = converged
+        self.nobs      = data.nobs
+        self.gamma     = float(gamma)
+        self.scale     = float(scale)
+        self.llf       = float(llf)
+        self.fe_params = pd.Series(beta, index=names)
+        self.cov_re    = pd.DataFrame([[gamma * scale]], index=['Group'], columns=['Group'])
+
+        # Fixed-effect covariance from the full observed information, as
+        # statsmodels does; σ² A⁻¹ (its β block alone) on the γ = 0 boundary.
+        cov_fe = scale * np.linalg.inv(A)
+        if gamma > 0:
+            info = _observed_information(data, gamma, beta, scale, reml)
+            try:
+                cov_fe = np.linalg.inv(info)[:p, :p]
+            except np.linalg.LinAlgError:
+                pass
+        self.cov_fe  = pd.DataFrame(cov_fe, index=names, columns=names)
+        self.bse     = pd.Series(np.sqrt(np.diag(cov_fe)), index=names)
+        self.tvalues = self.fe_params / self.bse
+        self.pvalues = pd.Series(2 * stats.norm.sf(np.abs(self.tvalues)), index=names)
+        self.params  = pd.concat([self.fe_params, pd.Series({'Group Var': self.gamma})])
+
+        df = p + 2                                   # β, σ²_u, σ² (statsmodels' count)
+        self.aic = np.nan if reml else -2 * (self.llf - df)
+        self.bic = np.nan if reml else -2 * self.llf + np.log(self.nobs) * df
+
+        # BLUPs û_i = γ/(1 + n_i γ) Σ_j (y_ij − x_ijᵀβ̂); the pandas views of
+        # them are built on first access (most refits only read β, SEs, llf).
+        marginal = data.X @ beta
+        resid_sum = np.bincount(data.codes, weights=data.y - marginal,
+                                minlength=len(data.group_labels))
+        self._u        = gamma / (1.0 + data.n_i * gamma) * resid_sum
+        self._fitted   = marginal + self._u[data.codes]
+        self._y        = data.y
+        self._index    = data.index
+        self._groups   = data.group_labels
+
+    @cached_property
+    def random_effects(self) -> dict:
+        return {g: pd.Series([self._u[i]], index=['Group']) for i, g in enumerate(self._groups)}
+
+    @cached_property
+    def fittedvalues(self) -> pd.Series:
+        return pd.Series(self._fitted, index=self._index)
+
+    @cached_property
+    def resid(self) -> pd.Series:
+        return pd.Series(self._y - self._fitted, index=self._index)
+
+    def conf_int(self, alpha: float = 0.05) -> pd.DataFrame:
+        z = stats.norm.ppf(1 - alpha / 2)
+        return pd.DataFrame({0: self.fe_params - z * self.bse, 1: self.fe_params + z * self.bse})
+
+    def summary(self) -> str:
+        ci = self.conf_int()
+        table = pd.DataFrame({
+            'Coef.':    self.fe_params.round(3),
+            'Std.Err.': self.bse.round(3),
+            'z':        self.tvalues.round(3),
+            'P>|z|':    self.pvalues.round(3),
+            '[0.025':   ci[0].round(3),
+            '0.975]':   ci[1].round(3),
+        })
+        header = (f"Random-intercept LMM ({'REML' if self.reml else 'ML'})   "
+                  f"No. Observations: {self.nobs}   Groups: {len(self.random_effects)}\n"
+                  f"Scale: {self.scale:.4f}   Group Var: {self.cov_re.iloc[0, 0]:.4f}   "
+                  f"Log-Likelihood: {self.llf:.4f}   Converged: {'Yes' if self.converged else 'No'}")
+        return header + '\n' + table.to_string()
+
+
+def fit(data: GroupedData, reml: bool = False) -> RandomInterceptResult:
+    """Maximise the profiled likelihood over log γ, checking the γ = 0 boundary."""
+    neg = lambda lg: -_profile(data, np.exp(lg), reml)[0]
+    opt = optimize.minimize_scalar(neg, bounds=_LOG_GAMMA_BOUNDS, method='bounded',
+                                   options={'xatol': 1e-10})
+    gamma = float(np.exp(opt.x))
+    if _profile(data, 0.0, reml)[0] >= -opt.fun:
+        gamma = 0.0
+    llf, beta, scale, A = _profile(data, gamma, reml)
+    return RandomInterceptResult(data, gamma, beta, scale, llf, A, reml, bool(opt.success))
+
+
+def fit_formula(formula: str, data: pd.DataFrame, groups: str = 'Participant_ID',
+                reml: bool = False) -> RandomInterceptResult:
+    """Fit `formula` with a random intercept per `groups` (rows with NaN are dropped)."""
+    y, X = patsy.dmatrices(formula, data, return_type='dataframe')
+    return fit(GroupedData(y.iloc[:, 0], X, data.loc[y.index, groups]), reml=reml)
+
+
+if __name__ == '__main__':
+    import time
+
+    import statsmodels.formula.api as smf
+
+    import run_lme_pipeline as lme
+
+    df_full, df_sent, has_sentiment = lme.prepare_variables(lme.load_data())
+    datasets = {'full': df_full, 'sent': df_sent}
+
+    print("\n[RI-LMM] Parity with statsmodels MixedLM (max absolute differences)")
+    print(f"[RI-LMM]   {'Model':<24s} {'fit':4s} {'fe':>8s} {'bse':>8s} {'p':>8s} "
+          f"{'cov_re':>8s} {'scale':>8s} {'llf':>8s} {'u_i':>8s} {'resid':>8s}")
+    timings = []
+    for key, (label, formula, ds) in lme.CANDIDATE_MODELS.items():
+        data = datasets[ds]
+        if data is None or len(data) == 0:
+            continue
+        for reml in (False, True):
+            ref = smf.mixedlm(formula, data, groups=data['Participant_ID']).fit(reml=reml)
+            ours = fit_formula(formula, data, reml=reml)
+            idx = ours.fe_params.index
+            re_ref = np.array([v.iloc[0] for v in ref.random_effects.values()])
+            re_our = np.array([v.iloc[0] for v in ours.random_effects.values()])
+            diffs = [
+                np.max(np.abs(ours.fe_params - ref.fe_params[idx])),
+                np.max(np.abs(ours.bse - ref.bse[idx])),
+                np.max(np.abs(ours.pvalues - ref.pvalues[idx])),
+                abs(ours.cov_re.iloc[0, 0] - ref.cov_re.iloc[0, 0]),
+                abs(ours.scale - ref.scale),
+                abs(ours.llf - ref.llf),
+                np.max(np.abs(re_our - re_ref)),
+                np.max(np.abs(ours.resid - ref.resid)),
+            ]
+            print(f"[RI-LMM]   {label:<24s} {'REML' if reml else 'ML':4s} "
+                  + ' '.join(f"{d:8.1e}" for d in diffs))
+
+        reps = 20
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            smf.mixedlm(formula, data, groups=data['Participant_ID']).fit(reml=False)
+        t_sm = (time.perf_counter() - t0) / reps
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            fit_formula(formula, data)
+        t_ri = (time.perf_counter() - t0) / reps
+        y, X = patsy.dmatrices(formula, data, return_type='dataframe')
+        grouped = GroupedData(y.iloc[:, 0], X, data.loc[y.index, 'Participant_ID'])
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            fit(grouped)
+        t_pre = (time.perf_counter() - t0) / reps
+        timings.append((label, t_sm, t_ri, t_pre))
+
+    print("\n[RI-LMM] Mean fit time per model (ML, 20 repetitions, incl. formula parsing)")
+    for label, t_sm, t_ri, t_pre in timings:
+        print(f"[RI-LMM]   {label:<24s} statsmodels {1000 * t_sm:7.2f} ms   "
+              f"ri_lmm {1000 * t_ri:6.2f} ms   ({t_sm / t_ri:5.1f}x)   "
+              f"prebuilt statistics {1000 * t_pre:6.2f} ms   ({t_sm / t_pre:5.1f}x)")
@@ -6,6 +6,18 @@ The Streamlit dashboard will then load and display the saved outputs.
 
 Usage (from the project root, with venv activated):
     python src/run_lme_pipeline.py
+    python src/run_lme_pipeline.py --parallel    # fit all models in a process pool
+    python src/run_lme_pipeline.py --no-cache    # refit even if a cached fit exists
+    python src/run_lme_pipeline.py --warm-start  # sentiment-subset models seeded from the previous one
+    python src/run_lme_pipeline.py --fast-solver # closed-form random-intercept solver (ri_lmm)
+    python src/run_lme_pipeline.py --item-sweep  # Model 2 fitted to each of the 21 normalised items
+    python src/run_lme_pipeline.py --bootstrap=500  # parametric bootstrap p-values for the LRTs
+    python src/run_lme_pipeline.py --cv          # leave-one-participant-out cross-validation
+    python src/run_lme_pipeline.py --select=forward   # covariate search: forward | backward |
+                                                      # exhaustive (--max-terms=k)
+
+Fitted models are cached in results/lme/model_cache.sqlite, keyed by dataset
+content, formula, grouping, reml flag and statsmodels version.
 
 Outputs written to  results/lme/
     model_comparison_table.csv
@@ -15,10 +27,16 @@ Outputs written to  results/lme/
     random_effects_distribution.png
     forest_plot_fixed_effects.png
     lme_summary.csv
+    items/item_coefficients.csv, items/item_summary.csv   (--item-sweep)
+    bootstrap/bootstrap_lrt_summary.csv + per-test replicate files   (--bootstrap)
+    cv_scores.csv                                                     (--cv)
+    covariate_selection_table.csv                                     (--select)
 """
 
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # Ensure UTF-8 output on Windows (avoids UnicodeEncodeError for special chars)
 if hasattr(sys.stdout, 'reconfigure'):
@@ -34,6 +52,17 @@ from scipy import stats
 # ── Path setup ─────────────────────────────────────────────────────────────────
 _script_dir  = os.path.dirname(os.path.abspath(__file__))
 _project_dir = os.path.normpath(os.path.join(_script_dir, '..'))
+if _script_dir not in sys.path:
+    sys.path.insert(0, _script_dir)
+
+from layer_storage import load_layer, layer_csv_path  # noqa: E402
+from lme_model_cache import ModelCache, dataset_hash, model_key  # noqa: E402
+from lme_nested import NestedDesign, fit_nested, print_fit_report  # noqa: E402
+import ri_lmm  # noqa: E402
+from lme_item_sweep import run_item_sweep  # noqa: E402
+from lme_bootstrap import bootstrap_lrt, print_bootstrap_report  # noqa: E402
+from lme_cv import run_cv  # noqa: E402
+from lme_selection import run_selection  # noqa: E402
 
 
 def _results_dir(sub: str = '') -> str:
@@ -53,16 +82,21 @@ def _out(filename: str) -> str:
 
 def load_data() -> pd.DataFrame:
     """Load Gold + Sentiment dataset, falling back to Gold-only if needed."""
-    sent_path = os.path.join(_project_dir, 'results', 'nlp', 'data_gold_with_sentiment.csv')
-    gold_path = os.path.join(_project_dir, 'Data', 'Gold', 'data_gold_analytical.csv')
-
-    if os.path.exists(sent_path):
-        print(f"[LME] Loading Gold+Sentiment dataset: {sent_path}")
-        df = pd.read_csv(sent_path, low_memory=False)
-    elif os.path.exists(gold_path):
-        print(f"[LME] Sentiment dataset not found — loading Gold only: {gold_path}")
-        df = pd.read_csv(gold_path, low_memory=False)
-    else:
+    sent_path = layer_csv_path('gold_sentiment')
+    gold_path = layer_csv_path('gold')
+
+    try:
+        df = load_layer('gold_sentiment', float32=False)
+        print(f"[LME] Loaded Gold+Sentiment dataset: {sent_path}")
+    except FileNotFoundError:
+        df = None
+    if df is None:
+        try:
+            df = load_layer('gold', float32=False)
+            print(f"[LME] Sentiment dataset not found — loaded Gold only: {gold_path}")
+        except FileNotFoundError:
+            df = None
+    if df is None:
         raise FileNotFoundError(
             "Neither data_gold_with_sentiment.csv nor data_gold_analytical.csv found.\n"
             "Run `python src/run_nlp_pipeline.py` first."
@@ -136,18 +170,210 @@ def _lrt(result_full, result_reduced, extra_params: int):
     return lr_stat, p_val
 
 
+# Nested comparisons reported by the pipeline: name → (reduced key, full key)
+LRT_TESTS = {
+    'M2vM1': ('r1',  'r2'),
+    'M3vM2': ('r2s', 'r3'),
+    'M4vM3': ('r3',  'r4'),
+}
+
+
+def run_bootstrap_lrts(df_full: pd.DataFrame, df_sent: pd.DataFrame, n_boot: int,
+                       parallel: bool = False, fast: bool = False, seed: int = 2024):
+    """
+    Parametric bootstrap p-values (n_boot replicates each) for LRT_TESTS, next
+    to the asymptotic χ² p-values; resumes from replicate files on disk.
+    """
+    datasets = {'full': df_full, 'sent': df_sent}
+    out_dir = _results_dir('bootstrap')
+    rows = []
+    for name, (red, full) in LRT_TESTS.items():
+        data = datasets[CANDIDATE_MODELS[full][2]]
+        if data is None or len(data) == 0:
+            continue
+        rows.append(bootstrap_lrt(data, CANDIDATE_MODELS[red][1], CANDIDATE_MODELS[full][1],
+                                  n_boot, out_dir, name, seed=seed,
+                                  parallel=parallel, fast=fast))
+    print_bootstrap_report(rows)
+    summary = pd.DataFrame(rows).drop(columns=['path', 'seconds'])
+    summary.round(6).to_csv(os.path.join(out_dir, 'bootstrap_lrt_summary.csv'), index=False)
+    print("[LME] Saved: bootstrap/bootstrap_lrt_summary.csv")
+    return summary
+
+
+def _flag_value(flag: str, default: int = None):
+    """Integer value of a `--flag=N` argument; `default` for a bare `--flag`."""
+    for arg in sys.argv[1:]:
+        if arg == flag:
+            return default
+        if arg.startswith(flag + '='):
+            return int(arg.split('=', 1)[1])
+    return None
+
+
+_M2_FORMULA = "Engagement_Score ~ Session_Centred + Observer_Numeric + Autism_Numeric"
+
+# Candidate models: key → (label, formula, dataset).  'full' = df_full,
+# 'sent' = the Sentiment_Score subset (Models 3/4 and the Model 2 refit they
+# are compared against).  Every model is independent given its dataset.
+CANDIDATE_MODELS = {
+    'r1':  ('Model 1',                 "Engagement_Score ~ 1",                 'full'),
+    'r2':  ('Model 2',                 _M2_FORMULA,                            'full'),
+    'r2s': ('Model 2 (sent. subset)',  _M2_FORMULA,                            'sent'),
+    'r3':  ('Model 3',                 _M2_FORMULA + " + Sentiment_Score",     'sent'),
+    'r4':  ('Model 4',                 _M2_FORMULA + " + Sentiment_Score"
+                                       " + Session_Centred:Observer_Numeric",  'sent'),
+}
+
+# Datasets whose models --warm-start fits as one nested chain.  On 'full' the
+# chain starts from the intercept-only model, and seeding Model 2 from it takes
+# more optimiser evaluations than a cold fit (python src/lme_nested.py).
+WARM_START_DATASETS = ('sent',)
+
+
+def _fit_mixedlm(key: str, formula: str, data: pd.DataFrame, fast: bool = False):
+    """
+    Fit one random-intercept model by ML; returns (key, result, seconds).
+    `fast` uses the closed-form profile-likelihood solver in ri_lmm instead
+    of statsmodels.
+    """
+    t0 = time.perf_counter()
+    if fast:
+        result = ri_lmm.fit_formula(formula, data, groups='Participant_ID', reml=False)
+    else:
+        result = smf.mixedlm(formula, data=data, groups=data["Participant_ID"]).fit(reml=False)
+    return key, result, time.perf_counter() - t0
+
+
+def _fit_chain(keys, data: pd.DataFrame, warm_start: bool = False, fast: bool = False):
+    """
+    Fit the models `keys` (all on `data`, in CANDIDATE_MODELS order).
+
+    With `warm_start` they are fitted as one nested sequence on a shared
+    design matrix, each seeded from the previous estimates (see lme_nested).
+    Returns ([(key, result, seconds), ...], nested fits or None).
+    """
+    formulas = [CANDIDATE_MODELS[k][1] for k in keys]
+    if warm_start and not fast:
+        fits = fit_nested(NestedDesign(data, formulas), formulas, reml=False)
+        return [(k, f.result, f.seconds) for k, f in zip(keys, fits)], fits
+    return [_fit_mixedlm(k, f, data, fast) for k, f in zip(keys, formulas)], None
+
+
+def fit_candidate_models(df_full: pd.DataFrame, df_sent: pd.DataFrame = None,
+                         parallel: bool = False, max_workers: int = None,
+                         use_cache: bool = True, warm_start: bool = False,
+                         fast: bool = False):
+    """
+    Fit every model in CANDIDATE_MODELS (the 'sent' ones only when `df_sent`
+    has rows), one after another or concurrently in a process pool.
+
+    The same formula and data reach statsmodels in both modes, so the fitted
+    results are identical; LRTs and tables are built from them afterwards.
+    With `use_cache`, models whose (data, formula, grouping, reml,
+    statsmodels version) is already in the model cache are loaded instead of
+    fitted, and new fits are added to it.
+
+    With `warm_start`, the models of each dataset in WARM_START_DATASETS are
+    fitted as a nested sequence (shared design matrix, start_params from the
+    previous model) and their optimiser evaluations are printed; the other
+    datasets' models are fitted cold as usual.  `python src/lme_nested.py`
+    compares warm and cold fits of every chain.  Warm estimates agree with
+    the cold fits to optimiser tolerance (~1e-7), not bit for bit, so they
+    are cached under their own key.
+
+    With `fast`, every model is fitted by ri_lmm's 1-D profile-likelihood
+    solver (no warm start needed); it matches statsmodels to ~1e-6 and is
+    cached under its own key as well.
+
+    Returns
+    -------
+    tuple[dict, dict]
+        key → fitted result (MixedLMResults, or CachedMixedLMResult on a cache
+        hit), and key → fit time in seconds (0 for cache hits).
+    """
+    datasets = {'full': df_full, 'sent': df_sent}
+    all_keys = [key for key, (_, _, ds) in CANDIDATE_MODELS.items()
+                if datasets[ds] is not None and len(datasets[ds]) > 0]
+
+    warm = {ds: warm_start and not fast and ds in WARM_START_DATASETS for ds in datasets}
+    fitted, seconds = {}, {}
+    t0 = time.perf_counter()
+
+    cache, cache_keys, missing = None, {}, list(all_keys)
+    if use_cache:
+        cache = ModelCache()
+        data_hashes = {ds: dataset_hash(d) for ds, d in datasets.items()
+                       if d is not None and len(d) > 0}
+        missing = []
+        for key in all_keys:
+            _, formula, ds = CANDIDATE_MODELS[key]
+            variant = 'ri-lmm' if fast else ('nested-warm' if warm[ds] else '')
+            cache_keys[key] = model_key(data_hashes[ds], formula, 'Participant_ID',
+                                        reml=False, variant=variant)
+            hit = cache.get(cache_keys[key])
+            if hit is not None:
+                fitted[key], seconds[key] = hit, 0.0
+            else:
+                missing.append(key)
+
+    # Units of work: one nested chain per warm-started dataset, one model otherwise
+    units = [[k for k in missing if CANDIDATE_MODELS[k][2] == ds] for ds in datasets if warm[ds]]
+    units = [u for u in units if u] + [[k] for k in missing if not warm[CANDIDATE_MODELS[k][2]]]
+    unit_args = [(u, datasets[CANDIDATE_MODELS[u[0]][2]], warm[CANDIDATE_MODELS[u[0]][2]], fast)
+                 for u in units]
+
+    nested_reports = []
+    if parallel and len(units) > 1:
+        workers = max_workers or min(len(units), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_fit_chain, *args) for args in unit_args]
+            outputs = [future.result() for future in as_completed(futures)]
+        mode = f"process pool, {workers} worker(s)"
+    else:
+        outputs = [_fit_chain(*args) for args in unit_args]
+        mode = "sequential"
+    for done, nested in outputs:
+        for key, result, secs in done:
+            fitted[key], seconds[key] = result, secs
+        if nested is not None:
+            nested_reports.append(nested)
+    if fast:
+        mode += ", ri_lmm solver"
+    elif any(warm.values()):
+        mode += ", nested warm start (" + ", ".join(ds for ds in datasets if warm[ds]) + ")"
+
+    if cache is not None:
+        for key in missing:
+            cache.put(cache_keys[key], fitted[key], CANDIDATE_MODELS[key][1])
+        cache.close()
+    wall = time.perf_counter() - t0
+
+    print(f"\n[LME] Model fit times ({mode}, {len(all_keys) - len(missing)} loaded from cache):")
+    for key in all_keys:
+        status = '' if key in missing else '  (cached)'
+        print(f"[LME]   {CANDIDATE_MODELS[key][0]:<24s} {seconds[key]:7.3f}s{status}")
+    print(f"[LME]   {'Wall clock':<24s} {wall:7.3f}s "
+          f"(sum of fits {sum(seconds.values()):.3f}s)")
+    for nested in nested_reports:
+        print_fit_report(nested, tag='[LME]')
+    return fitted, seconds
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # STEP 3: MODEL 1 — NULL MODEL
 # ══════════════════════════════════════════════════════════════════════════════
 
-def fit_model1(df_full: pd.DataFrame):
+def _fitted_or_fit(key: str, data: pd.DataFrame, fitted):
+    return fitted if fitted is not None else _fit_mixedlm(key, CANDIDATE_MODELS[key][1], data)[1]
+
+
+def fit_model1(df_full: pd.DataFrame, fitted=None):
     print("\n" + "=" * 60)
     print("MODEL 1: NULL MODEL (Unconditional Means)")
     print("=" * 60)
 
-    m = smf.mixedlm("Engagement_Score ~ 1", data=df_full,
-                    groups=df_full["Participant_ID"])
-    r = m.fit(reml=False)
+    r = _fitted_or_fit('r1', df_full, fitted)
     print(r.summary())
 
     var_between = r.cov_re.iloc[0, 0]
@@ -169,16 +395,12 @@ def fit_model1(df_full: pd.DataFrame):
 # STEP 4: MODEL 2 — MAIN EFFECTS
 # ══════════════════════════════════════════════════════════════════════════════
 
-def fit_model2(df_full: pd.DataFrame, result1):
+def fit_model2(df_full: pd.DataFrame, result1, fitted=None):
     print("\n" + "=" * 60)
     print("MODEL 2: MAIN EFFECTS (Session + Observer + Autism Level)")
     print("=" * 60)
 
-    m = smf.mixedlm(
-        "Engagement_Score ~ Session_Centred + Observer_Numeric + Autism_Numeric",
-        data=df_full, groups=df_full["Participant_ID"]
-    )
-    r = m.fit(reml=False)
+    r = _fitted_or_fit('r2', df_full, fitted)
     print(r.summary())
 
     lr_stat, lr_p = _lrt(r, result1, extra_params=3)
@@ -192,24 +414,15 @@ def fit_model2(df_full: pd.DataFrame, result1):
 # STEP 5: MODEL 3 — ADD SENTIMENT
 # ══════════════════════════════════════════════════════════════════════════════
 
-def fit_model3(df_sent: pd.DataFrame):
+def fit_model3(df_sent: pd.DataFrame, fitted_2s=None, fitted_3=None):
     print("\n" + "=" * 60)
     print("MODEL 3: MAIN EFFECTS + SENTIMENT SCORE")
     print(f"(N = {len(df_sent)} records with Sentiment Score)")
     print("=" * 60)
 
     # Refit Model 2 on the same sentiment subset for a fair LRT
-    m2s = smf.mixedlm(
-        "Engagement_Score ~ Session_Centred + Observer_Numeric + Autism_Numeric",
-        data=df_sent, groups=df_sent["Participant_ID"]
-    )
-    r2s = m2s.fit(reml=False)
-
-    m3 = smf.mixedlm(
-        "Engagement_Score ~ Session_Centred + Observer_Numeric + Autism_Numeric + Sentiment_Score",
-        data=df_sent, groups=df_sent["Participant_ID"]
-    )
-    r3 = m3.fit(reml=False)
+    r2s = _fitted_or_fit('r2s', df_sent, fitted_2s)
+    r3  = _fitted_or_fit('r3', df_sent, fitted_3)
     print(r3.summary())
 
     lr_stat, lr_p = _lrt(r3, r2s, extra_params=1)
@@ -231,17 +444,12 @@ def fit_model3(df_sent: pd.DataFrame):
 # STEP 6: MODEL 4 — INTERACTION
 # ══════════════════════════════════════════════════════════════════════════════
 
-def fit_model4(df_sent: pd.DataFrame, result3):
+def fit_model4(df_sent: pd.DataFrame, result3, fitted=None):
     print("\n" + "=" * 60)
     print("MODEL 4: INTERACTION (Session × Observer)")
     print("=" * 60)
 
-    m4 = smf.mixedlm(
-        "Engagement_Score ~ Session_Centred + Observer_Numeric + Autism_Numeric "
-        "+ Sentiment_Score + Session_Centred:Observer_Numeric",
-        data=df_sent, groups=df_sent["Participant_ID"]
-    )
-    r4 = m4.fit(reml=False)
+    r4 = _fitted_or_fit('r4', df_sent, fitted)
     print(r4.summary())
 
     lr_stat, lr_p = _lrt(r4, result3, extra_params=1)
@@ -531,17 +739,23 @@ def save_summary(results: dict, shapiro_stat: float, shapiro_p: float,
 # MAIN
 # ══════════════════════════════════════════════════════════════════════════════
 
-def main():
+def main(parallel: bool = False, use_cache: bool = True, warm_start: bool = False,
+         fast: bool = False, n_boot: int = None, cv: bool = False):
     print("\n" + "=" * 60)
     print("LME MODELLING PIPELINE")
     print("=" * 60)
 
     df = load_data()
     df_full, df_sent, has_sentiment = prepare_variables(df)
+    use_sent = has_sentiment and len(df_sent) > 0
 
-    # ── Fit models ─────────────────────────────────────────────────────────
-    r1, icc, var_between, var_within = fit_model1(df_full)
-    r2, lr_2v1_chi2, lr_2v1_p        = fit_model2(df_full, r1)
+    # ── Fit models (all at once), then report / compare in order ──────────
+    fitted, _ = fit_candidate_models(df_full, df_sent if use_sent else None,
+                                     parallel=parallel, use_cache=use_cache,
+                                     warm_start=warm_start, fast=fast)
+
+    r1, icc, var_between, var_within = fit_model1(df_full, fitted['r1'])
+    r2, lr_2v1_chi2, lr_2v1_p        = fit_model2(df_full, r1, fitted['r2'])
 
     results = {
         'r1':           r1,
@@ -557,9 +771,10 @@ def main():
     best_model = r2
     best_name  = 'Model 2'
 
-    if has_sentiment and len(df_sent) > 0:
-        r2s, r3, lr_3v2_chi2, lr_3v2_p, sent_coef, sent_p = fit_model3(df_sent)
-        r4, lr_4v3_chi2, lr_4v3_p = fit_model4(df_sent, r3)
+    if use_sent:
+        r2s, r3, lr_3v2_chi2, lr_3v2_p, sent_coef, sent_p = fit_model3(
+            df_sent, fitted['r2s'], fitted['r3'])
+        r4, lr_4v3_chi2, lr_4v3_p = fit_model4(df_sent, r3, fitted['r4'])
 
         results.update({
             'r2s':          r2s,
@@ -587,6 +802,16 @@ def main():
     shapiro_stat, shapiro_p = save_diagnostics(best_model)
     save_forest_plot(coef_table)
     save_summary(results, shapiro_stat, shapiro_p, best_name, best_model)
+    if n_boot:
+        run_bootstrap_lrts(df_full, df_sent if use_sent else None, n_boot,
+                           parallel=parallel, fast=fast)
+    if cv:
+        cv_table = run_cv({'full': df_full, 'sent': df_sent if use_sent else None},
+                          CANDIDATE_MODELS, _out('cv_scores.csv'),
+                          parallel=parallel, fast=fast)
+        cv_best = cv_table.loc[cv_table['Best_in_Dataset'], 'Model'].tolist()
+        print(f"[LME] Highest held-out ELPD per dataset: {', '.join(cv_best)} "
+              f"(LRT selection: {best_name})")
 
     # ── Chapter 4 summary ───────────────────────────────────────────────────
     print("\n" + "=" * 60)
@@ -612,5 +837,45 @@ def main():
     print("[LME] Pipeline complete. Results saved to results/lme/")
 
 
-if __name__ == '__main__':
-    main()
+def main_item_sweep(parallel: bool = False, fast: bool = False):
+    """Item-level sweep: the Model 2 structure fitted to every NORM_ITEMS column."""
+    print("\n" + "=" * 60)
+    print("LME ITEM-LEVEL SWEEP")
+    print("=" * 60)
+
+    df_full, _, _ = prepare_variables(load_data())
+    run_item_sweep(df_full, _M2_FORMULA.split('~', 1)[1], _results_dir('items'),
+                   parallel=parallel, fast=fast)
+
+
+def main_selection(strategy: str, max_terms: int = None, parallel: bool = False,
+                   fast: bool = False, use_cache: bool = True):
+    """Covariate selection sweep (Age, Gender, Severity, Stimming) on top of Model 2."""
+    print("\n" + "=" * 60)
+    print("LME COVARIATE SELECTION")
+    print("=" * 60)
+
+    df_full, _, _ = prepare_variables(load_data())
+    run_selection(df_full, _out('covariate_selection_table.csv'), strategy=strategy,
+                  max_terms=max_terms, parallel=parallel, fast=fast, use_cache=use_cache)
+
+
+def _flag_text(flag: str):
+    """Text value of a `--flag=value` argument, or None."""
+    return next((a.split('=', 1)[1] for a in sys.argv[1:] if a.startswith(flag + '=')), None)
+
+
+if __name__ == '__main__' and _flag_text('--select') is not None:
+    main_selection(_flag_text('--select'), max_terms=_flag_value('--max-terms'),
+                   parallel='--parallel' in sys.argv, fast='--fast-solver' in sys.argv,
+                   use_cache='--no-cache' not in sys.argv)
+elif __name__ == '__main__' and '--item-sweep' in sys.argv:
+    main_item_sweep(parallel='--parallel' in sys.argv,
+                    fast='--fast-solver' in sys.argv)
+elif __name__ == '__main__':
+    main(parallel='--parallel' in sys.argv,
+         use_cache='--no-cache' not in sys.argv,
+         warm_start='--warm-start' in sys.argv,
+         fast='--fast-solver' in sys.argv,
+         n_boot=_flag_value('--bootstrap', default=500),
+         cv='--cv' in sys.argv)
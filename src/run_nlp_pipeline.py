@@ -6,6 +6,7 @@ The Streamlit dashboard will then load and display the saved outputs.
 
 Usage (from the project root, with venv activated):
     python src/run_nlp_pipeline.py
+    python src/run_nlp_pipeline.py --self-check   # offline check of run_sentiment (stub model)
 
 Outputs written to  results/nlp/
     descriptive/
@@ -25,10 +26,12 @@ Outputs written to  results/nlp/
     ground_truth_sample.csv
     pipeline_summary.csv
     data_gold_with_sentiment.csv   (Gold + Sentiment_Score)
+    sentiment_cache.sqlite         (per-note score cache, reused across runs)
 """
 
 import os
 import sys
+import time
 
 import pandas as pd
 import numpy as np
@@ -56,6 +59,8 @@ from silver_to_gold_transformation import (
     norm_label,
     get_gold_path,
 )
+from sentiment_cache import SentimentCache, note_key
+from layer_storage import load_layer, layer_csv_path, write_parquet
 
 # ── Constants ──────────────────────────────────────────────────────────────────
 _NOTES_COL    = NOTES_COLUMNS.get('additional_notes', 'Additional_notes_observations')
@@ -64,6 +69,10 @@ _OBSERVER_COL = METADATA_COLUMNS.get('observer',       'Submitted_by')
 _PART_COL     = METADATA_COLUMNS.get('participant_id', 'Participant id')
 _AUTISM_COL   = 'Autism Level'
 
+_MODEL_NAME   = 'distilbert-base-uncased-finetuned-sst-2-english'
+_MAX_LENGTH   = 128
+_BATCH_SIZE   = 32   # notes per forward pass in run_sentiment
+
 
 def _results_dir(sub: str = '') -> str:
     base = os.path.join(_project_dir, 'results', 'nlp')
@@ -76,7 +85,7 @@ def _results_dir(sub: str = '') -> str:
 # B1 — Load DistilBERT
 # ══════════════════════════════════════════════════════════════════════════════
 
-def load_model():
+def load_model(batch_size: int = _BATCH_SIZE):
     print("\n[B1] Loading DistilBERT model …")
     from transformers import pipeline as hf_pipeline
     import torch
@@ -84,11 +93,12 @@ def load_model():
     print(f"     Device: {'GPU' if device == 0 else 'CPU'}")
     pipe = hf_pipeline(
         "sentiment-analysis",
-        model="distilbert-base-uncased-finetuned-sst-2-english",
+        model=_MODEL_NAME,
         top_k=None,
         device=device,
         truncation=True,
-        max_length=128,
+        max_length=_MAX_LENGTH,
+        batch_size=batch_size,
     )
     test = pipe("The participant showed good engagement today")[0]
     pos  = next(r['score'] for r in test if r['label'] == 'POSITIVE')
@@ -100,31 +110,113 @@ def load_model():
 # B2 — Run Sentiment Analysis
 # ══════════════════════════════════════════════════════════════════════════════
 
-def run_sentiment(gold: pd.DataFrame, pipe) -> pd.DataFrame:
+def _positive_score(result) -> float:
+    """Extract the POSITIVE probability from one pipeline result (list of label dicts)."""
+    return next((r['score'] for r in result if r['label'] == 'POSITIVE'), np.nan)
+
+
+def _score_batch(pipe, texts: list, index: list) -> list:
+    """
+    Score one batch of notes.  If the pipeline raises, the batch is split in
+    half and each half retried, so a single bad note only costs its own score
+    instead of the whole batch.
+    """
+    try:
+        results = pipe(texts)
+        return [_positive_score(r) for r in results]
+    except Exception as e:
+        if len(texts) == 1:
+            print(f"\n     Error at index {index[0]}: {e}")
+            return [np.nan]
+        mid = len(texts) // 2
+        return (_score_batch(pipe, texts[:mid], index[:mid]) +
+                _score_batch(pipe, texts[mid:], index[mid:]))
+
+
+def run_sentiment(gold: pd.DataFrame, pipe=None, batch_size: int = _BATCH_SIZE,
+                  use_cache: bool = True, cache_path: str = None):
+    """
+    Score every non-empty observation note with the sentiment pipeline.
+
+    Identical notes (after whitespace normalisation) are scored once, and
+    scores already in the on-disk sentiment cache are reused; only the misses
+    go through the model, and they are written back afterwards.  If ``pipe``
+    is None the model is loaded lazily — a fully cached rerun never loads it.
+
+    Misses are sorted by length before being cut into batches of
+    ``batch_size`` so that each forward pass pads to a similar length;
+    scores are scattered back into ``Sentiment_Score`` by row position.
+
+    Returns
+    -------
+    tuple[pd.DataFrame, dict]
+        (gold with Sentiment_Score, run statistics incl. notes/sec and cache hits)
+    """
     print("\n[B2] Running sentiment analysis on observation notes …")
     gold = gold.copy()
-    scores = []
-    total = len(gold)
-    for i, (idx, row) in enumerate(gold.iterrows()):
-        text = str(row.get(_NOTES_COL, '')) if pd.notna(row.get(_NOTES_COL)) else ''
-        if text.strip():
-            try:
-                result = pipe(text)[0]
-                pos = next((r['score'] for r in result if r['label'] == 'POSITIVE'), np.nan)
-                scores.append(pos)
-            except Exception as e:
-                print(f"     Error at index {idx}: {e}")
-                scores.append(np.nan)
-        else:
-            scores.append(np.nan)
-        if (i + 1) % 50 == 0 or (i + 1) == total:
-            print(f"     Progress: {i+1}/{total}", end='\r')
+
+    if _NOTES_COL in gold.columns:
+        notes = gold[_NOTES_COL].fillna('').astype(str).str.strip()
+    else:
+        notes = pd.Series('', index=gold.index)
+    positions = np.flatnonzero(notes.str.len().to_numpy() > 0)
+    keys      = [note_key(t, _MODEL_NAME, _MAX_LENGTH) for t in notes.iloc[positions]]
+
+    # One representative text per distinct note
+    unique = {}
+    for pos, key in zip(positions, keys):
+        unique.setdefault(key, (notes.iloc[pos], gold.index[pos]))
+
+    cache  = SentimentCache(cache_path) if use_cache else None
+    known  = cache.get_many(unique) if cache is not None else {}
+    misses = [k for k in unique if k not in known]
+    print(f"     Notes: {len(positions)}  |  Distinct: {len(unique)}  |  "
+          f"Cache hits: {len(known)}  |  To score: {len(misses)}")
+
+    # Length buckets: shortest notes first so each batch pads to a similar length
+    misses.sort(key=lambda k: len(unique[k][0]))
+    total = len(misses)
+    fresh = {}
+
+    start = time.perf_counter()
+    if total and pipe is None:
+        pipe = load_model(batch_size)
+        start = time.perf_counter()
+    for b in range(0, total, batch_size):
+        batch_keys = misses[b:b + batch_size]
+        batch_out  = _score_batch(pipe, [unique[k][0] for k in batch_keys],
+                                  [unique[k][1] for k in batch_keys])
+        fresh.update(zip(batch_keys, batch_out))
+        print(f"     Progress: {min(b + batch_size, total)}/{total}", end='\r')
+    elapsed = time.perf_counter() - start
+
+    if cache is not None:
+        cache.put_many({k: v for k, v in fresh.items() if pd.notna(v)})
+        cache.close()
+
+    scores = np.full(len(gold), np.nan)
+    lookup = {**known, **fresh}
+    scores[positions] = [lookup[k] for k in keys]
 
     gold['Sentiment_Score'] = scores
     ss = gold['Sentiment_Score'].dropna()
+    rate = total / elapsed if total and elapsed > 0 else float('nan')
     print(f"\n     Non-null: {len(ss)}  |  Mean: {ss.mean():.4f}  |  SD: {ss.std():.4f}  |  "
           f"Min: {ss.min():.4f}  |  Max: {ss.max():.4f}")
-    return gold
+    print(f"     Throughput: {total} notes in {elapsed:.2f}s  "
+          f"({rate:.1f} notes/sec, batch size {batch_size})")
+
+    stats_out = {
+        'notes_total':   len(positions),
+        'notes_unique':  len(unique),
+        'cache_hits':    len(known),
+        'cache_misses':  total,
+        'notes_scored':  total,
+        'batch_size':    batch_size,
+        'elapsed_sec':   round(elapsed, 3),
+        'notes_per_sec': round(rate, 2),
+    }
+    return gold, stats_out
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -468,10 +560,11 @@ def run_dual_trajectory(gold: pd.DataFrame):
 # B8 — Save Gold + Sentiment
 # ══════════════════════════════════════════════════════════════════════════════
 
-def save_gold_with_sentiment(gold: pd.DataFrame):
+def save_gold_with_sentiment(gold: pd.DataFrame, sentiment_stats: dict = None):
     print("\n[B8] Saving Gold dataset with Sentiment_Score …")
     path = os.path.join(_results_dir(), 'data_gold_with_sentiment.csv')
     gold.to_csv(path, index=False)
+    write_parquet(gold, path)
     print(f"     Saved: data_gold_with_sentiment.csv  "
           f"(Rows: {len(gold)}, Columns: {len(gold.columns)})")
 
@@ -489,6 +582,14 @@ def save_gold_with_sentiment(gold: pd.DataFrame):
         {'Metric': 'Engagement_Score non-null',  'Value': int(es.notna().sum())},
         {'Metric': 'Engagement_Score mean',      'Value': round(es.mean(), 4)},
     ])
+    if sentiment_stats:
+        summary = pd.concat([summary, pd.DataFrame([
+            {'Metric': 'Sentiment distinct notes',   'Value': sentiment_stats.get('notes_unique')},
+            {'Metric': 'Sentiment cache hits',       'Value': sentiment_stats.get('cache_hits')},
+            {'Metric': 'Sentiment cache misses',     'Value': sentiment_stats.get('cache_misses')},
+            {'Metric': 'Sentiment batch size',       'Value': sentiment_stats.get('batch_size')},
+            {'Metric': 'Sentiment notes/sec',        'Value': sentiment_stats.get('notes_per_sec')},
+        ])], ignore_index=True)
     summary.to_csv(os.path.join(_results_dir(), 'pipeline_summary.csv'), index=False)
     print("     Saved: pipeline_summary.csv")
 
@@ -503,9 +604,9 @@ def main():
     print("=" * 60)
 
     # Load Silver data
-    silver_path = os.path.join(_project_dir, 'Data', 'Silver', 'data_silver_cleaned.csv')
+    silver_path = layer_csv_path('silver')
     print(f"\nLoading Silver data from: {silver_path}")
-    df = pd.read_csv(silver_path, encoding='latin-1')
+    df = load_layer('silver')
     print(f"  Loaded: {len(df)} rows, {len(df.columns)} columns")
 
     # Build Gold layer
@@ -513,9 +614,8 @@ def main():
     gold = build_gold_df(df)
     print(f"  Gold: {len(gold)} rows, {len(gold.columns)} columns")
 
-    # B1 + B2
-    pipe = load_model()
-    gold = run_sentiment(gold, pipe)
+    # B1 + B2  (model is only loaded if some notes are not in the cache)
+    gold, sentiment_stats = run_sentiment(gold)
 
     # B3
     run_descriptive(gold)
@@ -530,7 +630,7 @@ def main():
     run_dual_trajectory(gold)
 
     # B8
-    save_gold_with_sentiment(gold)
+    save_gold_with_sentiment(gold, sentiment_stats)
 
     print("\n" + "=" * 60)
     print("  Pipeline complete.  All results saved to results/nlp/")
@@ -538,5 +638,55 @@ def main():
     print("=" * 60)
 
 
+def self_check():
+    """
+    Offline check of run_sentiment with a stub classifier (no model download):
+    batch bisection around a failing note, deduplication of identical notes,
+    a second run served from the cache, and the run statistics.
+    """
+    import tempfile
+
+    bad = 'this note breaks the model'
+    texts = ['calm and engaged', 'calm  and engaged ', 'cried twice', bad,
+             'smiled at the story', 'cried twice', '', None, 'asked questions']
+    gold = pd.DataFrame({_NOTES_COL: texts})
+    calls = []
+
+    def stub(batch):
+        calls.append(list(batch))
+        if bad in batch:
+            raise RuntimeError('stub failure')
+        return [[{'label': 'POSITIVE', 'score': len(t) / 100},
+                 {'label': 'NEGATIVE', 'score': 1 - len(t) / 100}] for t in batch]
+
+    expected = [len(str(t).strip()) / 100 if t and str(t).strip() and t != bad else np.nan
+                for t in texts]
+    expected[1] = expected[0]                     # same note after whitespace normalisation
+    fields = {'notes_total', 'notes_unique', 'cache_hits', 'cache_misses', 'notes_scored',
+              'batch_size', 'elapsed_sec', 'notes_per_sec'}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, 'sentiment_cache.sqlite')
+        out, st1 = run_sentiment(gold, pipe=stub, batch_size=4, cache_path=cache_path)
+        np.testing.assert_allclose(out['Sentiment_Score'].to_numpy(), expected)
+        assert set(st1) == fields, sorted(set(st1) ^ fields)
+        assert (st1['notes_total'], st1['notes_unique']) == (7, 5), st1
+        assert (st1['cache_hits'], st1['cache_misses'], st1['notes_scored']) == (0, 5, 5), st1
+        assert st1['batch_size'] == 4 and st1['elapsed_sec'] >= 0 and st1['notes_per_sec'] > 0, st1
+        assert any(len(c) == 1 and c[0] == bad for c in calls), "failing note was not isolated"
+
+        # The failing note is not cached; everything else is served from the cache
+        calls.clear()
+        out2, st2 = run_sentiment(gold, pipe=stub, batch_size=4, cache_path=cache_path)
+        np.testing.assert_allclose(out2['Sentiment_Score'].to_numpy(), expected)
+        assert (st2['cache_hits'], st2['cache_misses']) == (4, 1), st2
+        assert calls == [[bad]], calls
+
+    print("\n[Self-check] run_sentiment: bisection, deduplication, cache and stats OK")
+
+
 if __name__ == '__main__':
-    main()
+    if '--self-check' in sys.argv:
+        self_check()
+    else:
+        main()
@@ -0,0 +1,95 @@
+"""
+Sentiment Score Cache
+=====================
+Persistent, content-addressed store for DistilBERT sentiment scores so that
+`run_nlp_pipeline.py` only runs inference on notes it has never seen before.
+
+Each entry is keyed by a SHA-256 hash of
+    (model name, truncation settings, normalised note text)
+so changing the model or max_length automatically misses the old entries.
+
+Default location  →  results/nlp/sentiment_cache.sqlite
+"""
+
+import hashlib
+import os
+import sqlite3
+
+_src_dir     = os.path.dirname(os.path.abspath(__file__))
+_project_dir = os.path.normpath(os.path.join(_src_dir, '..'))
+
+
+def get_cache_path() -> str:
+    """Return the default on-disk location of the sentiment cache."""
+    return os.path.join(_project_dir, 'results', 'nlp', 'sentiment_cache.sqlite')
+
+
+def normalise_note(text: str) -> str:
+    """Collapse runs of whitespace and strip, so trivial edits still hit the cache."""
+    return ' '.join(str(text).split())
+
+
+def note_key(text: str, model_name: str, max_length: int, truncation: bool = True) -> str:
+    """Content hash identifying one (model, truncation, note) combination."""
+    payload = f"{model_name}\x1f{int(truncation)}\x1f{max_length}\x1f{normalise_note(text)}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class SentimentCache:
+    """
+    Thin wrapper around a single-table SQLite database.
+
+    Usage
+    -----
+        with SentimentCache() as cache:
+            hits = cache.get_many(keys)
+            cache.put_many({key: score, ...})
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or get_cache_path()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sentiment ("
+            "  key   TEXT PRIMARY KEY,"
+            "  score REAL NOT NULL"
+            ")"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys) -> dict:
+        """Return {key: score} for every key already present in the cache."""
+        keys = list(keys)
+        found = {}
+        # SQLite caps bound parameters per statement — query in chunks
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            marks = ','.join('?' * len(chunk))
+            rows  = self._conn.execute(
+                f"SELECT key, score FROM sentiment WHERE key IN ({marks})", chunk
+            ).fetchall()
+            found.update(rows)
+        return found
+
+    def put_many(self, scores: dict):
+        """Insert or replace {key: score} entries in one transaction."""
+        if not scores:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sentiment (key, score) VALUES (?, ?)",
+                list(scores.items()),
+            )
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM sentiment").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
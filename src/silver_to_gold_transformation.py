@@ -7,7 +7,9 @@ Gold analytical layer:
   Step 1  Reverse-code Q8  (distress → positive polarity, consistent with all other items)
   Step 2  Min-Max normalise all 21 quantitative items to 0.0 – 1.0
   Step 3  Compute composite Engagement Score (row-mean of 21 normalised items)
-  Step 4  Save Gold dataset  →  Data/Gold/data_gold_analytical.csv
+  Step 4  Save Gold dataset  →  Data/Gold/data_gold_analytical.csv (+ typed .parquet)
+  Step 5  Build the session aggregate cube (Module/session_cube.py)
+                             →  Data/Gold/aggregate_cube.csv (+ .parquet, .fingerprint)
 """
 
 import os
@@ -23,6 +25,14 @@ if _module_dir not in sys.path:
     sys.path.insert(0, _module_dir)
 
 from questionnaire_mapping import QUESTION_MAPPING  # noqa: E402
+from layer_storage import (  # noqa: E402
+    apply_layer_schema, csv_dtypes, layer_csv_path, load_layer, read_fingerprint, write_parquet,
+)
+from memory_profile import StageMemory  # noqa: E402
+from session_cube import build_cube, save_cube, source_fingerprint  # noqa: E402
+from record_watermark import (  # noqa: E402
+    build_watermark, load_watermark, merge_increment, plan_increment, save_watermark,
+)
 
 # ── Item lists ─────────────────────────────────────────────────────────────────
 # Q8 is reverse-coded (Q8_R) before normalising; all other items taken directly.
@@ -81,14 +91,19 @@ def get_gold_path() -> str:
 # CORE TRANSFORMATION
 # ══════════════════════════════════════════════════════════════════════════════
 
-def build_gold_df(df: pd.DataFrame) -> pd.DataFrame:
+def _item_values(series: pd.Series) -> pd.Series:
+    """An item as plain float64 (NaN for missing), whether Silver was loaded with Int8 items or not."""
+    return pd.to_numeric(series, errors='coerce').astype('float64')
+
+
+def build_gold_df(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
     """
     Transform a Silver-layer DataFrame into the Gold analytical DataFrame.
 
     Steps
     -----
     1. Reverse-code Q8 → Q8_R  (4 − raw, so 4 = no distress = good)
-    2. Min-Max normalise:
+    2. Min-Max normalise (items as float64, so missing values are NaN):
        - 0-4 items (incl. Q8_R) divided by 4.0
        - 0-10 items (Q4, Q26)   divided by 10.0
     3. Compute Engagement_Score = row-mean of all 21 normalised items
@@ -99,13 +114,17 @@ def build_gold_df(df: pd.DataFrame) -> pd.DataFrame:
     ----------
     df : pd.DataFrame
         Silver cleaned dataset (column names are the original survey question text).
+    inplace : bool, default False
+        Add the derived columns to `df` itself instead of a copy.  Only for
+        callers that own the frame (the pipeline runners), never for cached
+        frames shared with the dashboard.
 
     Returns
     -------
     pd.DataFrame
         Gold dataset — original columns plus all derived columns.
     """
-    gold = df.copy()
+    gold = df if inplace else df.copy()
 
     # Build Q-label → raw column-name lookup
     q_to_col = {q: col for col, q in QUESTION_MAPPING.items() if col in gold.columns}
@@ -113,7 +132,7 @@ def build_gold_df(df: pd.DataFrame) -> pd.DataFrame:
     # ── Step 1: Reverse-code Q8 ───────────────────────────────────────────────
     q8_col = q_to_col.get('Q8')
     if q8_col:
-        gold['Q8_R'] = 4 - pd.to_numeric(gold[q8_col], errors='coerce')
+        gold['Q8_R'] = 4 - _item_values(gold[q8_col])
     else:
         gold['Q8_R'] = np.nan
 
@@ -124,14 +143,14 @@ def build_gold_df(df: pd.DataFrame) -> pd.DataFrame:
         else:
             col = q_to_col.get(q)
             gold[f'{q}_norm'] = (
-                pd.to_numeric(gold[col], errors='coerce') / 4.0
+                _item_values(gold[col]) / 4.0
                 if col else np.nan
             )
 
     for q in SCALE_10_ITEMS:
         col = q_to_col.get(q)
         gold[f'{q}_norm'] = (
-            pd.to_numeric(gold[col], errors='coerce') / 10.0
+            _item_values(gold[col]) / 10.0
             if col else np.nan
         )
 
@@ -146,7 +165,7 @@ def build_gold_df(df: pd.DataFrame) -> pd.DataFrame:
 
 def save_gold_df(gold: pd.DataFrame, path: str = None) -> str:
     """
-    Save the Gold DataFrame to CSV.
+    Save the Gold DataFrame to CSV, plus a typed Parquet copy alongside.
 
     Parameters
     ----------
@@ -164,13 +183,87 @@ def save_gold_df(gold: pd.DataFrame, path: str = None) -> str:
         path = get_gold_path()
     try:
         os.makedirs(os.path.dirname(path), exist_ok=True)
-        gold.to_csv(path, index=False)
+        csv_dtypes(gold).to_csv(path, index=False)
+        write_parquet(gold, path)
         return f"Saved → {path}  (Rows: {len(gold):,}   Columns: {len(gold.columns)})"
     except Exception as e:
         return f"Error saving Gold dataset: {str(e)}"
 
 
-def run_silver_to_gold_pipeline(silver_path: str = None, gold_path_out: str = None):
+def save_aggregate_cube(gold: pd.DataFrame, path: str = None, reuse: bool = False) -> str:
+    """
+    Build the session aggregate cube from the Gold rows and persist it with
+    the fingerprint of its source data (the dashboard only reuses a cube whose
+    fingerprint matches the data it is showing).
+
+    With `reuse`, a cube already on disk whose fingerprint sidecar matches
+    `gold` is kept as it is instead of being rebuilt and rewritten.
+
+    Returns
+    -------
+    str
+        Success or error message.
+    """
+    if path is None:
+        path = layer_csv_path('gold_cube')
+    try:
+        fingerprint = source_fingerprint(gold)
+        if reuse and os.path.exists(path) and read_fingerprint(path) == fingerprint:
+            return f"Cube  → {path}  (unchanged, kept)"
+        cube = build_cube(gold)
+        save_cube(cube, fingerprint, path)
+        return f"Cube  → {path}  (Cells: {len(cube):,})"
+    except Exception as e:
+        return f"Error saving aggregate cube: {str(e)}"
+
+
+def _cube_path(gold_path: str = None):
+    """Cube CSV path next to `gold_path`; None (the layer's own path) when Gold goes to its default."""
+    if gold_path is None:
+        return None
+    return os.path.join(os.path.dirname(gold_path), os.path.basename(layer_csv_path('gold_cube')))
+
+
+def build_gold_incremental(df: pd.DataFrame, gold_path: str):
+    """
+    Rebuild only the Gold rows whose Silver row is new or changed.
+
+    Silver rows are matched to the existing Gold output on
+    (Participant id, Session number, Submitted_by) plus the Silver row hash
+    stored in the Gold watermark; build_gold_df() runs on the changed rows
+    only (it is row-local) and the result is merged into the existing Gold.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Current Silver dataset.
+    gold_path : str
+        Existing Gold CSV to merge into.
+
+    Returns
+    -------
+    tuple[pd.DataFrame, pd.DataFrame, int]
+        (gold_df, watermark, number of rows rebuilt)
+    """
+    existing = None
+    if os.path.exists(gold_path):
+        existing = pd.read_csv(gold_path, low_memory=False, float_precision='round_trip')
+        existing.columns = existing.columns.str.strip()
+        existing = apply_layer_schema(existing)
+    previous = load_watermark(gold_path, len(existing)) if existing is not None else None
+
+    if previous is None:
+        return build_gold_df(df), build_watermark(df), len(df)
+
+    reuse_pos, changed, watermark = plan_increment(df, previous)
+    fresh = apply_layer_schema(build_gold_df(df[changed]))
+    gold  = apply_layer_schema(merge_increment(existing, fresh, reuse_pos, changed))
+    return gold, watermark, int(changed.sum())
+
+
+def run_silver_to_gold_pipeline(silver_path: str = None, gold_path_out: str = None,
+                                incremental: bool = False, inplace: bool = False,
+                                memory_report: bool = False):
     """
     Full Silver → Gold pipeline:
     Loads the Silver cleaned CSV, applies all transformations, and saves
@@ -179,24 +272,68 @@ def run_silver_to_gold_pipeline(silver_path: str = None, gold_path_out: str = No
     Parameters
     ----------
     silver_path : str, optional
-        Path to Silver CSV.  Defaults to Data/Silver/data_silver_cleaned.csv.
+        Path to Silver CSV.  Defaults to the Silver layer via load_layer().
     gold_path_out : str, optional
         Output path for Gold CSV.  Defaults to Data/Gold/data_gold_analytical.csv.
+        The aggregate cube is written to the same directory.
+    incremental : bool, default False
+        Only rebuild Gold rows whose Silver row is new or changed since the
+        last run (see build_gold_incremental).
+    inplace : bool, default False
+        Build Gold on the loaded Silver frame without copying it.
+    memory_report : bool, default False
+        Print peak memory per stage (traced with tracemalloc).
 
     Returns
     -------
     tuple[pd.DataFrame | None, str]
         (gold_df, status_message)
     """
-    if silver_path is None:
-        base = os.path.normpath(os.path.join(_src_dir, '..'))
-        silver_path = os.path.join(base, 'Data', 'Silver', 'data_silver_cleaned.csv')
-
+    memory = StageMemory(enabled=memory_report)
     try:
-        df = pd.read_csv(silver_path)
+        with memory.stage('load_silver'):
+            if silver_path is None:
+                df = load_layer('silver')
+            else:
+                df = pd.read_csv(silver_path, encoding='cp1252')
+                df.columns = df.columns.str.strip()
+                if incremental:
+                    df = apply_layer_schema(df)
     except Exception as e:
+        memory.stop()
         return None, f"Error loading Silver data: {str(e)}"
 
-    gold = build_gold_df(df)
-    msg  = save_gold_df(gold, gold_path_out)
+    if not incremental:
+        with memory.stage('build_gold_df'):
+            gold = build_gold_df(df, inplace=inplace)
+        with memory.stage('save_gold_df'):
+            msg  = save_gold_df(gold, gold_path_out)
+        with memory.stage('aggregate_cube'):
+            msg += "\n" + save_aggregate_cube(gold, _cube_path(gold_path_out))
+        memory.print_report(tag='[Gold]')
+        return gold, msg
+
+    gold_path = gold_path_out or get_gold_path()
+    with memory.stage('build_gold_incremental'):
+        gold, watermark, n_changed = build_gold_incremental(df, gold_path)
+    with memory.stage('save_gold_df'):
+        msg = save_gold_df(gold, gold_path)
+        if msg.startswith("Saved"):
+            save_watermark(watermark, gold_path)
+    with memory.stage('aggregate_cube'):
+        msg = (f"{msg}  [incremental: {n_changed} row(s) rebuilt]\n"
+               + save_aggregate_cube(gold, _cube_path(gold_path_out), reuse=True))
+    memory.print_report(tag='[Gold]')
     return gold, msg
+
+
+if __name__ == "__main__":
+    gold, status = run_silver_to_gold_pipeline(incremental='--incremental' in sys.argv,
+                                               inplace='--inplace' in sys.argv,
+                                               memory_report='--memory-report' in sys.argv)
+    print(status)
+    if gold is not None:
+        print("\nGold layer generated successfully.")
+        print(f"Shape: {gold.shape[0]} rows x {gold.shape[1]} columns")
+    else:
+        print("\nPipeline failed.")
@@ -0,0 +1,129 @@
+"""
+Concurrent dashboard sessions share one DatasetHandle.
+
+Each session is a thread that does what a rerun of app.py does: fetch the
+handle through app.load_dataset (st.cache_resource), take a view and add a
+page-local column.  The sessions must all get the same handle, and the
+memory they hold together must stay flat as their number grows: each extra
+session costs per-column bookkeeping, which does not grow with the rows
+(checked on the Silver rows repeated 1x and 20x).
+
+    python -m pytest tests/
+"""
+
+import gc
+import logging
+import os
+import sys
+import threading
+import tracemalloc
+
+import pytest
+
+_src_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+for _path in (_src_dir, os.path.join(_src_dir, 'Module')):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('streamlit')
+
+SESSIONS = (1, 4, 16)
+SCALES   = (1, 20)
+
+
+@pytest.fixture(scope='module')
+def app():
+    """app.py imported in Streamlit bare mode (its UI calls are no-ops)."""
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    import app as app_module
+    if app_module.silver_fingerprint() is None:
+        pytest.skip('Silver layer not built')
+    return app_module
+
+
+def _arrow_bytes():
+    try:
+        import pyarrow
+    except ImportError:
+        return 0
+    return pyarrow.total_allocated_bytes()
+
+
+def _run_sessions(app, n):
+    """Start `n` sessions at once; returns (handles, the frames they hold)."""
+    from dataset_handle import derived_column
+
+    barrier = threading.Barrier(n)
+    handles, frames = [None] * n, [None] * n
+
+    def session(i):
+        barrier.wait()
+        handle, _ = app.load_dataset(app.silver_fingerprint())
+        df = handle.view()
+        item = next(c for c in df.columns if c.startswith('How engaged'))
+        df['Engaged_numeric'] = derived_column(
+            df, f'numeric.{item}', lambda d: pd.to_numeric(d[item], errors='coerce'))
+        handles[i], frames[i] = handle, df
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return handles, frames
+
+
+@pytest.fixture
+def scaled_silver(app, monkeypatch):
+    """Make app.load_dataset load the Silver rows repeated `scale` times."""
+    from data_schema import attach_fingerprint, data_fingerprint, derived_fingerprint
+    load_layer = app.load_layer
+
+    def _scale(scale):
+        def _load(name, *args, **kwargs):
+            df = load_layer(name, *args, **kwargs)
+            scaled = pd.concat([df] * scale, ignore_index=True)
+            return attach_fingerprint(scaled, derived_fingerprint(data_fingerprint(df), f'x{scale}'))
+        monkeypatch.setattr(app, 'load_layer', _load)
+    return _scale
+
+
+def _held_bytes(app, n):
+    """Memory held by `n` concurrent sessions, including the one load of the data."""
+    app.load_dataset.clear()
+    gc.collect()
+    arrow0 = _arrow_bytes()
+    tracemalloc.start()
+    try:
+        handles, frames = _run_sessions(app, n)
+        held, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    held += _arrow_bytes() - arrow0
+    shared = int(handles[0].memory_report()['Memory_KB'].sum() * 1024)
+    del handles, frames
+    return held, shared
+
+
+def test_concurrent_sessions_share_one_handle(app):
+    app.load_dataset.clear()
+    handles, frames = _run_sessions(app, 8)
+    assert handles[0] is not None
+    assert all(h is handles[0] for h in handles)
+    # Page-local columns stay in the session's view, never in the shared frame
+    assert 'Engaged_numeric' not in handles[0].view().columns
+    assert all('Engaged_numeric' in df.columns for df in frames)
+
+
+def test_memory_stays_flat_as_sessions_grow(app, scaled_silver):
+    per_session = {}
+    for scale in SCALES:
+        scaled_silver(scale)
+        held = {n: _held_bytes(app, n) for n in SESSIONS}
+        base, shared = held[SESSIONS[0]]
+        # Held memory grows by a constant per session, not by another copy of the data
+        per_session[scale] = (held[SESSIONS[-1]][0] - base) / (SESSIONS[-1] - SESSIONS[0])
+    assert per_session[SCALES[-1]] < 0.05 * shared, (per_session, shared)
+    assert per_session[SCALES[-1]] < 2 * per_session[SCALES[0]], per_session
+    app.load_dataset.clear()